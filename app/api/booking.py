@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException, Query
-from app.models.booking import BookingRequest, BookingConfirmation, BookingData
-from app.services.booking_handler import BookingHandler
+from fastapi import APIRouter, HTTPException, Query, Depends, UploadFile, File
+from app.models.booking import BookingRequest, BookingConfirmation, BookingData, BulkBookingRequest, BulkBookingResponse
 from app.services.openai_service import OpenAIService
+from app.core.dependencies import get_openai_service, get_booking_handler
+from app.services.booking_analytics import get_booking_analytics as booking_analytics
+from app.services.booking_outbox import get_booking_outbox
+from app.services.booking_repository import get_booking_repository
 import logging
 from datetime import datetime
-from app.api.gcal_book import GoogleCalendarOAuth
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -13,9 +15,9 @@ logger = logging.getLogger(__name__)
 async def confirm_booking(
     booking_request: BookingRequest
 ):
-    """Confirm a booking and create it in Google Calendar"""
+    """Confirm a booking and queue it for Google Calendar (status ACCEPTED until written)"""
     try:
-        booking_handler = BookingHandler()
+        booking_handler = get_booking_handler()
         # Process the booking confirmation
         confirmation = await booking_handler.process_booking_confirmation(
             booking_data=booking_request.booking_data.dict(),
@@ -26,11 +28,60 @@ async def confirm_booking(
         logger.error(f"Booking confirmation error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to confirm booking")
 
+@router.post("/bulk", response_model=BulkBookingResponse)
+async def bulk_booking(bulk_request: BulkBookingRequest):
+    """Create many bookings (including multi-day and recurring ones) with Calendar batch requests"""
+    try:
+        booking_handler = get_booking_handler()
+        results = await booking_handler.process_bulk_bookings(
+            [booking.model_dump(exclude_none=True) for booking in bulk_request.bookings]
+        )
+        return booking_handler.summarize_bulk_results(results)
+    except Exception as e:
+        logger.error(f"Bulk booking error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to create bookings")
+
+@router.post("/bulk/import", response_model=BulkBookingResponse)
+async def import_bookings(file: UploadFile = File(..., description="CSV with a header row, or JSONL")):
+    """Create bookings from an uploaded CSV or JSONL file, streamed in Calendar batches"""
+    filename = (file.filename or "").lower()
+    if filename.endswith(".csv"):
+        file_format = "csv"
+    elif filename.endswith((".jsonl", ".ndjson")):
+        file_format = "jsonl"
+    else:
+        raise HTTPException(status_code=400, detail="File must be .csv or .jsonl")
+    
+    try:
+        booking_handler = get_booking_handler()
+        results = await booking_handler.import_bookings(booking_handler.iter_import_rows(file.file, file_format))
+        return booking_handler.summarize_bulk_results(results)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+    except Exception as e:
+        logger.error(f"Booking import error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to import bookings")
+
+@router.get("/status/{booking_id}")
+async def get_booking_status(booking_id: str):
+    """Get the Calendar write status of a confirmed booking"""
+    try:
+        status = await get_booking_outbox().get_status(booking_id)
+    except Exception as e:
+        logger.error(f"Get booking status error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to get booking status")
+    
+    if not status:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    return status
+
 @router.post("/ai/booking")
-async def ai_booking_batch(booking_data: BookingData):
+async def ai_booking_batch(
+    booking_data: BookingData,
+    openai_service: OpenAIService = Depends(get_openai_service)
+):
     """Send all booking data to OpenAI in one batch and return the AI's response."""
     try:
-        openai_service = OpenAIService()
         # Compose a single prompt with all booking data
         prompt = f"""
         Here is a booking request. Please review, validate, and summarize it. If any fields are missing or look invalid, suggest corrections. Otherwise, confirm the booking details in a friendly, professional tone.
@@ -46,8 +97,7 @@ async def ai_booking_batch(booking_data: BookingData):
         Email: {booking_data.email}
         Details: {booking_data.details}
         """
-        ai_response = openai_service.client.chat.completions.create(
-            model=openai_service.model,
+        ai_response = await openai_service.create_completion(
             messages=[{"role": "system", "content": prompt}],
             temperature=0.7,
             max_tokens=300
@@ -62,10 +112,9 @@ async def ai_booking_batch(booking_data: BookingData):
 async def get_booking_summary(
     booking_id: str
 ):
-    """Get booking summary by ID"""
+    """Get a stored booking (chat or API) by ID"""
     try:
-        booking_handler = BookingHandler()
-        summary = await booking_handler.get_booking_summary(booking_id)
+        summary = await get_booking_repository().get(booking_id)
         
         if summary:
             return summary
@@ -79,11 +128,12 @@ async def get_booking_summary(
         raise HTTPException(status_code=500, detail="Failed to get booking summary")
 
 @router.get("/analytics")
-async def get_booking_analytics():
+async def get_booking_analytics(
+    recent_days: int = Query(7, ge=1, le=366, description="Days back covered by recent_bookings and bookings_per_day")
+):
     """Get booking analytics and statistics"""
     try:
-        # This endpoint is removed as per the instructions
-        raise HTTPException(status_code=404, detail="Analytics endpoint not available")
+        return booking_analytics().snapshot(recent_days)
     except Exception as e:
         logger.error(f"Get analytics error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to get analytics")
@@ -92,7 +142,7 @@ async def get_booking_analytics():
 async def format_booking_summary(booking_data: dict):
     """Format booking data for display"""
     try:
-        booking_handler = BookingHandler()
+        booking_handler = get_booking_handler()
         
         formatted_summary = booking_handler.format_booking_for_display(booking_data)
         
@@ -109,7 +159,7 @@ async def format_booking_summary(booking_data: dict):
 async def book_test_meeting():
     """Immediately book a test meeting for today at 6pm with mock data."""
     try:
-        booking_handler = BookingHandler()
+        booking_handler = get_booking_handler()
         today = datetime.now().strftime("%d/%m/%Y")
         booking_data = {
             "job_type": "Test Meeting",
@@ -136,7 +186,7 @@ async def book_test_meeting():
 async def get_available_slots(date: str = Query(..., description="Date in DD/MM/YYYY format or day of week")):
     """Return available 1-hour slots for the given date or day of week from Google Calendar."""
     try:
-        gcal = GoogleCalendarOAuth()
+        gcal = get_booking_handler().gcal
         # If input is a day of week, convert to next date
         import datetime as dt
         weekdays = ["monday","tuesday","wednesday","thursday","friday","saturday","sunday"]
@@ -148,15 +198,40 @@ async def get_available_slots(date: str = Query(..., description="Date in DD/MM/
             date_str = target_date.strftime("%d/%m/%Y")
         else:
             target_date = dt.datetime.strptime(date, "%d/%m/%Y")
-        # Check each hour from 9 to 17
-        available = []
-        for hour in range(9, 17):
-            slot_start = target_date.replace(hour=hour, minute=0, second=0, microsecond=0)
-            slot_end = slot_start + dt.timedelta(hours=1)
-            result = await gcal.check_availability(date_str, 1, start_hour=hour)
-            if result["available"]:
-                available.append(f"{hour}:00")
+        # One query for the working day, free 1-hour slots from 9 to 17 found locally
+        days = await gcal.get_available_range(target_date, target_date, duration_hours=1)
+        available = [f"{int(start[:2])}:00" for start in days[target_date.strftime("%Y-%m-%d")]]
         return {"date": date_str, "available_slots": available}
     except Exception as e:
         logger.error(f"Get available slots error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to get available slots") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to get available slots") 
+
+@router.get("/available-range")
+async def get_available_range(
+    start: str = Query(..., description="First date in DD/MM/YYYY format"),
+    end: str = Query(..., description="Last date in DD/MM/YYYY format"),
+    duration: int = Query(1, ge=1, le=12, description="Slot length in hours"),
+    granularity: int = Query(60, ge=15, le=240, description="Minutes between slot starts")
+):
+    """Return free slots for every day of a date range from Google Calendar in one query."""
+    try:
+        start_date = datetime.strptime(start, "%d/%m/%Y")
+        end_date = datetime.strptime(end, "%d/%m/%Y")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in DD/MM/YYYY format")
+    if end_date < start_date or (end_date - start_date).days >= 31:
+        raise HTTPException(status_code=400, detail="Range must end after it starts and span at most 31 days")
+    
+    try:
+        gcal = get_booking_handler().gcal
+        days = await gcal.get_available_range(start_date, end_date, duration_hours=duration, granularity_minutes=granularity)
+        return {
+            "start": start,
+            "end": end,
+            "duration_hours": duration,
+            "granularity_minutes": granularity,
+            "days": days
+        }
+    except Exception as e:
+        logger.error(f"Get available range error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to get available range")
\ No newline at end of file
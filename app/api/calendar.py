@@ -1,7 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Depends, Header
+from pydantic import BaseModel, Field
 from typing import Dict, List, Any, Optional
 from app.services.google_calendar_service import GoogleCalendarService
+from app.core.dependencies import get_calendar_service
+from app.core.config import settings
+from app.services.calendar_mirror import get_calendar_mirror
+from app.services.availability import busy_lookups
 import logging
 
 router = APIRouter()
@@ -20,6 +24,22 @@ class AvailableSlotsResponse(BaseModel):
     error: Optional[str] = None
     mock_mode: Optional[bool] = False
 
+class AvailableRangeRequest(BaseModel):
+    start_date: str
+    end_date: Optional[str] = None  # Defaults to a week from start_date
+    duration_hours: int = Field(2, ge=1, le=12)
+    granularity_minutes: int = Field(60, ge=15, le=240)
+
+class AvailableRangeResponse(BaseModel):
+    success: bool
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    duration_hours: int = 2
+    granularity_minutes: int = 60
+    days: Dict[str, List[str]] = {}  # date_iso -> free slot start times ("HH:MM")
+    error: Optional[str] = None
+    mock_mode: Optional[bool] = False
+
 class BookingRequest(BaseModel):
     booking_data: Dict[str, Any]
 
@@ -31,10 +51,6 @@ class BookingResponse(BaseModel):
     error: Optional[str] = None
     mock_mode: Optional[bool] = False
 
-def get_calendar_service():
-    """Dependency to get Google Calendar service"""
-    return GoogleCalendarService()
-
 @router.post("/available-slots", response_model=AvailableSlotsResponse)
 async def get_available_slots(
     request: AvailableSlotsRequest,
@@ -55,6 +71,28 @@ async def get_available_slots(
         logger.error(f"Error getting available slots: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/available-range", response_model=AvailableRangeResponse)
+async def get_available_range(
+    request: AvailableRangeRequest,
+    calendar_service: GoogleCalendarService = Depends(get_calendar_service)
+):
+    """Get free slots for every day of a date range (e.g. a week view) in one call"""
+    try:
+        logger.info(f"Getting available slots from {request.start_date} to {request.end_date}, duration: {request.duration_hours}h")
+        
+        result = await calendar_service.get_available_slots_range(
+            start_input=request.start_date,
+            end_input=request.end_date,
+            duration_hours=request.duration_hours,
+            granularity_minutes=request.granularity_minutes
+        )
+        
+        return AvailableRangeResponse(**result)
+        
+    except Exception as e:
+        logger.error(f"Error getting available range: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/book", response_model=BookingResponse)
 async def create_booking(
     request: BookingRequest,
@@ -72,11 +110,42 @@ async def create_booking(
         logger.error(f"Error creating booking: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/stats")
+async def calendar_stats(
+    calendar_service: GoogleCalendarService = Depends(get_calendar_service)
+):
+    """Get availability cache, request coalescing and mirror counters"""
+    try:
+        mirror = get_calendar_mirror()
+        return {
+            "availability_cache": calendar_service.availability_cache.stats(),
+            "coalescing": busy_lookups.stats(),
+            "mirror": mirror.stats() if mirror else None
+        }
+    except Exception as e:
+        logger.error(f"Error getting calendar stats: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/notifications")
+async def calendar_notifications(
+    x_goog_resource_state: Optional[str] = Header(None),
+    x_goog_channel_token: Optional[str] = Header(None)
+):
+    """Receive Google Calendar push notifications and trigger a mirror resync"""
+    if settings.calendar_webhook_token and x_goog_channel_token != settings.calendar_webhook_token:
+        raise HTTPException(status_code=403, detail="Invalid channel token")
+    
+    mirror = get_calendar_mirror()
+    # "sync" is the handshake sent when a channel is created; anything else means events changed
+    if mirror and x_goog_resource_state != "sync":
+        mirror.request_sync()
+    return {"status": "ok"}
+
 @router.get("/health")
 async def calendar_health_check():
     """Health check for calendar service"""
     try:
-        calendar_service = GoogleCalendarService()
+        calendar_service = get_calendar_service()
         return {
             "status": "healthy",
             "service_available": calendar_service.service is not None,
@@ -1,13 +1,49 @@
-from fastapi import APIRouter, HTTPException, Depends
-from app.models.chat import ChatMessage, ChatResponse
+from fastapi import APIRouter, HTTPException, Depends, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from app.models.chat import ChatMessage, ChatResponse, ConversationState
 from app.services.openai_service import OpenAIService
 from app.services.bot_logic import BookingBotLogic
 from app.core.dependencies import get_openai_service, get_bot_logic
+from typing import Dict, Any
+import asyncio
+import json
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+def _build_chat_response(response: Dict[str, Any]) -> ChatResponse:
+    """Convert a bot logic response into the chat API model"""
+    return ChatResponse(
+        message=response["message"],
+        message_type=response["message_type"],
+        conversation_state=response["conversation_state"],
+        booking_data=response["booking_data"],
+        suggested_actions=response["suggested_actions"],
+        available_slots=response.get("available_slots"),
+        requires_input=response.get("requires_input", True)
+    )
+
+def _sse_event(event: str, data: Any) -> str:
+    """Format a Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _ws_reply_frame(response: Dict[str, Any], include_booking_data: bool) -> Dict[str, Any]:
+    """Compact WebSocket frame for a bot response (see chat_socket for the keys)"""
+    frame = {
+        "t": "r",
+        "m": response["message"],
+        "mt": response["message_type"],
+        "cs": response["conversation_state"],
+        "sa": response["suggested_actions"],
+        "ri": response.get("requires_input", True)
+    }
+    if response.get("available_slots") is not None:
+        frame["as"] = response["available_slots"]
+    if include_booking_data:
+        frame["bd"] = response["booking_data"]
+    return frame
+
 @router.post("/message", response_model=ChatResponse)
 async def send_message(
     message: ChatMessage,
@@ -21,20 +57,129 @@ async def send_message(
             conversation_state=message.conversation_state
         )
         
-        return ChatResponse(
-            message=response["message"],
-            message_type=response["message_type"],
-            conversation_state=response["conversation_state"],
-            booking_data=response["booking_data"],
-            suggested_actions=response["suggested_actions"],
-            available_slots=response.get("available_slots"),
-            requires_input=response.get("requires_input", True)
-        )
+        return _build_chat_response(response)
         
     except Exception as e:
         logger.error(f"Chat processing error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to process message")
 
+@router.post("/message/stream")
+async def stream_message(
+    message: ChatMessage,
+    bot_logic: BookingBotLogic = Depends(get_bot_logic)
+):
+    """Process a message and stream the reply as Server-Sent Events.
+
+    Emits `token` events with text deltas as the completion streams in, then a
+    single `message` event carrying the full ChatResponse.
+    """
+    async def event_stream():
+        tokens: asyncio.Queue = asyncio.Queue()
+        
+        async def on_token(text: str):
+            await tokens.put(text)
+        
+        task = asyncio.create_task(bot_logic.process_message(
+            user_message=message.content,
+            session_id=message.session_id,
+            conversation_state=message.conversation_state,
+            on_token=on_token
+        ))
+        task.add_done_callback(lambda _: tokens.put_nowait(None))
+        
+        try:
+            while True:
+                text = await tokens.get()
+                if text is None:
+                    break
+                yield _sse_event("token", text)
+            
+            response = _build_chat_response(task.result())
+            yield _sse_event("message", response.model_dump(mode="json"))
+        except Exception as e:
+            logger.error(f"Chat streaming error: {str(e)}")
+            yield _sse_event("error", {"detail": "Failed to process message"})
+        finally:
+            if not task.done():
+                task.cancel()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/ws/{session_id}")
+async def chat_socket(
+    websocket: WebSocket,
+    session_id: str,
+    bot_logic: BookingBotLogic = Depends(get_bot_logic)
+):
+    """Persistent chat connection bound to a session.
+
+    Frames are JSON objects keyed by a one-letter type `t`:
+      client -> server: {"t": "m", "c": content, "s": state?} message, {"t": "p"} ping
+      server -> client: {"t": "y"} typing, {"t": "k", "d": text} token,
+        {"t": "r", "m", "mt", "cs", "sa", "as"?, "ri", "bd"?} reply (booking data
+        only when it changed), {"t": "u", "d": slots} pushed slot update,
+        {"t": "e", "d": detail} error, {"t": "o"} pong
+    """
+    await websocket.accept()
+    send_lock = asyncio.Lock()
+    last_booking_data = None
+    
+    async def send(frame: Dict[str, Any]):
+        # Replies and server pushes come from different tasks
+        async with send_lock:
+            await websocket.send_text(json.dumps(frame, separators=(",", ":"), default=str))
+    
+    async def on_event(event: str, data: Any):
+        if event == "slots":
+            await send({"t": "u", "d": data})
+    
+    async def on_token(text: str):
+        await send({"t": "k", "d": text})
+    
+    unsubscribe = bot_logic.notifier.subscribe(session_id, on_event)
+    try:
+        while True:
+            try:
+                frame = json.loads(await websocket.receive_text())
+            except ValueError:
+                await send({"t": "e", "d": "Invalid frame"})
+                continue
+            
+            if frame.get("t") == "p":
+                await send({"t": "o"})
+                continue
+            content = str(frame.get("c") or "").strip()
+            if frame.get("t") != "m" or not content or len(content) > 1000:
+                await send({"t": "e", "d": "Invalid message"})
+                continue
+            
+            try:
+                state = ConversationState(frame["s"]) if frame.get("s") else None
+                await send({"t": "y"})
+                response = await bot_logic.process_message(
+                    user_message=content,
+                    session_id=session_id,
+                    conversation_state=state,
+                    on_token=on_token
+                )
+                
+                booking_data = json.dumps(response["booking_data"], sort_keys=True, default=str)
+                await send(_ws_reply_frame(response, booking_data != last_booking_data))
+                last_booking_data = booking_data
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                logger.error(f"Chat socket error: {str(e)}")
+                await send({"t": "e", "d": "Failed to process message"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        unsubscribe()
+
 @router.post("/reset")
 async def reset_conversation(
     session_id: str,
@@ -42,7 +187,7 @@ async def reset_conversation(
 ):
     """Reset conversation state for given session"""
     try:
-        success = bot_logic.reset_session(session_id)
+        success = await bot_logic.reset_session(session_id)
         
         if success:
             return {"status": "conversation_reset", "session_id": session_id}
@@ -60,18 +205,30 @@ async def get_session_data(
 ):
     """Get current session data"""
     try:
-        session_data = bot_logic.get_session_data(session_id)
+        session_data = await bot_logic.get_session_data(session_id)
         
         if session_data:
             return {
                 "session_id": session_id,
-                "conversation_state": session_data["conversation_state"],
-                "booking_data": session_data["booking_data"],
-                "message_count": len(session_data["conversation_history"])
+                "conversation_state": session_data.conversation_state,
+                "booking_data": session_data.booking_data,
+                "message_count": len(session_data.history),
+                "bookings": await bot_logic.get_session_bookings(session_id)
             }
         else:
             return {"session_id": session_id, "status": "not_found"}
             
     except Exception as e:
         logger.error(f"Get session data error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to get session data") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to get session data") 
+
+@router.get("/stats")
+async def get_chat_stats(
+    bot_logic: BookingBotLogic = Depends(get_bot_logic)
+):
+    """Get session counters (sessions in memory, evictions, expirations)"""
+    try:
+        return await bot_logic.get_stats()
+    except Exception as e:
+        logger.error(f"Get chat stats error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to get chat stats")
\ No newline at end of file
@@ -1,76 +1,85 @@
 # app/services/google_calendar_oauth.py
-import os
-import pickle
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from typing import Dict, List, Any, Optional, Tuple
 from googleapiclient.errors import HttpError
+import asyncio
+import hashlib
 import logging
 import re
+import uuid
+from app.services.calendar_transport import get_calendar_transport
+from app.services.google_auth import get_calendar_auth
+from app.services.availability_cache import get_availability_cache
+from app.services.calendar_mirror import get_calendar_mirror
+from app.services.slot_holds import get_slot_hold_ledger, held_index, exclude_held_starts
+from app.services.availability import BusyIntervalIndex, daily_free_slots, fetch_busy_index, to_epoch
+
+# Calendar event ids: 5-1024 base32hex characters (lowercase a-v and digits)
+EVENT_ID_PATTERN = re.compile(r'^[a-v0-9]{5,1024}$')
+
+
+def calendar_event_id(booking_id: str) -> str:
+    """Event id for a booking id; ids Calendar would reject are hashed to hex, so re-submissions still match"""
+    if EVENT_ID_PATTERN.match(booking_id):
+        return booking_id
+    return hashlib.sha256(booking_id.encode()).hexdigest()
+
 
 class GoogleCalendarOAuth:
+    CALENDAR_ID = 'primary'
+
     def __init__(self, credentials_file='oauth-credentials.json', token_file='token.pickle'):
         self.credentials_file = credentials_file
         self.token_file = token_file
-        self.SCOPES = ['https://www.googleapis.com/auth/calendar']
         self.logger = logging.getLogger(__name__)
         self.service = None
+        self.transport = get_calendar_transport()
+        self.availability_cache = get_availability_cache()
+        self.slot_holds = get_slot_hold_ledger()
         self._authenticate()
 
     def _authenticate(self):
-        """Authenticate and build Google Calendar service"""
-        creds = None
-        
-        # Load existing token
-        if os.path.exists(self.token_file):
-            with open(self.token_file, 'rb') as token:
-                creds = pickle.load(token)
-        
-        # If there are no (valid) credentials available, let the user log in
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                if not os.path.exists(self.credentials_file):
-                    raise FileNotFoundError(f"OAuth credentials file not found: {self.credentials_file}")
-                
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    self.credentials_file, self.SCOPES)
-                creds = flow.run_local_server(port=8088)
-            
-            # Save the credentials for the next run
-            with open(self.token_file, 'wb') as token:
-                pickle.dump(creds, token)
-        
-        self.service = build('calendar', 'v3', credentials=creds)
-        self.logger.info("✅ Google Calendar OAuth authentication successful")
+        """Authenticate using the shared, process-wide Calendar credentials"""
+        auth = get_calendar_auth(self.credentials_file, self.token_file)
+        if not auth.service:
+            raise FileNotFoundError(f"OAuth credentials file not found: {self.credentials_file}")
+        self.service = auth.service
+
+    async def check_availability(
+        self,
+        date_str: str,
+        duration_hours: int,
+        start_hour: int = 9,
+        busy_index: Optional[BusyIntervalIndex] = None,
+        session_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Check calendar availability for given date and duration, optionally against a pre-fetched index.
 
-    async def check_availability(self, date_str: str, duration_hours: int, start_hour: int = 9) -> Dict[str, Any]:
-        """Check calendar availability for given date and duration"""
+        A window overlapping a slot held by another session is reported unavailable.
+        """
         try:
             # Parse date (DD/MM/YYYY format from user)
             day, month, year = date_str.split('/')
             start_date = datetime(int(year), int(month), int(day), start_hour, 0)
             end_date = start_date + timedelta(hours=duration_hours)
             
-            # Check for conflicts
-            time_min = start_date.isoformat() + 'Z'
-            time_max = end_date.isoformat() + 'Z'
-            
-            events_result = self.service.events().list(
-                calendarId='primary',
-                timeMin=time_min,
-                timeMax=time_max,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
+            # Answer repeated checks of the same window from the cache unless an index was supplied
+            date_iso = start_date.strftime("%Y-%m-%d")
+            variant = (duration_hours, start_hour)
+            generation = None
+            if busy_index is None:
+                cached = self.availability_cache.get(self.CALENDAR_ID, date_iso, variant)
+                if cached is not None:
+                    return await self._exclude_held(cached, start_date, end_date, duration_hours, session_id)
+                generation = self.availability_cache.generation(self.CALENDAR_ID, date_iso)
+                busy_index = await self.get_busy_index(start_date, end_date)
             
-            events = events_result.get('items', [])
+            # Check for conflicts against the busy-interval index
+            conflicts = busy_index.overlapping(to_epoch(start_date), to_epoch(end_date))
+            events = [interval.event for interval in conflicts]
             
-            return {
-                "available": len(events) == 0,
+            result = {
+                "available": busy_index.is_free(to_epoch(start_date), to_epoch(end_date)),
                 "conflicts": len(events),
                 "requested_time": {
                     "start": start_date.strftime('%d/%m/%Y %H:%M'),
@@ -87,6 +96,9 @@ class GoogleCalendarOAuth:
                 ],
                 "suggested_times": self._suggest_alternative_times(start_date, duration_hours) if events else []
             }
+            if generation is not None:
+                self.availability_cache.set(self.CALENDAR_ID, date_iso, variant, result, generation)
+            return await self._exclude_held(result, start_date, end_date, duration_hours, session_id)
             
         except Exception as e:
             self.logger.error(f"Error checking availability: {str(e)}")
@@ -98,88 +110,83 @@ class GoogleCalendarOAuth:
                 "error": str(e)
             }
 
-    async def create_booking_event(self, booking_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Create a calendar event for the booking"""
+    async def _exclude_held(
+        self,
+        result: Dict[str, Any],
+        start_date: datetime,
+        end_date: datetime,
+        duration_hours: int,
+        session_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """Mark a free window unavailable if another session holds it, as get_available_range does"""
+        if not result["available"]:
+            return result
+        held = await held_index(self.slot_holds, self.CALENDAR_ID, start_date, start_date, exclude_session=session_id)
+        if held.is_free(to_epoch(start_date), to_epoch(end_date)):
+            return result
+        # Cached results are shared, so mark a copy
+        return {
+            **result,
+            "available": False,
+            "held": True,
+            "suggested_times": self._suggest_alternative_times(start_date, duration_hours)
+        }
+
+    async def get_busy_index(self, range_start: datetime, range_end: datetime) -> BusyIntervalIndex:
+        """Fetch and index busy intervals overlapping a time range with a single query"""
+        # Answer locally when the calendar mirror is enabled and synced
+        mirror = get_calendar_mirror()
+        if mirror and mirror.ready and mirror.covers(range_start, range_end):
+            return mirror.index
+        return await fetch_busy_index(self.service, range_start, range_end)
+
+    async def get_available_range(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        duration_hours: int = 1,
+        granularity_minutes: int = 60,
+        start_hour: int = 9,
+        end_hour: int = 17
+    ) -> Dict[str, List[str]]:
+        """Map each day of a date range to its free, unheld slot start times, using one Calendar query"""
+        busy_index = await self.get_busy_index(
+            start_date.replace(hour=start_hour, minute=0, second=0, microsecond=0),
+            end_date.replace(hour=end_hour, minute=0, second=0, microsecond=0)
+        )
+        days = daily_free_slots(
+            busy_index,
+            start_date,
+            end_date,
+            duration=duration_hours * 3600,
+            step=granularity_minutes * 60,
+            start_hour=start_hour,
+            end_hour=end_hour
+        )
+        return await exclude_held_starts(self.slot_holds, self.CALENDAR_ID, days, duration_hours)
+
+    # The Calendar batch endpoint accepts at most 50 calls per request
+    BATCH_SIZE = 50
+    # Extra rounds for batch items rejected with a transient error (rate limit, 5xx)
+    BATCH_RETRIES = 2
+    # Upper bound on the events of one recurring booking
+    MAX_OCCURRENCES = 52
+    RECURRENCE_STEPS = {"daily": timedelta(days=1), "weekly": timedelta(weeks=1)}
+
+    async def create_booking_event(self, booking_data: Dict[str, Any], event_id: Optional[str] = None) -> Dict[str, Any]:
+        """Create a calendar event for the booking; event_id makes retries idempotent"""
         try:
-            # Parse booking date and time
-            day, month, year = booking_data['date'].split('/')
-            start_hour = int(booking_data.get('start_time', '9'))  # Default 9 AM
-            start_time = datetime(int(year), int(month), int(day), start_hour, 0)
-            
-            # Parse duration - handle both string and numeric formats
-            duration_str = booking_data['duration']
-            if isinstance(duration_str, str):
-                if "full day" in duration_str.lower():
-                    duration_hours = 8
-                elif "half day" in duration_str.lower():
-                    duration_hours = 4
-                else:
-                    # Extract first number from string
-                    numbers = re.findall(r'\d+', duration_str)
-                    duration_hours = int(numbers[0]) if numbers else 2
-            else:
-                duration_hours = int(duration_str)
-            
-            end_time = start_time + timedelta(hours=duration_hours)
-            
-            # Create event with detailed information
-            event = {
-                'summary': f"📸 {booking_data['job_type']} - {booking_data.get('contact_name', 'Client')}",
-                'description': self._build_event_description(booking_data),
-                'start': {
-                    'dateTime': start_time.isoformat(),
-                    'timeZone': 'America/Toronto',  # Adjust to your timezone
-                },
-                'end': {
-                    'dateTime': end_time.isoformat(),
-                    'timeZone': 'America/Toronto',
-                },
-                'location': booking_data.get('location', ''),
-                'attendees': self._build_attendees_list(booking_data),
-                'reminders': {
-                    'useDefault': False,
-                    'overrides': [
-                        {'method': 'email', 'minutes': 24 * 60},  # 1 day before
-                        {'method': 'popup', 'minutes': 60},       # 1 hour before
-                    ],
-                },
-                'colorId': '10',  # Green color for bookings
-                'extendedProperties': {
-                    'private': {
-                        'booking_source': 'WhatsApp Bot',
-                        'job_id': f"JOB_{datetime.now().strftime('%Y%m%d%H%M%S')}",
-                        'budget': booking_data.get('budget', ''),
-                        'phone': booking_data.get('phone', ''),
-                        'booking_status': 'CONFIRMED'
-                    }
-                }
-            }
+            event, start_time, end_time = self._build_event(booking_data)
             
             # Insert event into calendar
-            created_event = self.service.events().insert(
-                calendarId='primary',
-                body=event,
-                sendUpdates='all'  # Send email notifications to attendees
-            ).execute()
+            try:
+                created_event = await self._insert_event(event, event_id)
+            finally:
+                # The cached availability is stale once the insert may have landed
+                self.availability_cache.invalidate_range(self.CALENDAR_ID, start_time, end_time)
             
-            return {
-                "success": True,
-                "event_id": created_event['id'],
-                "event_link": created_event.get('htmlLink'),
-                "calendar_url": f"https://calendar.google.com/calendar/event?eid={created_event['id']}",
-                "event_details": {
-                    "summary": created_event['summary'],
-                    "start": self._format_event_time(created_event['start']),
-                    "end": self._format_event_time(created_event['end']),
-                    "location": created_event.get('location', ''),
-                    "attendees": len(created_event.get('attendees', [])),
-                },
-                "notifications": {
-                    "email_sent": True,
-                    "reminders_set": True,
-                    "calendar_updated": True
-                }
-            }
+            self._mirror_created_event(created_event)
+            return self._booking_result(created_event)
             
         except HttpError as e:
             self.logger.error(f"Google Calendar API error: {str(e)}")
@@ -197,6 +204,215 @@ class GoogleCalendarOAuth:
                 "fallback": "manual_calendar_entry_required"
             }
 
+    async def create_booking_events(self, bookings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create calendar events for many bookings through the batch endpoint; one result per booking, in order"""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(bookings)
+        pending = {}
+        for index, booking_data in enumerate(bookings):
+            try:
+                event, start_time, end_time = self._build_event(booking_data)
+            except Exception as e:
+                results[index] = {"index": index, "success": False, "error": f"Invalid booking: {str(e)}"}
+                continue
+            # A stable event id lets a re-submitted booking be recognised (HTTP 409) instead of duplicated
+            booking_id = booking_data.get('booking_id')
+            event['id'] = calendar_event_id(str(booking_id)) if booking_id else uuid.uuid4().hex
+            pending[index] = (event, start_time, end_time)
+
+        errors: Dict[int, Exception] = {}
+        for attempt in range(self.BATCH_RETRIES + 1):
+            if not pending:
+                break
+            if attempt:
+                await asyncio.sleep(2 ** attempt)
+            
+            retry = {}
+            items = list(pending.items())
+            for offset in range(0, len(items), self.BATCH_SIZE):
+                chunk = items[offset:offset + self.BATCH_SIZE]
+                responses = await self._execute_batch(chunk)
+                for index, (event, start_time, end_time) in chunk:
+                    created_event, error = responses.get(index, (None, RuntimeError("No response in batch")))
+                    self.availability_cache.invalidate_range(self.CALENDAR_ID, start_time, end_time)
+                    if error is None:
+                        self._mirror_created_event(created_event)
+                        results[index] = {"index": index, **self._booking_result(created_event)}
+                    elif isinstance(error, HttpError) and error.resp.status == 409:
+                        # Created by an earlier submission of the same booking
+                        results[index] = {"index": index, "success": True, "event_id": event['id'], "already_existed": True}
+                    elif self._is_transient(error):
+                        errors[index] = error
+                        retry[index] = (event, start_time, end_time)
+                    else:
+                        results[index] = self._batch_error(index, error)
+            pending = retry
+
+        for index in pending:
+            results[index] = self._batch_error(index, errors[index])
+        return results
+
+    async def _execute_batch(self, chunk: List[tuple]) -> Dict[int, tuple]:
+        """Send one batch of event inserts; maps each item index to (created event, error)"""
+        responses: Dict[int, tuple] = {}
+
+        def collect(request_id, response, exception):
+            responses[int(request_id)] = (response, exception)
+
+        batch = self.service.new_batch_http_request(callback=collect)
+        requests = {
+            index: self.service.events().insert(calendarId=self.CALENDAR_ID, body=event, sendUpdates='all')
+            for index, (event, _, _) in chunk
+        }
+        for index, request in requests.items():
+            batch.add(request, request_id=str(index))
+        try:
+            await self.transport.execute(batch, auth_from=next(iter(requests.values())))
+        except Exception as e:
+            # The whole batch request failed; retry every item that has no answer
+            self.logger.error(f"Calendar batch request failed: {str(e)}")
+            for index, _ in chunk:
+                responses.setdefault(index, (None, e))
+        return responses
+
+    def _is_transient(self, error: Exception) -> bool:
+        """Whether a failed insert is worth retrying"""
+        if not isinstance(error, HttpError):
+            return True
+        status = error.resp.status
+        return status in (429, 500, 502, 503, 504) or (status == 403 and 'rateLimitExceeded' in str(error))
+
+    def _batch_error(self, index: int, error: Exception) -> Dict[str, Any]:
+        self.logger.error(f"Bulk booking {index} failed: {str(error)}")
+        result = {"index": index, "success": False, "error": f"Calendar booking failed: {str(error)}"}
+        if isinstance(error, HttpError):
+            result["error_code"] = error.resp.status
+        return result
+
+    def _mirror_created_event(self, created_event: Dict[str, Any]):
+        """Reflect a newly created event in the calendar mirror"""
+        mirror = get_calendar_mirror()
+        if not mirror:
+            return
+        if created_event.get('recurrence'):
+            # The mirror stores expanded instances; let a sync fetch them
+            mirror.request_sync()
+        else:
+            mirror.upsert(created_event)
+
+    def _build_event(self, booking_data: Dict[str, Any]) -> Tuple[Dict[str, Any], datetime, datetime]:
+        """Build the Calendar event body for a booking, with the span of time it occupies"""
+        # Parse booking date and time
+        day, month, year = booking_data['date'].split('/')
+        start_hour = int(booking_data.get('start_time') or '9')  # Default 9 AM
+        start_time = datetime(int(year), int(month), int(day), start_hour, 0)
+        
+        # Parse duration - handle both string and numeric formats
+        duration_str = booking_data['duration']
+        if isinstance(duration_str, str):
+            if "full day" in duration_str.lower():
+                duration_hours = 8
+            elif "half day" in duration_str.lower():
+                duration_hours = 4
+            else:
+                # Extract first number from string
+                numbers = re.findall(r'\d+', duration_str)
+                duration_hours = int(numbers[0]) if numbers else 2
+        else:
+            duration_hours = int(duration_str)
+        
+        end_time = start_time + timedelta(hours=duration_hours)
+        
+        # Create event with detailed information
+        event = {
+            'summary': f"📸 {booking_data['job_type']} - {booking_data.get('contact_name', 'Client')}",
+            'description': self._build_event_description(booking_data),
+            'start': {
+                'dateTime': start_time.isoformat(),
+                'timeZone': 'America/Toronto',  # Adjust to your timezone
+            },
+            'end': {
+                'dateTime': end_time.isoformat(),
+                'timeZone': 'America/Toronto',
+            },
+            'location': booking_data.get('location', ''),
+            'attendees': self._build_attendees_list(booking_data),
+            'reminders': {
+                'useDefault': False,
+                'overrides': [
+                    {'method': 'email', 'minutes': 24 * 60},  # 1 day before
+                    {'method': 'popup', 'minutes': 60},       # 1 hour before
+                ],
+            },
+            'colorId': '10',  # Green color for bookings
+            'extendedProperties': {
+                'private': {
+                    'booking_source': 'WhatsApp Bot',
+                    'job_id': f"JOB_{datetime.now().strftime('%Y%m%d%H%M%S')}",
+                    'budget': booking_data.get('budget', ''),
+                    'phone': booking_data.get('phone', ''),
+                    'booking_status': 'CONFIRMED'
+                }
+            }
+        }
+        
+        # Multi-day shoots and recurring sessions become one recurring event
+        repeat, occurrences = self._parse_recurrence(booking_data)
+        if occurrences > 1:
+            event['recurrence'] = [f"RRULE:FREQ={repeat.upper()};COUNT={occurrences}"]
+            end_time += self.RECURRENCE_STEPS[repeat] * (occurrences - 1)
+        
+        return event, start_time, end_time
+
+    def _parse_recurrence(self, booking_data: Dict[str, Any]) -> Tuple[str, int]:
+        """Read 'days' (consecutive shoot days) or 'repeat' + 'occurrences' from a booking"""
+        if booking_data.get('days'):
+            repeat, occurrences = 'daily', int(booking_data['days'])
+        else:
+            repeat, occurrences = (booking_data.get('repeat') or 'daily').lower(), int(booking_data.get('occurrences') or 1)
+        if repeat not in self.RECURRENCE_STEPS:
+            raise ValueError(f"repeat must be one of {', '.join(self.RECURRENCE_STEPS)}")
+        if not 1 <= occurrences <= self.MAX_OCCURRENCES:
+            raise ValueError(f"occurrences must be between 1 and {self.MAX_OCCURRENCES}")
+        return repeat, occurrences
+
+    def _booking_result(self, created_event: Dict[str, Any]) -> Dict[str, Any]:
+        """Result returned for a successfully created booking event"""
+        return {
+            "success": True,
+            "event_id": created_event['id'],
+            "event_link": created_event.get('htmlLink'),
+            "calendar_url": f"https://calendar.google.com/calendar/event?eid={created_event['id']}",
+            "event_details": {
+                "summary": created_event['summary'],
+                "start": self._format_event_time(created_event['start']),
+                "end": self._format_event_time(created_event['end']),
+                "location": created_event.get('location', ''),
+                "attendees": len(created_event.get('attendees', [])),
+                "recurrence": created_event.get('recurrence', []),
+            },
+            "notifications": {
+                "email_sent": True,
+                "reminders_set": True,
+                "calendar_updated": True
+            }
+        }
+
+    async def _insert_event(self, event: Dict[str, Any], event_id: Optional[str] = None) -> Dict[str, Any]:
+        """Insert an event; with a client-chosen event_id, a retry of an insert that already landed returns the existing event"""
+        if event_id:
+            event['id'] = event_id
+        try:
+            return await self.transport.execute(self.service.events().insert(
+                calendarId=self.CALENDAR_ID,
+                body=event,
+                sendUpdates='all'  # Send email notifications to attendees
+            ))
+        except HttpError as e:
+            if not event_id or e.resp.status != 409:
+                raise
+            self.logger.info(f"Event {event_id} already exists, treating the insert as done")
+            return await self.transport.execute(self.service.events().get(calendarId=self.CALENDAR_ID, eventId=event_id))
+
     def _build_event_description(self, booking_data: Dict[str, Any]) -> str:
         """Build detailed event description"""
         job_id = f"JOB_{datetime.now().strftime('%Y%m%d%H%M%S')}"
@@ -280,14 +496,14 @@ class GoogleCalendarOAuth:
             time_min = now.isoformat() + 'Z'
             time_max = (now + timedelta(days=days_ahead)).isoformat() + 'Z'
             
-            events_result = self.service.events().list(
+            events_result = await self.transport.execute(self.service.events().list(
                 calendarId='primary',
                 timeMin=time_min,
                 timeMax=time_max,
                 maxResults=10,
                 singleEvents=True,
                 orderBy='startTime'
-            ).execute()
+            ))
             
             events = events_result.get('items', [])
             
@@ -315,11 +531,11 @@ class GoogleCalendarOAuth:
             self.logger.error(f"Error fetching upcoming bookings: {str(e)}")
             return []
 
-    def test_connection(self) -> Dict[str, Any]:
+    async def test_connection(self) -> Dict[str, Any]:
         """Test the calendar connection"""
         try:
             # Try to get calendar info
-            calendar_info = self.service.calendars().get(calendarId='primary').execute()
+            calendar_info = await self.transport.execute(self.service.calendars().get(calendarId=self.CALENDAR_ID))
             
             return {
                 "success": True,
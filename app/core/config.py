@@ -12,14 +12,58 @@ class Settings(BaseSettings):
     # OpenAI settings
     openai_api_key: str = ""
     openai_model: str = "gpt-4"
+    openai_timeout_seconds: float = 30.0
+    openai_max_connections: int = 100
+    openai_max_concurrency: int = 200
+    openai_cache_enabled: bool = True
+    openai_cache_max_entries: int = 1000
+    openai_cache_ttl_seconds: int = 3600
+    openai_cache_max_temperature: float = 0.0  # Sampled (temperature > 0) replies are not cached by default
+    openai_cache_path: Optional[str] = None  # SQLite file for an on-disk cache
+    openai_input_token_budget: int = 1500  # Prompt tokens per request, including the tool schema
     
-    # Zoho CRM settings (for future integration)
+    # Google Calendar settings
+    calendar_max_concurrency: int = 10
+    availability_cache_ttl_seconds: int = 60
+    availability_cache_max_entries: int = 5000
+    # Local mirror of the booking calendar, kept current with sync tokens
+    calendar_mirror_enabled: bool = False
+    calendar_mirror_path: Optional[str] = None  # SQLite file to persist the mirror across restarts
+    calendar_mirror_poll_seconds: int = 300
+    calendar_mirror_horizon_days: int = 90  # Full syncs load events from a day ago up to this far ahead
+    calendar_webhook_url: Optional[str] = None  # Public HTTPS URL of /api/v1/calendar/notifications
+    calendar_webhook_token: Optional[str] = None
+    
+    # Zoho CRM settings (the mock CRM is used unless client id, secret and refresh token are all set)
     zoho_client_id: Optional[str] = None
     zoho_client_secret: Optional[str] = None
     zoho_refresh_token: Optional[str] = None
+    zoho_accounts_url: str = "https://accounts.zoho.com"
+    zoho_api_domain: str = "https://www.zohoapis.com"
+    zoho_max_connections: int = 20
+    zoho_timeout_seconds: float = 30.0
+    zoho_batch_size: int = 100  # Records per bulk insert/upsert call (Zoho allows up to 100)
+    zoho_batch_window_ms: int = 50  # How long a bulk call waits for more records
+    
+    # Session storage (in-memory when unset, e.g. redis://localhost:6379/0 to share across workers)
+    session_store_url: Optional[str] = None
+    session_ttl_seconds: int = 3600
+    session_max_count: int = 10000
+    session_history_size: int = 20
+    
+    # Slot holds taken when a user picks a timeslot (shared store defaults to SESSION_STORE_URL)
+    slot_hold_store_url: Optional[str] = None
+    slot_hold_ttl_seconds: int = 600
+    
+    # Confirmed bookings are written to this SQLite outbox and pushed to Calendar in the background
+    booking_outbox_path: str = "booking_outbox.db"
+    booking_outbox_workers: int = 4
+    booking_outbox_max_attempts: int = 5
     
-    # Database settings (for future use)
+    # Booking store (sqlite:///path.db; bookings.db when unset)
     database_url: Optional[str] = None
+    booking_write_batch_size: int = 100
+    booking_write_batch_window_ms: int = 10  # Writes arriving within this window share one transaction
     
     class Config:
         env_file = ".env"
@@ -1,13 +1,19 @@
 from app.services.openai_service import OpenAIService
+from app.services.zoho_service import ZohoCRMService
 from app.services.zoho_mock import ZohoCRMMock
+from app.services.zoho_crm import ZohoCRMClient
 from app.services.bot_logic import BookingBotLogic
 from app.services.booking_handler import BookingHandler
 from app.services.google_calendar_service import GoogleCalendarService
+from app.services.session_store import create_session_store
 from app.core.config import settings
 
 # Singleton instances
 _openai_service = None
 _bot_logic = None
+_booking_handler = None
+_calendar_service = None
+_zoho_service = None
 
 def get_openai_service() -> OpenAIService:
     """Dependency to get OpenAI service instance"""
@@ -16,22 +22,53 @@ def get_openai_service() -> OpenAIService:
         _openai_service = OpenAIService()
     return _openai_service
 
-def get_zoho_service() -> ZohoCRMMock:
-    """Dependency to get Zoho CRM mock service instance"""
-    return ZohoCRMMock()
+def get_zoho_service() -> ZohoCRMService:
+    """Get the Zoho CRM service (singleton): the real client when OAuth settings are present, else the mock"""
+    global _zoho_service
+    if _zoho_service is None:
+        if settings.zoho_client_id and settings.zoho_client_secret and settings.zoho_refresh_token:
+            _zoho_service = ZohoCRMClient(
+                settings.zoho_client_id,
+                settings.zoho_client_secret,
+                settings.zoho_refresh_token,
+                accounts_url=settings.zoho_accounts_url,
+                api_domain=settings.zoho_api_domain,
+                max_connections=settings.zoho_max_connections,
+                timeout_seconds=settings.zoho_timeout_seconds,
+                batch_size=settings.zoho_batch_size,
+                batch_window_seconds=settings.zoho_batch_window_ms / 1000
+            )
+        else:
+            _zoho_service = ZohoCRMMock()
+    return _zoho_service
 
 def get_bot_logic() -> BookingBotLogic:
     """Dependency to get booking bot logic instance (singleton)"""
     global _bot_logic
     if _bot_logic is None:
         openai_service = get_openai_service()
-        _bot_logic = BookingBotLogic(openai_service)
+        _bot_logic = BookingBotLogic(
+            openai_service,
+            get_calendar_service(),
+            create_session_store(
+                settings.session_store_url,
+                max_sessions=settings.session_max_count,
+                ttl_seconds=settings.session_ttl_seconds
+            ),
+            history_size=settings.session_history_size
+        )
     return _bot_logic
 
 def get_booking_handler() -> BookingHandler:
-    """Get booking handler service instance"""
-    return BookingHandler()
+    """Get booking handler service instance (singleton)"""
+    global _booking_handler
+    if _booking_handler is None:
+        _booking_handler = BookingHandler()
+    return _booking_handler
 
 def get_calendar_service() -> GoogleCalendarService:
-    """Get Google Calendar service instance"""
-    return GoogleCalendarService() 
\ No newline at end of file
+    """Get Google Calendar service instance (singleton)"""
+    global _calendar_service
+    if _calendar_service is None:
+        _calendar_service = GoogleCalendarService()
+    return _calendar_service 
\ No newline at end of file
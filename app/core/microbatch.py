@@ -0,0 +1,78 @@
+from typing import Dict, List, Any, Awaitable, Callable, Optional, Set, Tuple
+import asyncio
+
+
+class MicroBatcher:
+    """Collects items submitted concurrently and sends them in one bulk call.
+
+    A batch is flushed when it reaches max_size or max_delay seconds after its first
+    item, whichever comes first. The flush callable gets the items in order and must
+    return one result per item.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_size: int = 100,
+        max_delay: float = 0.05
+    ):
+        self._flush = flush
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Add an item to the next batch and wait for its result"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size:
+            self._flush_pending()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_delay, self._flush_pending)
+        return await future
+
+    def _flush_pending(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_size], self._pending[self.max_size:]
+            task = asyncio.ensure_future(self._send(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, batch: List[Tuple[Any, asyncio.Future]]):
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self._flush([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Bulk call returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def drain(self):
+        """Flush whatever is queued and wait for the bulk calls in flight"""
+        self._flush_pending()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Bulk calls made and how many items each carried on average"""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "queued": len(self._pending),
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0
+        }
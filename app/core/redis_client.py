@@ -0,0 +1,98 @@
+import asyncio
+from typing import Any, List, Tuple
+from urllib.parse import urlparse
+
+
+class RedisError(Exception):
+    """Error reply returned by the server"""
+
+
+class RedisClient:
+    """Minimal asyncio client for Redis-compatible key-value servers (RESP2)"""
+
+    def __init__(self, url: str, max_connections: int = 10):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.max_connections = max_connections
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._semaphore = asyncio.Semaphore(max_connections)
+
+    async def execute(self, *args: Any) -> Any:
+        """Send one command and return its decoded reply"""
+        async with self._semaphore:
+            reader, writer = self._idle.pop() if self._idle else await self._connect()
+            try:
+                writer.write(self._encode(args))
+                await writer.drain()
+                reply = await self._read_reply(reader)
+            except Exception:
+                # Drop connections left in an unknown protocol state
+                writer.close()
+                raise
+            self._idle.append((reader, writer))
+
+        if isinstance(reply, RedisError):
+            raise reply
+        return reply
+
+    async def close(self):
+        """Close all pooled connections"""
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        for command in self._handshake():
+            writer.write(self._encode(command))
+            await writer.drain()
+            reply = await self._read_reply(reader)
+            if isinstance(reply, RedisError):
+                writer.close()
+                raise reply
+        return reader, writer
+
+    def _handshake(self) -> List[Tuple[Any, ...]]:
+        commands = []
+        if self.password:
+            commands.append(("AUTH", self.password))
+        if self.db:
+            commands.append(("SELECT", self.db))
+        return commands
+
+    @staticmethod
+    def _encode(args: Tuple[Any, ...]) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    async def _read_reply(self, reader: asyncio.StreamReader) -> Any:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b"+":
+            return payload.decode()
+        if prefix == b"-":
+            return RedisError(payload.decode())
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = await reader.readexactly(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            length = int(payload)
+            if length == -1:
+                return None
+            return [await self._read_reply(reader) for _ in range(length)]
+        raise RedisError(f"Unexpected reply prefix: {prefix!r}")
@@ -4,6 +4,10 @@ from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import chat, booking, calendar
 from app.core.config import settings
+from app.core.dependencies import get_calendar_service, get_bot_logic, get_booking_handler, get_zoho_service
+from app.services.booking_outbox import get_booking_outbox
+from app.services.booking_repository import get_booking_repository
+from app.services.calendar_mirror import get_calendar_mirror
 import uvicorn
 import logging
 
@@ -37,6 +41,48 @@ app.include_router(chat.router, prefix="/api/v1/chat", tags=["chat"])
 app.include_router(booking.router, prefix="/api/v1/booking", tags=["booking"])
 app.include_router(calendar.router, prefix="/api/v1/calendar", tags=["calendar"])
 
+@app.on_event("startup")
+async def start_calendar_mirror():
+    """Load the calendar mirror and keep it in sync while the app runs"""
+    mirror = get_calendar_mirror()
+    service = get_calendar_service().service
+    if mirror and service:
+        await mirror.start(
+            service,
+            poll_seconds=settings.calendar_mirror_poll_seconds,
+            webhook_url=settings.calendar_webhook_url,
+            webhook_token=settings.calendar_webhook_token
+        )
+
+@app.on_event("startup")
+async def start_booking_outbox():
+    """Register the outbox handlers and start the workers that push bookings to Calendar"""
+    get_bot_logic()
+    try:
+        get_booking_handler()
+    except Exception as e:
+        # Without OAuth credentials only chat bookings are processed
+        logging.getLogger(__name__).warning(f"Booking API outbox handler unavailable: {str(e)}")
+    get_booking_outbox().start()
+
+@app.on_event("shutdown")
+async def stop_calendar_mirror():
+    mirror = get_calendar_mirror()
+    if mirror:
+        await mirror.stop()
+
+@app.on_event("shutdown")
+async def stop_booking_outbox():
+    await get_booking_outbox().stop()
+
+@app.on_event("shutdown")
+async def close_booking_repository():
+    await get_booking_repository().close()
+
+@app.on_event("shutdown")
+async def close_zoho_service():
+    await get_zoho_service().close()
+
 @app.get("/")
 async def read_root(request: Request):
     """Main chat interface"""
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 class BookingData(BaseModel):
@@ -22,4 +22,20 @@ class BookingConfirmation(BaseModel):
 
 class BookingRequest(BaseModel):
     session_id: str
-    booking_data: BookingData 
\ No newline at end of file
+    booking_data: BookingData
+
+class BulkBookingItem(BookingData):
+    start_time: Optional[str] = None  # Hour of day, e.g. "14"
+    booking_id: Optional[str] = None  # Re-submitting the same id never creates a second event; ids that aren't valid Calendar event ids are hashed
+    days: Optional[int] = None  # Consecutive days of a multi-day shoot
+    repeat: Optional[str] = None  # "daily" or "weekly"
+    occurrences: Optional[int] = None
+
+class BulkBookingRequest(BaseModel):
+    bookings: List[BulkBookingItem] = Field(..., min_length=1, max_length=500)
+
+class BulkBookingResponse(BaseModel):
+    total: int
+    created: int
+    failed: int
+    results: List[Dict[str, Any]] 
\ No newline at end of file
@@ -0,0 +1,85 @@
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+from app.models.chat import ConversationState
+from app.services.availability import to_epoch, from_epoch
+import sys
+import time
+
+# (role, content, timestamp) with interned roles
+HistoryEntry = Tuple[str, str, float]
+# (start epoch seconds, duration in hours)
+Slot = Tuple[float, int]
+
+
+def slot_to_dict(slot: Slot) -> Dict[str, str]:
+    """Derive the display fields the chat API returns for a slot"""
+    slot_start = from_epoch(slot[0])
+    slot_end = slot_start + timedelta(hours=slot[1])
+    return {
+        "start_time": slot_start.strftime("%H:%M"),
+        "end_time": slot_end.strftime("%H:%M"),
+        "display": f"{slot_start.strftime('%I:%M %p')} - {slot_end.strftime('%I:%M %p')}",
+        "datetime": slot_start.isoformat()
+    }
+
+
+class ConversationSession:
+    """Compact per-session conversation state"""
+
+    __slots__ = ("conversation_state", "booking_data", "history", "slots")
+
+    def __init__(
+        self,
+        conversation_state: ConversationState = ConversationState.GREETING,
+        booking_data: Optional[Dict[str, Any]] = None,
+        history: Iterable[HistoryEntry] = (),
+        slots: Iterable[Slot] = (),
+        history_size: int = 20
+    ):
+        self.conversation_state = conversation_state
+        self.booking_data = booking_data if booking_data is not None else {}
+        # Ring buffer: only the most recent messages are kept
+        self.history: "deque[HistoryEntry]" = deque(history, maxlen=history_size)
+        self.slots: List[Slot] = list(slots)
+
+    def add_message(self, role: str, content: str):
+        """Append a message to the conversation history"""
+        self.history.append((sys.intern(role), content, time.time()))
+
+    def context_messages(self, count: int) -> List[Dict[str, str]]:
+        """Get the last messages in OpenAI chat format"""
+        recent = list(self.history)[-count:] if count else []
+        return [{"role": role, "content": content} for role, content, _ in recent]
+
+    def set_slots(self, slot_dicts: List[Dict[str, str]], duration_hours: int):
+        """Store slots returned by the calendar service"""
+        self.slots = [
+            (to_epoch(datetime.fromisoformat(slot["datetime"])), duration_hours)
+            for slot in slot_dicts
+        ]
+
+    def slot_dicts(self) -> List[Dict[str, str]]:
+        """Get the available slots in chat API format"""
+        return [slot_to_dict(slot) for slot in self.slots]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for networked session stores"""
+        return {
+            "conversation_state": self.conversation_state.value,
+            "booking_data": self.booking_data,
+            "history": list(self.history),
+            "history_size": self.history.maxlen,
+            "slots": self.slots
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConversationSession":
+        """Restore a session serialized with to_dict"""
+        return cls(
+            conversation_state=ConversationState(data["conversation_state"]),
+            booking_data=data["booking_data"],
+            history=((sys.intern(role), content, timestamp) for role, content, timestamp in data["history"]),
+            slots=(tuple(slot) for slot in data["slots"]),
+            history_size=data["history_size"]
+        )
@@ -13,6 +13,7 @@ class ZohoContact(BaseModel):
 
 class ZohoCalendarEvent(BaseModel):
     id: str
+    who_id: Optional[str] = None  # Linked contact
     subject: str
     start_time: str
     end_time: str
@@ -22,6 +23,7 @@ class ZohoCalendarEvent(BaseModel):
 
 class ZohoTask(BaseModel):
     id: str
+    who_id: Optional[str] = None  # Linked contact
     subject: str
     due_date: str
     priority: str
@@ -37,5 +39,8 @@ class ZohoWorkflowResponse(BaseModel):
     task: Optional[ZohoTask] = None
     job_dossier: Optional[str] = None
     crm_status: Optional[str] = None
+    timings: Optional[Dict[str, Any]] = None  # Per-stage start/duration, total and serial-equivalent ms
     error: Optional[str] = None
+    failed_stage: Optional[str] = None
+    compensated: Optional[List[str]] = None
     fallback_action: Optional[str] = None 
\ No newline at end of file
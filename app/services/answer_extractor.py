@@ -0,0 +1,98 @@
+from app.models.chat import ConversationState
+from typing import Dict, Any, Optional
+import re
+
+class StructuredAnswerExtractor:
+    """Deterministic parser for suggested-action and structured answers, tried before OpenAI"""
+
+    JOB_TYPES = {
+        "photography": "Photography",
+        "photo": "Photography",
+        "photos": "Photography",
+        "photographer": "Photography",
+        "videography": "Videography",
+        "video": "Videography",
+        "videographer": "Videography",
+        "audio": "Audio",
+        "sound": "Audio",
+        "other": "Other",
+    }
+
+    LOCATIONS = {
+        "studio": "Studio",
+        "outdoor": "Outdoor",
+        "outdoors": "Outdoor",
+        "client's venue": "Client's venue",
+        "my location": "My location",
+    }
+
+    BUDGETS = {
+        "under $500": "Under $500",
+        "$500-$1000": "$500-$1000",
+        "$1000+": "$1000+",
+        "discuss later": "Discuss later",
+    }
+
+    DURATION_PATTERN = re.compile(r"^(\d{1,2})\s*(?:h|hr|hrs|hour|hours)?$")
+    BUDGET_PATTERN = re.compile(r"^\$?\s*\d[\d,]*(?:\.\d{1,2})?\s*(?:(?:-|to)\s*\$?\s*\d[\d,]*(?:\.\d{1,2})?|\+)?$")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def extract(self, state: ConversationState, user_message: str) -> Optional[Dict[str, Any]]:
+        """Return booking fields parsed from the message, or None to fall back to OpenAI"""
+        extractors = {
+            ConversationState.COLLECTING_JOB_TYPE: self._extract_job_type,
+            ConversationState.COLLECTING_DURATION: self._extract_duration,
+            ConversationState.COLLECTING_LOCATION: self._extract_location,
+            ConversationState.COLLECTING_BUDGET: self._extract_budget,
+        }
+
+        extractor = extractors.get(state)
+        if not extractor:
+            return None
+
+        text = " ".join(user_message.strip().split())
+        result = extractor(text)
+        if result:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return result
+
+    def _extract_job_type(self, text: str) -> Optional[Dict[str, Any]]:
+        job_type = self.JOB_TYPES.get(text.lower())
+        return {"job_type": job_type} if job_type else None
+
+    def _extract_duration(self, text: str) -> Optional[Dict[str, Any]]:
+        lowered = text.lower()
+        if lowered in ("full day", "half day"):
+            return {"duration": lowered.capitalize()}
+
+        match = self.DURATION_PATTERN.match(lowered)
+        if match and 0 < int(match.group(1)) <= 12:
+            hours = int(match.group(1))
+            return {"duration": f"{hours} hour" if hours == 1 else f"{hours} hours"}
+        return None
+
+    def _extract_location(self, text: str) -> Optional[Dict[str, Any]]:
+        location = self.LOCATIONS.get(text.lower())
+        return {"location": location} if location else None
+
+    def _extract_budget(self, text: str) -> Optional[Dict[str, Any]]:
+        budget = self.BUDGETS.get(text.lower().replace(" - ", "-"))
+        if budget:
+            return {"budget": budget}
+        if self.BUDGET_PATTERN.match(text):
+            return {"budget": text}
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate of the fast path for the states it handles"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
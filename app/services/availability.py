@@ -0,0 +1,179 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Iterable, NamedTuple, Optional, Tuple
+from dateutil import parser
+import logging
+import pytz
+from app.core.singleflight import SingleFlight
+from app.services.calendar_transport import get_calendar_transport
+
+logger = logging.getLogger(__name__)
+
+# Timezone used for naive datetimes coming from the booking flow
+LOCAL_TZ = pytz.timezone('America/Toronto')
+
+# Identical busy-interval queries running at the same time share one Calendar call
+busy_lookups = SingleFlight()
+
+
+def to_epoch(value: datetime) -> float:
+    """Convert a datetime to epoch seconds, treating naive values as local time"""
+    if value.tzinfo is None:
+        value = LOCAL_TZ.localize(value)
+    return value.timestamp()
+
+
+def from_epoch(value: float) -> datetime:
+    """Convert epoch seconds back to a naive local datetime"""
+    return datetime.fromtimestamp(value, LOCAL_TZ).replace(tzinfo=None)
+
+
+class BusyInterval(NamedTuple):
+    start: float
+    end: float
+    summary: str = "Busy"
+    event: Optional[Dict[str, Any]] = None
+
+
+class BusyIntervalIndex:
+    """Sorted busy-interval index answering overlap and free-gap queries in O(log n)"""
+
+    def __init__(self, intervals: Iterable[BusyInterval] = ()):
+        self._intervals = sorted(intervals, key=lambda interval: interval.start)
+        self._starts = [interval.start for interval in self._intervals]
+        self._max_length = max((interval.end - interval.start for interval in self._intervals), default=0.0)
+
+        # Merge overlapping intervals so free/busy checks need a single bisect
+        self._merged_starts: List[float] = []
+        self._merged_ends: List[float] = []
+        for interval in self._intervals:
+            if self._merged_ends and interval.start <= self._merged_ends[-1]:
+                self._merged_ends[-1] = max(self._merged_ends[-1], interval.end)
+            else:
+                self._merged_starts.append(interval.start)
+                self._merged_ends.append(interval.end)
+
+    @classmethod
+    def from_events(cls, events: Iterable[Dict[str, Any]]) -> "BusyIntervalIndex":
+        """Build an index from Google Calendar event resources"""
+        intervals = []
+        for event in events:
+            interval = event_interval(event)
+            if interval:
+                intervals.append(interval)
+        return cls(intervals)
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def is_free(self, start: float, end: float, buffer: float = 0.0) -> bool:
+        """Check whether [start, end) is clear of busy time, keeping a buffer on both sides"""
+        start -= buffer
+        end += buffer
+        # Last merged interval starting before the slot ends is the only candidate
+        idx = bisect_left(self._merged_starts, end) - 1
+        return idx < 0 or self._merged_ends[idx] <= start
+
+    def overlapping(self, start: float, end: float) -> List[BusyInterval]:
+        """Return the busy intervals overlapping [start, end)"""
+        # No interval longer than _max_length can start before this bound and still overlap
+        lo = bisect_left(self._starts, start - self._max_length)
+        hi = bisect_left(self._starts, end)
+        return [interval for interval in self._intervals[lo:hi] if interval.end > start]
+
+    def free_gaps(self, range_start: float, range_end: float, min_length: float = 0.0) -> List[Tuple[float, float]]:
+        """Return the free gaps of at least min_length inside [range_start, range_end)"""
+        gaps = []
+        cursor = range_start
+        idx = max(bisect_right(self._merged_starts, range_start) - 1, 0)
+
+        while idx < len(self._merged_starts) and self._merged_starts[idx] < range_end:
+            busy_start, busy_end = self._merged_starts[idx], self._merged_ends[idx]
+            if busy_end > cursor:
+                if busy_start - cursor >= min_length and busy_start > cursor:
+                    gaps.append((cursor, busy_start))
+                cursor = busy_end
+            idx += 1
+
+        if range_end - cursor >= min_length and range_end > cursor:
+            gaps.append((cursor, range_end))
+        return gaps
+
+    def free_slots(self, range_start: float, range_end: float, duration: float, step: float, buffer: float = 0.0) -> List[float]:
+        """Return start times on a step grid where a slot of the given duration is free"""
+        starts = []
+        slot_start = range_start
+        while slot_start + duration <= range_end:
+            if self.is_free(slot_start, slot_start + duration, buffer):
+                starts.append(slot_start)
+            slot_start += step
+        return starts
+
+
+def daily_free_slots(
+    index: BusyIntervalIndex,
+    first_day: datetime,
+    last_day: datetime,
+    duration: float,
+    step: float,
+    start_hour: int = 9,
+    end_hour: int = 17,
+    buffer: float = 0.0
+) -> Dict[str, List[str]]:
+    """Map each day from first_day to last_day to its free slot start times ("HH:MM") in working hours"""
+    days = {}
+    day = first_day.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day.date() <= last_day.date():
+        starts = index.free_slots(
+            to_epoch(day.replace(hour=start_hour)),
+            to_epoch(day.replace(hour=end_hour)),
+            duration,
+            step,
+            buffer
+        )
+        days[day.strftime("%Y-%m-%d")] = [from_epoch(start).strftime("%H:%M") for start in starts]
+        day += timedelta(days=1)
+    return days
+
+
+def event_interval(event: Dict[str, Any]) -> Optional[BusyInterval]:
+    """Convert a Calendar event to a busy interval, skipping all-day events"""
+    # All-day events don't have 'dateTime' and don't block working hours
+    if 'dateTime' not in event.get('start', {}):
+        return None
+    try:
+        return BusyInterval(
+            to_epoch(parser.parse(event['start']['dateTime'])),
+            to_epoch(parser.parse(event['end']['dateTime'])),
+            event.get('summary', 'Busy'),
+            event
+        )
+    except Exception as e:
+        logger.error(f"Error parsing event time: {e}")
+        return None
+
+
+async def fetch_busy_index(service, range_start: datetime, range_end: datetime, calendar_id: str = 'primary') -> BusyIntervalIndex:
+    """Fetch all events overlapping a time range with a single query and index them"""
+    key = (id(service), calendar_id, to_epoch(range_start), to_epoch(range_end))
+    return await busy_lookups.do(key, lambda: _fetch_busy_index(service, range_start, range_end, calendar_id))
+
+
+async def _fetch_busy_index(service, range_start: datetime, range_end: datetime, calendar_id: str) -> BusyIntervalIndex:
+    events = []
+    page_token = None
+    while True:
+        events_result = await get_calendar_transport().execute(service.events().list(
+            calendarId=calendar_id,
+            timeMin=datetime.fromtimestamp(to_epoch(range_start), pytz.UTC).isoformat(),
+            timeMax=datetime.fromtimestamp(to_epoch(range_end), pytz.UTC).isoformat(),
+            singleEvents=True,
+            orderBy='startTime',
+            pageToken=page_token
+        ))
+        events.extend(events_result.get('items', []))
+        page_token = events_result.get('nextPageToken')
+        if not page_token:
+            break
+
+    return BusyIntervalIndex.from_events(events)
@@ -0,0 +1,109 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Any, Hashable, Optional, Set, Tuple
+from app.core.config import settings
+import logging
+import time
+
+# (calendar id, date_iso, duration or other per-day variant)
+CacheKey = Tuple[str, str, Hashable]
+
+class AvailabilityCache:
+    """LRU cache of availability results keyed by (calendar, date, duration) with TTL and per-day invalidation"""
+
+    def __init__(self, max_entries: int = 5000, ttl_seconds: float = 60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.logger = logging.getLogger(__name__)
+        # key -> (expires_at, value), least recently used first
+        self._entries: "OrderedDict[CacheKey, tuple]" = OrderedDict()
+        # (calendar id, date_iso) -> keys cached for that day
+        self._day_keys: Dict[Tuple[str, str], Set[CacheKey]] = {}
+        # Bumped on every write to a day so in-flight lookups can't cache stale results
+        self._generations: Dict[Tuple[str, str], int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def generation(self, calendar_id: str, date_iso: str) -> int:
+        """Current write generation of a day; pass it to set() after the lookup"""
+        return self._generations.get((calendar_id, date_iso), 0)
+
+    def get(self, calendar_id: str, date_iso: str, variant: Hashable) -> Optional[Any]:
+        """Get a cached result, or None if missing or expired. Callers must not mutate it."""
+        key = (calendar_id, date_iso, variant)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self._remove(key)
+
+        self.misses += 1
+        return None
+
+    def set(self, calendar_id: str, date_iso: str, variant: Hashable, value: Any, generation: Optional[int] = None):
+        """Cache a result unless the day was written to since `generation` was read"""
+        if generation is not None and generation != self.generation(calendar_id, date_iso):
+            return
+
+        key = (calendar_id, date_iso, variant)
+        self._entries[key] = (time.time() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        self._day_keys.setdefault((calendar_id, date_iso), set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def invalidate_day(self, calendar_id: str, date_iso: str):
+        """Drop every cached result for a day after an event was written on it"""
+        day = (calendar_id, date_iso)
+        self._generations[day] = self._generations.get(day, 0) + 1
+        for key in list(self._day_keys.get(day, ())):
+            self._remove(key)
+            self.invalidations += 1
+
+    def invalidate_range(self, calendar_id: str, start: datetime, end: datetime):
+        """Invalidate each day touched by an event from start to end"""
+        day = start.date()
+        while day <= end.date():
+            self.invalidate_day(calendar_id, day.isoformat())
+            day += timedelta(days=1)
+
+    def _remove(self, key: CacheKey):
+        self._entries.pop(key, None)
+        day_keys = self._day_keys.get(key[:2])
+        if day_keys is not None:
+            day_keys.discard(key)
+            if not day_keys:
+                del self._day_keys[key[:2]]
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio and size of the cache"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+
+_cache = None
+
+def get_availability_cache() -> AvailabilityCache:
+    """Get the process-wide availability cache shared by the calendar services (singleton)"""
+    global _cache
+    if _cache is None:
+        _cache = AvailabilityCache(
+            max_entries=settings.availability_cache_max_entries,
+            ttl_seconds=settings.availability_cache_ttl_seconds
+        )
+    return _cache
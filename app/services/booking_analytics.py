@@ -0,0 +1,64 @@
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, Any, Optional
+
+
+class BookingAnalytics:
+    """Booking statistics maintained incrementally as bookings are confirmed.
+
+    Booking and contact counters move when the booking repository records a
+    booking entering (or leaving) the CONFIRMED status; open task counters move
+    when CRM tasks are written. Bookings are bucketed by the day they take place,
+    so reading the analytics costs O(days with bookings) rather than a scan of
+    every booking, contact and task.
+    """
+
+    def __init__(self):
+        self.total_contacts = 0
+        self.total_bookings = 0
+        self._bookings_by_day: Counter = Counter()
+        self._bookings_by_job_type: Counter = Counter()
+        self._open_tasks_by_priority: Counter = Counter()
+
+    def record_contact(self, delta: int = 1):
+        self.total_contacts += delta
+
+    def record_booking(self, booking_date: Optional[str], job_type: Optional[str], delta: int = 1):
+        """Count a booking under the ISO date it takes place, if known"""
+        self.total_bookings += delta
+        if booking_date:
+            self._adjust(self._bookings_by_day, booking_date, delta)
+        self._adjust(self._bookings_by_job_type, job_type or "Unknown", delta)
+
+    def record_task(self, task: Dict[str, Any], delta: int = 1):
+        if task.get("status") == "Open":
+            self._adjust(self._open_tasks_by_priority, task.get("priority") or "Normal", delta)
+
+    def _adjust(self, counter: Counter, key: str, delta: int):
+        counter[key] += delta
+        if counter[key] <= 0:
+            del counter[key]
+
+    def snapshot(self, recent_days: int = 7, today: Optional[date] = None) -> Dict[str, Any]:
+        """Current analytics; 'recent' covers bookings from recent_days ago onwards, including future ones"""
+        cutoff = ((today or date.today()) - timedelta(days=recent_days)).isoformat()
+        recent = {day: count for day, count in self._bookings_by_day.items() if day >= cutoff}
+        return {
+            "total_bookings": self.total_bookings,
+            "total_contacts": self.total_contacts,
+            "pending_tasks": sum(self._open_tasks_by_priority.values()),
+            "recent_bookings": sum(recent.values()),
+            "bookings_per_day": dict(sorted(recent.items())),
+            "open_tasks_by_priority": dict(self._open_tasks_by_priority),
+            "bookings_by_job_type": dict(self._bookings_by_job_type.most_common())
+        }
+
+
+_analytics = None
+
+def get_booking_analytics() -> BookingAnalytics:
+    """Get the process-wide booking analytics (singleton)"""
+    global _analytics
+    if _analytics is None:
+        _analytics = BookingAnalytics()
+    return _analytics
@@ -1,20 +1,32 @@
 from app.models.booking import BookingData, BookingConfirmation
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Iterable, Iterator, IO
+import asyncio
+import csv
+import io
+import json
 import logging
-from datetime import datetime
 from app.api.gcal_book import GoogleCalendarOAuth
+from app.services.booking_outbox import get_booking_outbox
+from app.services.booking_repository import get_booking_repository, CONFIRMED, FAILED
 
 class BookingHandler:
+    # Outbox job kind for bookings confirmed through the booking API
+    OUTBOX_KIND = "confirmed_booking"
+
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.gcal = GoogleCalendarOAuth()
+        # Calendar writes are queued durably and pushed by the outbox workers
+        self.outbox = get_booking_outbox()
+        self.outbox.register_handler(self.OUTBOX_KIND, self._write_booking_event, on_failure=self._booking_event_failed)
+        self.repository = get_booking_repository()
 
     async def process_booking_confirmation(
         self,
         booking_data: Dict[str, Any],
         session_id: str
     ) -> BookingConfirmation:
-        """Process a complete booking confirmation (Google Calendar only)"""
+        """Accept a complete booking and queue it for Google Calendar; poll get_booking_status for the result"""
         try:
             # Validate booking data
             if not self._validate_booking_data(booking_data):
@@ -25,24 +37,17 @@ class BookingHandler:
                     crm_data=None,
                     job_dossier=None
                 )
-            gcal_result = None
-            gcal_error = None
-            # Create real Google Calendar event
-            try:
-                gcal_result = await self.gcal.create_booking_event(booking_data)
-            except Exception as e:
-                gcal_error = str(e)
-                self.logger.error(f"Google Calendar booking error: {gcal_error}")
-            confirmation_message = self._generate_confirmation_message(booking_data, gcal_result)
-            if gcal_result and gcal_result.get("success"):
-                confirmation_message += f"\n\n📅 [View in Google Calendar]({gcal_result.get('event_link', '')})"
-            elif gcal_error:
-                confirmation_message += f"\n\n⚠️ Google Calendar booking failed: {gcal_error}"
+            # Acknowledge once the booking is durably queued; the Calendar write happens in the background
+            booking_id = self.outbox.new_booking_id()
+            await self.repository.save(booking_id, booking_data, session_id=session_id)
+            await self.outbox.enqueue(self.OUTBOX_KIND, booking_data, session_id=session_id, booking_id=booking_id)
+            confirmation_message = self._generate_confirmation_message(booking_data, {"event_id": booking_id})
+            confirmation_message += "\n\n📅 Your calendar invite is on its way."
             return BookingConfirmation(
-                booking_id=gcal_result.get("event_id", "") if gcal_result else "",
-                status="CONFIRMED" if gcal_result and gcal_result.get("success") else "ERROR",
+                booking_id=booking_id,
+                status="ACCEPTED",
                 confirmation_message=confirmation_message,
-                crm_data=gcal_result,
+                crm_data=None,
                 job_dossier=None
             )
         except Exception as e:
@@ -55,6 +60,118 @@ class BookingHandler:
                 job_dossier=None
             )
 
+    async def _write_booking_event(self, booking_data: Dict[str, Any], booking_id: str) -> Dict[str, Any]:
+        """Outbox handler: create the Calendar event, using the booking id as its event id"""
+        result = await self.gcal.create_booking_event(booking_data, event_id=booking_id)
+        if result.get("success"):
+            await self.repository.update(
+                booking_id, status=CONFIRMED, event_id=result["event_id"], event_link=result.get("event_link"), error=None
+            )
+        return result
+
+    async def _booking_event_failed(self, booking_data: Dict[str, Any], booking_id: str, error: str):
+        await self.repository.update(booking_id, status=FAILED, error=error)
+
+    async def process_bulk_bookings(self, bookings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create many bookings through Calendar batch requests; one result per booking, in order"""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(bookings)
+        valid = []
+        for index, booking_data in enumerate(bookings):
+            if booking_data.get("_parse_error"):
+                results[index] = {"index": index, "success": False, "status": "INVALID_DATA", "error": booking_data["_parse_error"]}
+            elif not self._validate_booking_data(booking_data):
+                results[index] = {"index": index, "success": False, "status": "INVALID_DATA", "error": "Missing required booking information"}
+            elif not self._valid_booking_id(booking_data.get("booking_id")):
+                results[index] = {"index": index, "success": False, "status": "INVALID_DATA", "error": "booking_id must be a non-empty string or number"}
+            else:
+                valid.append(index)
+        
+        created = await self.gcal.create_booking_events([bookings[index] for index in valid])
+        for index, result in zip(valid, created):
+            results[index] = {**result, "index": index}
+            booking_id = bookings[index].get("booking_id")
+            if booking_id is not None:
+                results[index]["booking_id"] = str(booking_id)
+                if result.get("event_id") and result["event_id"] != str(booking_id):
+                    # Not a valid Calendar event id, so the event was created under its hash
+                    results[index]["event_id_normalized"] = True
+        
+        # Created bookings are stored together; concurrent saves share one transaction.
+        # As on the outbox path, a caller's booking id is the key and the event id its own column.
+        stored = [result for result in results if result.get("success")]
+        await asyncio.gather(*[
+            self.repository.save(
+                result.get("booking_id") or result["event_id"], bookings[result["index"]], source="bulk", status=CONFIRMED
+            )
+            for result in stored
+        ])
+        await asyncio.gather(*[
+            self.repository.update(
+                result.get("booking_id") or result["event_id"], event_id=result["event_id"], event_link=result.get("event_link")
+            )
+            for result in stored
+        ])
+        return results
+
+    async def import_bookings(self, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create bookings from a stream of rows, one Calendar batch at a time"""
+        results = []
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == self.gcal.BATCH_SIZE:
+                results.extend(self._offset_results(await self.process_bulk_bookings(chunk), len(results)))
+                chunk = []
+        if chunk:
+            results.extend(self._offset_results(await self.process_bulk_bookings(chunk), len(results)))
+        return results
+
+    @staticmethod
+    def _offset_results(results: List[Dict[str, Any]], offset: int) -> List[Dict[str, Any]]:
+        for result in results:
+            result["index"] += offset
+        return results
+
+    @staticmethod
+    def iter_import_rows(file: IO[bytes], file_format: str) -> Iterator[Dict[str, Any]]:
+        """Read booking rows lazily from a CSV (header row) or JSONL upload"""
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        if file_format == "csv":
+            for row in csv.DictReader(text):
+                yield {key.strip(): value.strip() for key, value in row.items() if key and value}
+            return
+        
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError("expected a JSON object")
+                yield row
+            except ValueError as e:
+                yield {"_parse_error": f"Line {line_number}: {str(e)}"}
+
+    @staticmethod
+    def summarize_bulk_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Counts plus the per-booking results of a bulk booking"""
+        created = sum(1 for result in results if result.get("success"))
+        return {
+            "total": len(results),
+            "created": created,
+            "failed": len(results) - created,
+            "results": results
+        }
+
+    @staticmethod
+    def _valid_booking_id(booking_id: Any) -> bool:
+        """Caller-supplied booking ids are optional, but must be plain values when given"""
+        if booking_id is None:
+            return True
+        if isinstance(booking_id, bool) or not isinstance(booking_id, (str, int)):
+            return False
+        return bool(str(booking_id).strip())
+
     def _validate_booking_data(self, booking_data: Dict[str, Any]) -> bool:
         """Validate that all required booking fields are present"""
         required_fields = [
@@ -97,21 +214,6 @@ Thank you for choosing our services!
         
         return message
 
-    async def get_booking_summary(self, booking_id: str) -> Optional[Dict[str, Any]]:
-        """Get booking summary by ID"""
-        try:
-            # In a real implementation, this would query the database
-            # For now, we'll return a mock summary
-            return {
-                "booking_id": booking_id,
-                "status": "CONFIRMED",
-                "created_at": datetime.now().isoformat(),
-                "last_updated": datetime.now().isoformat()
-            }
-        except Exception as e:
-            self.logger.error(f"Error getting booking summary: {str(e)}")
-            return None
-
     def format_booking_for_display(self, booking_data: Dict[str, Any]) -> str:
         """Format booking data for display in the UI"""
         
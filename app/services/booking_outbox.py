@@ -0,0 +1,273 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Awaitable, Callable, List, Optional
+from app.core.config import settings
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+import uuid
+
+# Handler for one kind of outbox job: (payload, booking_id) -> result with a "success" flag
+OutboxHandler = Callable[[Dict[str, Any], str], Awaitable[Dict[str, Any]]]
+# Called once a job has used up its attempts: (payload, booking_id, error)
+FailureHandler = Callable[[Dict[str, Any], str, str], Awaitable[None]]
+
+PENDING = "PENDING"
+PROCESSING = "PROCESSING"
+CONFIRMED = "CONFIRMED"
+FAILED = "FAILED"
+
+class BookingOutbox:
+    """Durable SQLite outbox for calendar writes, drained by a background worker pool.
+
+    Confirmed bookings are committed locally and acknowledged straight away; workers
+    then push them to Google Calendar with retries. The booking id doubles as the
+    Calendar event id, so a retried insert that already landed is detected (HTTP 409)
+    instead of creating a duplicate event.
+
+    SQLite runs on a dedicated thread so commits never block the event loop. Several
+    processes may share the file: a job is claimed with a guarded UPDATE and leased
+    to its owner, and only jobs whose lease expired are handed to another worker.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "booking_outbox.db",
+        workers: int = 4,
+        max_attempts: int = 5,
+        retry_base_seconds: float = 2.0,
+        lease_seconds: float = 300.0
+    ):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.lease_seconds = lease_seconds
+        self.logger = logging.getLogger(__name__)
+        # Identifies this process's claims in a shared outbox file
+        self.owner = uuid.uuid4().hex
+        self.claims_lost = 0
+        self._handlers: Dict[str, OutboxHandler] = {}
+        self._failure_handlers: Dict[str, FailureHandler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._next_requeue_at = 0.0
+
+        # One thread owns the connection; every query is serialized on it
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="booking-outbox")
+        self._db = self._executor.submit(self._connect, db_path).result()
+
+    @staticmethod
+    def _connect(db_path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(db_path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS booking_outbox ("
+            "booking_id TEXT PRIMARY KEY, kind TEXT NOT NULL, session_id TEXT, payload TEXT NOT NULL, "
+            "status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL, "
+            "result TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+            "owner TEXT, lease_expires_at REAL)"
+        )
+        # Outbox files created before claims were leased
+        columns = {row[1] for row in db.execute("PRAGMA table_info(booking_outbox)")}
+        for column, column_type in (("owner", "TEXT"), ("lease_expires_at", "REAL")):
+            if column not in columns:
+                db.execute(f"ALTER TABLE booking_outbox ADD COLUMN {column} {column_type}")
+        db.execute("CREATE INDEX IF NOT EXISTS idx_booking_outbox_due ON booking_outbox (status, next_attempt_at)")
+        db.execute("CREATE INDEX IF NOT EXISTS idx_booking_outbox_session ON booking_outbox (session_id)")
+        db.commit()
+        return db
+
+    async def _run(self, fn, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    @staticmethod
+    def new_booking_id() -> str:
+        """Random id that is also a valid Calendar event id (base32hex characters)"""
+        return uuid.uuid4().hex
+
+    def register_handler(self, kind: str, handler: OutboxHandler, on_failure: Optional[FailureHandler] = None):
+        """Set the coroutine that performs the write for jobs of a kind, and optionally one for final failures"""
+        self._handlers[kind] = handler
+        if on_failure:
+            self._failure_handlers[kind] = on_failure
+        self._notify()
+
+    async def enqueue(self, kind: str, payload: Dict[str, Any], session_id: Optional[str] = None, booking_id: Optional[str] = None) -> str:
+        """Durably record a booking write and return its booking id once it is committed"""
+        booking_id = booking_id or self.new_booking_id()
+        now = time.time()
+        row = (booking_id, kind, session_id, json.dumps(payload, default=str), PENDING, now, now, now)
+        await self._run(self._insert, row)
+        self._notify()
+        return booking_id
+
+    def _insert(self, row: tuple):
+        with self._db:
+            self._db.execute(
+                "INSERT INTO booking_outbox (booking_id, kind, session_id, payload, status, next_attempt_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                row
+            )
+
+    async def get_status(self, booking_id: str) -> Optional[Dict[str, Any]]:
+        """Status of a booking write, or None if the id is unknown"""
+        row = await self._run(lambda: self._db.execute(
+            "SELECT booking_id, session_id, status, attempts, result, error, created_at, updated_at "
+            "FROM booking_outbox WHERE booking_id = ?",
+            (booking_id,)
+        ).fetchone())
+        if not row:
+            return None
+        return {
+            "booking_id": row[0],
+            "session_id": row[1],
+            "status": row[2],
+            "attempts": row[3],
+            "result": json.loads(row[4]) if row[4] else None,
+            "error": row[5],
+            "created_at": row[6],
+            "updated_at": row[7]
+        }
+
+    def start(self):
+        """Start the worker pool; jobs whose lease expired (e.g. after a crash) are retried"""
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Stop the workers; unfinished jobs stay in the outbox until their lease expires"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _notify(self):
+        if self._wakeup:
+            self._wakeup.set()
+
+    def _claim(self, kinds: List[str]) -> Optional[tuple]:
+        """Take the next due job, leasing it to this process"""
+        now = time.time()
+        if now >= self._next_requeue_at:
+            self._requeue_expired(now)
+
+        while True:
+            row = self._db.execute(
+                f"SELECT booking_id, kind, payload, attempts FROM booking_outbox "
+                f"WHERE status = ? AND next_attempt_at <= ? AND kind IN ({','.join('?' * len(kinds))}) "
+                f"ORDER BY next_attempt_at LIMIT 1",
+                (PENDING, now, *kinds)
+            ).fetchone()
+            if not row:
+                return None
+            with self._db:
+                claimed = self._db.execute(
+                    "UPDATE booking_outbox SET status = ?, owner = ?, lease_expires_at = ?, updated_at = ? "
+                    "WHERE booking_id = ? AND status = ?",
+                    (PROCESSING, self.owner, now + self.lease_seconds, now, row[0], PENDING)
+                ).rowcount
+            if claimed:
+                return row
+            # Another process claimed it between the select and the update
+            self.claims_lost += 1
+
+    def _requeue_expired(self, now: float):
+        """Hand jobs whose owner stopped renewing its lease back to the pool"""
+        self._next_requeue_at = now + min(self.lease_seconds / 2, 60)
+        with self._db:
+            requeued = self._db.execute(
+                "UPDATE booking_outbox SET status = ?, owner = NULL, lease_expires_at = NULL, updated_at = ? "
+                "WHERE status = ? AND (lease_expires_at IS NULL OR lease_expires_at <= ?)",
+                (PENDING, now, PROCESSING, now)
+            ).rowcount
+        if requeued:
+            self.logger.warning(f"Requeued {requeued} booking write(s) whose lease expired")
+
+    async def _worker(self):
+        while True:
+            try:
+                job = await self._run(self._claim, list(self._handlers)) if self._handlers else None
+                if job is None:
+                    # Sleep until something is enqueued, or poll for retries that come due
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=1.0)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self._process(*job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Booking outbox worker error: {str(e)}")
+                await asyncio.sleep(1.0)
+
+    async def _process(self, booking_id: str, kind: str, payload: str, attempts: int):
+        attempts += 1
+        try:
+            result = await self._handlers[kind](json.loads(payload), booking_id)
+            error = None if result.get("success") else result.get("error", "Calendar write failed")
+        except Exception as e:
+            result, error = None, str(e)
+
+        now = time.time()
+        if error is None:
+            status, next_attempt_at = CONFIRMED, now
+            self.logger.info(f"Booking {booking_id} written to the calendar after {attempts} attempt(s)")
+        elif attempts >= self.max_attempts:
+            status, next_attempt_at = FAILED, now
+            self.logger.error(f"Booking {booking_id} failed after {attempts} attempts: {error}")
+        else:
+            # Exponential backoff between attempts
+            status, next_attempt_at = PENDING, now + self.retry_base_seconds * 2 ** (attempts - 1)
+            self.logger.warning(f"Booking {booking_id} attempt {attempts} failed, retrying: {error}")
+
+        row = (status, attempts, next_attempt_at, json.dumps(result, default=str) if result else None, error, now, booking_id, self.owner)
+        if not await self._run(self._finish, row):
+            # The lease ran out and another worker took the job over; its outcome wins
+            self.logger.warning(f"Booking {booking_id} lease expired before its result was recorded")
+            return
+
+        on_failure = self._failure_handlers.get(kind)
+        if status == FAILED and on_failure:
+            try:
+                await on_failure(json.loads(payload), booking_id, error)
+            except Exception as e:
+                self.logger.error(f"Booking {booking_id} failure handler error: {str(e)}")
+
+    def _finish(self, row: tuple) -> bool:
+        """Record a job's outcome if this process still owns it"""
+        with self._db:
+            return self._db.execute(
+                "UPDATE booking_outbox SET status = ?, attempts = ?, next_attempt_at = ?, result = ?, error = ?, updated_at = ?, "
+                "owner = NULL, lease_expires_at = NULL WHERE booking_id = ? AND status = ? AND owner = ?",
+                (*row[:-1], PROCESSING, row[-1])
+            ).rowcount == 1
+
+    async def stats(self) -> Dict[str, Any]:
+        """Number of outbox jobs per status"""
+        counts = dict(await self._run(
+            lambda: self._db.execute("SELECT status, COUNT(*) FROM booking_outbox GROUP BY status").fetchall()
+        ))
+        return {
+            "workers": len(self._tasks),
+            "claims_lost": self.claims_lost,
+            **{status.lower(): counts.get(status, 0) for status in (PENDING, PROCESSING, CONFIRMED, FAILED)}
+        }
+
+
+_outbox = None
+
+def get_booking_outbox() -> BookingOutbox:
+    """Get the process-wide booking outbox (singleton)"""
+    global _outbox
+    if _outbox is None:
+        _outbox = BookingOutbox(
+            db_path=settings.booking_outbox_path,
+            workers=settings.booking_outbox_workers,
+            max_attempts=settings.booking_outbox_max_attempts
+        )
+    return _outbox
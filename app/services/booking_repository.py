@@ -0,0 +1,241 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+from app.core.config import settings
+from app.core.microbatch import MicroBatcher
+from app.services.booking_analytics import BookingAnalytics, get_booking_analytics
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+
+PENDING = "PENDING"
+CONFIRMED = "CONFIRMED"
+FAILED = "FAILED"
+
+# Columns callers may change with update()
+UPDATABLE_FIELDS = ("status", "event_id", "event_link", "error")
+
+# A booking entering (+1) or leaving (-1) CONFIRMED: (delta, booking_date, job_type, new_contact)
+Transition = Tuple[int, Optional[str], Optional[str], bool]
+
+
+class BookingRepository:
+    """Persistent store of bookings, indexed by booking id, session, date and contact.
+
+    SQLite runs on a dedicated thread so queries never block the event loop, and
+    writes from concurrent requests are grouped into one transaction per batch.
+    Status changes into or out of CONFIRMED are fed to the booking analytics.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "bookings.db",
+        batch_size: int = 100,
+        batch_window_seconds: float = 0.01,
+        analytics: Optional[BookingAnalytics] = None
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.analytics = analytics
+        # One thread owns the connection; every query is serialized on it
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="booking-db")
+        self._db = self._executor.submit(self._connect, db_path).result()
+        if analytics is not None:
+            # Counters live in memory, so start from what is already confirmed on disk
+            self._executor.submit(self._load_analytics).result()
+        self._writes = MicroBatcher(self._write_batch, max_size=batch_size, max_delay=batch_window_seconds)
+
+    @staticmethod
+    def _connect(db_path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(db_path)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS bookings ("
+            "booking_id TEXT PRIMARY KEY, session_id TEXT, source TEXT NOT NULL, status TEXT NOT NULL, "
+            "booking_date TEXT, contact_name TEXT, email TEXT, phone TEXT, job_type TEXT, "
+            "event_id TEXT, event_link TEXT, error TEXT, booking_data TEXT NOT NULL, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS idx_bookings_session ON bookings (session_id, created_at)")
+        db.execute("CREATE INDEX IF NOT EXISTS idx_bookings_date ON bookings (booking_date)")
+        db.execute("CREATE INDEX IF NOT EXISTS idx_bookings_email ON bookings (email, created_at)")
+        db.commit()
+        return db
+
+    async def _run(self, fn, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def save(
+        self,
+        booking_id: str,
+        booking_data: Dict[str, Any],
+        session_id: Optional[str] = None,
+        source: str = "api",
+        status: str = PENDING
+    ):
+        """Insert or replace a booking; returns once it is committed"""
+        now = time.time()
+        row = (
+            booking_id, session_id, source, status, self._booking_date(booking_data),
+            booking_data.get("contact_name"), (booking_data.get("email") or "").lower() or None,
+            booking_data.get("phone"), booking_data.get("job_type"),
+            json.dumps(booking_data, default=str), now, now
+        )
+        await self._writes.submit(("save", row))
+
+    async def update(self, booking_id: str, **fields):
+        """Change the status or Calendar fields of a booking; returns once it is committed"""
+        unknown = set(fields) - set(UPDATABLE_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot update booking fields {sorted(unknown)}")
+        await self._writes.submit(("update", (booking_id, fields, time.time())))
+
+    def _load_analytics(self):
+        confirmed = self._db.execute(
+            "SELECT booking_date, job_type, COUNT(*) FROM bookings WHERE status = ? GROUP BY booking_date, job_type",
+            (CONFIRMED,)
+        ).fetchall()
+        for booking_date, job_type, count in confirmed:
+            self.analytics.record_booking(booking_date, job_type, count)
+        contacts = self._db.execute(
+            "SELECT COUNT(DISTINCT email) + SUM(email IS NULL) FROM bookings WHERE status = ?", (CONFIRMED,)
+        ).fetchone()[0]
+        self.analytics.record_contact(contacts or 0)
+
+    async def _write_batch(self, ops: List[Tuple[str, Any]]) -> List[None]:
+        transitions = await self._run(self._apply_ops, ops)
+        # Counters are only touched on the event loop, once the batch is committed
+        if self.analytics is not None:
+            for delta, booking_date, job_type, new_contact in transitions:
+                self.analytics.record_booking(booking_date, job_type, delta)
+                if new_contact:
+                    self.analytics.record_contact(delta)
+        return [None] * len(ops)
+
+    def _apply_ops(self, ops: List[Tuple[str, Any]]) -> List[Transition]:
+        """Apply a batch of writes, in order, in a single transaction; returns the CONFIRMED transitions"""
+        transitions = []
+        with self._db:
+            for op, args in ops:
+                booking_id = args[0]
+                before = self._confirmation_state(booking_id)
+                if op == "save":
+                    self._db.execute(
+                        "INSERT INTO bookings (booking_id, session_id, source, status, booking_date, contact_name, email, "
+                        "phone, job_type, booking_data, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(booking_id) DO UPDATE SET session_id = excluded.session_id, source = excluded.source, "
+                        "status = excluded.status, booking_date = excluded.booking_date, contact_name = excluded.contact_name, "
+                        "email = excluded.email, phone = excluded.phone, job_type = excluded.job_type, "
+                        "booking_data = excluded.booking_data, updated_at = excluded.updated_at",
+                        args
+                    )
+                else:
+                    booking_id, fields, now = args
+                    assignments = ", ".join(f"{field} = ?" for field in fields)
+                    self._db.execute(
+                        f"UPDATE bookings SET {assignments}, updated_at = ? WHERE booking_id = ?",
+                        (*fields.values(), now, booking_id)
+                    )
+                after = self._confirmation_state(booking_id)
+                if before is not None and (after is None or after[:2] != before[:2]):
+                    transitions.append((-1, *before))
+                if after is not None and (before is None or after[:2] != before[:2]):
+                    transitions.append((1, *after))
+        return transitions
+
+    def _confirmation_state(self, booking_id: str) -> Optional[Tuple[Optional[str], Optional[str], bool]]:
+        """(booking_date, job_type, only confirmed booking of its contact) if the booking is CONFIRMED"""
+        row = self._db.execute(
+            "SELECT status, booking_date, job_type, email FROM bookings WHERE booking_id = ?", (booking_id,)
+        ).fetchone()
+        if not row or row["status"] != CONFIRMED:
+            return None
+        sole_booking = row["email"] is None or not self._db.execute(
+            "SELECT 1 FROM bookings WHERE email = ? AND status = ? AND booking_id != ? LIMIT 1",
+            (row["email"], CONFIRMED, booking_id)
+        ).fetchone()
+        return row["booking_date"], row["job_type"], sole_booking
+
+    async def get(self, booking_id: str) -> Optional[Dict[str, Any]]:
+        """A booking by id, or None"""
+        rows = await self._query("SELECT * FROM bookings WHERE booking_id = ?", (booking_id,))
+        return rows[0] if rows else None
+
+    async def list_by_session(self, session_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent bookings made in a chat session"""
+        return await self._query(
+            "SELECT * FROM bookings WHERE session_id = ? ORDER BY created_at DESC LIMIT ?", (session_id, limit)
+        )
+
+    async def list_by_contact(self, email: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent bookings for a contact email"""
+        return await self._query(
+            "SELECT * FROM bookings WHERE email = ? ORDER BY created_at DESC LIMIT ?", (email.lower(), limit)
+        )
+
+    async def list_by_date(self, start_date: str, end_date: str, limit: int = 500) -> List[Dict[str, Any]]:
+        """Bookings taking place between two ISO dates, inclusive"""
+        return await self._query(
+            "SELECT * FROM bookings WHERE booking_date BETWEEN ? AND ? ORDER BY booking_date LIMIT ?",
+            (start_date, end_date, limit)
+        )
+
+    async def _query(self, sql: str, params: tuple) -> List[Dict[str, Any]]:
+        rows = await self._run(lambda: self._db.execute(sql, params).fetchall())
+        return [self._to_dict(row) for row in rows]
+
+    def _to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        booking = dict(row)
+        booking["booking_data"] = json.loads(booking["booking_data"])
+        booking["created_at"] = datetime.fromtimestamp(booking["created_at"]).isoformat()
+        booking["last_updated"] = datetime.fromtimestamp(booking.pop("updated_at")).isoformat()
+        return booking
+
+    @staticmethod
+    def _booking_date(booking_data: Dict[str, Any]) -> Optional[str]:
+        """ISO date the booking takes place, from the chat's chosen slot or a DD/MM/YYYY date"""
+        if booking_data.get("date_iso"):
+            return booking_data["date_iso"]
+        slot = booking_data.get("selected_slot") or {}
+        if slot.get("datetime"):
+            return slot["datetime"][:10]
+        try:
+            return datetime.strptime(booking_data.get("date") or "", "%d/%m/%Y").date().isoformat()
+        except ValueError:
+            return None
+
+    async def close(self):
+        """Commit queued writes and release the database thread"""
+        await self._writes.drain()
+        await self._run(self._db.close)
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Write batching counters"""
+        return {"writes": self._writes.stats()}
+
+
+def sqlite_path(database_url: Optional[str]) -> str:
+    """File path of a sqlite:/// database URL (bookings.db when unset)"""
+    if not database_url:
+        return "bookings.db"
+    if not database_url.startswith("sqlite:///"):
+        raise ValueError(f"Unsupported DATABASE_URL {database_url!r}; only sqlite:/// URLs are supported")
+    return database_url[len("sqlite:///"):]
+
+
+_repository = None
+
+def get_booking_repository() -> BookingRepository:
+    """Get the process-wide booking repository (singleton)"""
+    global _repository
+    if _repository is None:
+        _repository = BookingRepository(
+            sqlite_path(settings.database_url),
+            batch_size=settings.booking_write_batch_size,
+            batch_window_seconds=settings.booking_write_batch_window_ms / 1000,
+            analytics=get_booking_analytics()
+        )
+    return _repository
@@ -1,60 +1,124 @@
 from app.services.openai_service import OpenAIService
 from app.services.google_calendar_service import GoogleCalendarService
+from app.services.answer_extractor import StructuredAnswerExtractor
+from app.services.session_store import SessionStore, InMemorySessionStore
+from app.services.session_events import SessionNotifier
+from app.services.slot_holds import get_slot_hold_ledger
+from app.services.booking_outbox import BookingOutbox, get_booking_outbox
+from app.services.booking_repository import BookingRepository, get_booking_repository, CONFIRMED, FAILED
+from app.services.availability import to_epoch
+from app.models.session import ConversationSession
 from app.models.chat import ConversationState, MessageType
-from typing import Dict, List, Any, Optional
+from collections import OrderedDict
+from typing import Dict, List, Any, Awaitable, Callable, Optional, Tuple
+import asyncio
 import logging
 import re
 from datetime import datetime, timedelta
 
 class BookingBotLogic:
-    def __init__(self, openai_service: OpenAIService):
+    # Number of recent messages sent to OpenAI as conversation context
+    CONTEXT_MESSAGES = 5
+    # Days offered at COLLECTING_DAY, whose slots are prefetched once the duration is known
+    SUGGESTED_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Today", "Tomorrow"]
+    # Sessions with prefetched availability kept in this process
+    MAX_PREFETCH_SESSIONS = 1000
+    # Field each state collects, extracted by OpenAI at temperature 0 when the rule-based fast path misses
+    EXTRACTED_FIELDS = {
+        ConversationState.COLLECTING_JOB_TYPE: "job_type",
+        ConversationState.COLLECTING_DURATION: "duration",
+        ConversationState.COLLECTING_LOCATION: "location",
+        ConversationState.COLLECTING_BUDGET: "budget",
+    }
+    # Outbox job kind for bookings confirmed in the chat
+    OUTBOX_KIND = "chat_booking"
+
+    def __init__(
+        self,
+        openai_service: OpenAIService,
+        calendar_service: Optional[GoogleCalendarService] = None,
+        session_store: Optional[SessionStore] = None,
+        history_size: int = 20,
+        booking_outbox: Optional[BookingOutbox] = None,
+        booking_repository: Optional[BookingRepository] = None
+    ):
         self.openai_service = openai_service
-        self.calendar_service = GoogleCalendarService()
+        self.calendar_service = calendar_service or GoogleCalendarService()
         self.logger = logging.getLogger(__name__)
+        self.answer_extractor = StructuredAnswerExtractor()
+        
+        # Session storage (in-memory by default, Redis-compatible store for multiple workers)
+        self.session_store = session_store or InMemorySessionStore()
+        # Only the last few messages are sent to OpenAI, so history is a bounded ring buffer
+        self.history_size = max(history_size, self.CONTEXT_MESSAGES)
+        # Server push to connected clients (WebSocket transport)
+        self.notifier = SessionNotifier()
+        # Picked timeslots are held until booked so two sessions can't take the same one
+        self.slot_holds = get_slot_hold_ledger()
+        
+        # Calendar writes go through the durable outbox instead of blocking the confirmation
+        self.booking_outbox = booking_outbox or get_booking_outbox()
+        self.booking_outbox.register_handler(self.OUTBOX_KIND, self._write_calendar_booking, on_failure=self._calendar_booking_failed)
+        self.booking_repository = booking_repository or get_booking_repository()
         
-        # In-memory session storage (in production, use Redis or database)
-        self.sessions = {}
+        # Speculative availability lookups: session_id -> (duration, {day: task}).
+        # Tasks can't be serialized into a session store, so they stay process-local.
+        self._prefetches: "OrderedDict[str, Tuple[int, Dict[str, asyncio.Task]]]" = OrderedDict()
+        self.prefetch_hits = 0
+        self.prefetch_misses = 0
+        self.prefetch_wasted = 0
 
     async def process_message(
         self,
         user_message: str,
         session_id: str,
-        conversation_state: Optional[ConversationState] = None
+        conversation_state: Optional[ConversationState] = None,
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None
     ) -> Dict[str, Any]:
+        """Process a user message; on_token receives OpenAI text deltas as they stream in"""
         
         # Initialize session if not exists
-        if session_id not in self.sessions:
-            self.sessions[session_id] = {
-                "conversation_state": ConversationState.GREETING,
-                "booking_data": {},
-                "conversation_history": [],
-                "available_slots": []
-            }
+        session = await self.session_store.get(session_id)
+        if session is None:
+            session = ConversationSession(history_size=self.history_size)
         
-        session = self.sessions[session_id]
-        current_state = conversation_state or session["conversation_state"]
+        try:
+            return await self._process_session_message(user_message, session_id, session, conversation_state, on_token)
+        finally:
+            # Persist the updated session, whichever handler produced the response
+            await self.session_store.set(session_id, session)
+
+    async def _process_session_message(
+        self,
+        user_message: str,
+        session_id: str,
+        session: ConversationSession,
+        conversation_state: Optional[ConversationState],
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        current_state = conversation_state or session.conversation_state
         
         # Handle initial greeting - ask for username first
         if current_state == ConversationState.GREETING:
-            session["conversation_state"] = ConversationState.COLLECTING_CONTACT
+            session.conversation_state = ConversationState.COLLECTING_CONTACT
             return {
                 "message": "👋 Hi! I'm JobBot, your AI booking assistant. I can help you book photography, videography, audio, or other freelance services. What's your name?",
                 "message_type": MessageType.TEXT,
                 "conversation_state": ConversationState.COLLECTING_CONTACT,
-                "booking_data": session["booking_data"],
+                "booking_data": session.booking_data,
                 "suggested_actions": [],
                 "requires_input": True
             }
         
         # Add user message to history (only if not empty)
         if user_message.strip():
-            session["conversation_history"].append({
-                "role": "user",
-                "content": user_message,
-                "timestamp": datetime.now().isoformat()
-            })
+            session.add_message("user", user_message)
         
         try:
+            # Keep the chosen slot held while the user finishes the booking
+            if self._holds_selected_slot(session, current_state) and not await self._refresh_slot_hold(session, session_id):
+                return self._slot_lost_response(session)
+            
             # Handle special cases for day and timeslot selection
             if current_state == ConversationState.COLLECTING_DAY:
                 return await self._handle_day_selection(user_message, session_id, session)
@@ -63,45 +127,54 @@ class BookingBotLogic:
             elif current_state == ConversationState.COLLECTING_CONTACT:
                 return await self._handle_contact_collection(user_message, session_id, session)
             
-            # Get AI response for other states
-            ai_response = await self.openai_service.generate_bot_response(
-                user_message=user_message,
-                conversation_context=session["conversation_history"][-5:],  # Last 5 messages
-                booking_state=current_state.value,
-                booking_data=session["booking_data"]
-            )
+            # Try the deterministic fast path, then cached temperature-0 extraction, before a conversational reply
+            extracted = self.answer_extractor.extract(current_state, user_message)
+            if not extracted and current_state in self.EXTRACTED_FIELDS and user_message.strip():
+                extracted = await self.openai_service.extract_booking_field(user_message, self.EXTRACTED_FIELDS[current_state])
+            if extracted:
+                session.booking_data.update(extracted)
+                next_state = self._determine_next_state(current_state, session.booking_data)
+                bot_message = self._build_fast_path_message(next_state, session.booking_data)
+            else:
+                # Get AI response for other states
+                ai_response = await self._get_ai_response(user_message, current_state, session, on_token)
+                
+                # Update booking data if provided
+                if ai_response.get("booking_data"):
+                    session.booking_data.update(ai_response["booking_data"])
+                
+                # Determine next state
+                next_state = self._determine_next_state(current_state, session.booking_data)
+                bot_message = ai_response["message"]
             
-            # Update booking data if provided
-            if ai_response.get("booking_data"):
-                session["booking_data"].update(ai_response["booking_data"])
+            session.conversation_state = next_state
             
-            # Determine next state
-            next_state = self._determine_next_state(current_state, session["booking_data"])
-            session["conversation_state"] = next_state
+            # The duration is known now, so look up the suggested days while the user decides
+            if next_state == ConversationState.COLLECTING_DAY and current_state != ConversationState.COLLECTING_DAY:
+                self._start_prefetch(session_id, self._parse_duration(session.booking_data.get("duration", "2")))
             
             # Add bot response to history
-            session["conversation_history"].append({
-                "role": "assistant",
-                "content": ai_response["message"],
-                "timestamp": datetime.now().isoformat()
-            })
+            session.add_message("assistant", bot_message)
             
             # Prepare response
             response = {
-                "message": ai_response["message"],
+                "message": bot_message,
                 "message_type": MessageType.TEXT,
                 "conversation_state": next_state,
-                "booking_data": session["booking_data"],
+                "booking_data": session.booking_data,
                 "suggested_actions": self._get_suggested_actions(next_state),
                 "requires_input": True
             }
             
             # Special handling for completion
             if next_state == ConversationState.COMPLETED:
+                # Only book a slot this session still holds
+                if self._holds_selected_slot(session, next_state) and not await self._refresh_slot_hold(session, session_id):
+                    return self._slot_lost_response(session)
                 response["message_type"] = MessageType.CONFIRMATION
                 response["requires_input"] = False
-                # Create the calendar booking
-                await self._create_calendar_booking(session)
+                # Queue the calendar booking; the chat can follow it via booking_id
+                await self._enqueue_calendar_booking(session, session_id)
             
             return response
             
@@ -111,25 +184,44 @@ class BookingBotLogic:
                 "message": "I'm sorry, I encountered an error. Please try again.",
                 "message_type": MessageType.ERROR,
                 "conversation_state": current_state,
-                "booking_data": session["booking_data"],
+                "booking_data": session.booking_data,
                 "suggested_actions": ["Try again"],
                 "requires_input": True
             }
 
-    async def _handle_contact_collection(self, user_message: str, session_id: str, session: Dict[str, Any]) -> Dict[str, Any]:
+    async def _get_ai_response(
+        self,
+        user_message: str,
+        current_state: ConversationState,
+        session: ConversationSession,
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        """Get the OpenAI response, streaming text deltas to on_token when given"""
+        request = {
+            "user_message": user_message,
+            "conversation_context": session.context_messages(self.CONTEXT_MESSAGES),
+            "booking_state": current_state.value,
+            "booking_data": session.booking_data
+        }
+        if on_token:
+            # Tool-call data is assembled from the stream and applied once it ends
+            return await self.openai_service.stream_bot_response(on_token=on_token, **request)
+        return await self.openai_service.generate_bot_response(**request)
+
+    async def _handle_contact_collection(self, user_message: str, session_id: str, session: ConversationSession) -> Dict[str, Any]:
         """Handle contact name collection"""
         try:
             # Store the user's name
-            session["booking_data"]["contact_name"] = user_message.strip()
+            session.booking_data["contact_name"] = user_message.strip()
             
             # Move to job type collection
-            session["conversation_state"] = ConversationState.COLLECTING_JOB_TYPE
+            session.conversation_state = ConversationState.COLLECTING_JOB_TYPE
             
             return {
                 "message": f"Nice to meet you, {user_message.strip()}! 😊 What type of job do you need help with?",
                 "message_type": MessageType.TEXT,
                 "conversation_state": ConversationState.COLLECTING_JOB_TYPE,
-                "booking_data": session["booking_data"],
+                "booking_data": session.booking_data,
                 "suggested_actions": ["Photography", "Videography", "Audio", "Other"],
                 "requires_input": True
             }
@@ -140,70 +232,68 @@ class BookingBotLogic:
                 "message": "Sorry, I didn't catch that. What's your name?",
                 "message_type": MessageType.ERROR,
                 "conversation_state": ConversationState.COLLECTING_CONTACT,
-                "booking_data": session["booking_data"],
+                "booking_data": session.booking_data,
                 "suggested_actions": [],
                 "requires_input": True
             }
 
-    async def _handle_day_selection(self, user_message: str, session_id: str, session: Dict[str, Any]) -> Dict[str, Any]:
+    async def _handle_day_selection(self, user_message: str, session_id: str, session: ConversationSession) -> Dict[str, Any]:
         """Handle day selection and get available slots"""
         try:
             # Store the selected day
-            session["booking_data"]["selected_day"] = user_message
+            session.booking_data["selected_day"] = user_message
             
             # Get duration from booking data or default to 2 hours
-            duration_str = session["booking_data"].get("duration", "2")
-            
-            # Extract numeric value from duration string
-            if isinstance(duration_str, str):
-                # Handle cases like "2 hours", "4 hours", "Full day", etc.
-                if "full day" in duration_str.lower():
-                    duration = 8
-                elif "half day" in duration_str.lower():
-                    duration = 4
-                else:
-                    # Extract first number from string
-                    numbers = re.findall(r'\d+', duration_str)
-                    duration = int(numbers[0]) if numbers else 2
-            else:
-                duration = int(duration_str)
+            duration_str = session.booking_data.get("duration", "2")
+            duration = self._parse_duration(duration_str)
             
             self.logger.info(f"Parsed duration: {duration} hours from '{duration_str}'")
             
-            # Get available slots for the selected day
-            slots_result = await self.calendar_service.get_available_slots(
-                day_input=user_message,
-                duration_hours=duration
-            )
+            # Get available slots for the selected day, prefetched if possible
+            slots_result = await self._take_prefetched_slots(session_id, user_message, duration)
+            if slots_result is None:
+                slots_result = await self.calendar_service.get_available_slots(
+                    day_input=user_message,
+                    duration_hours=duration,
+                    session_id=session_id
+                )
             
             if not slots_result["success"]:
                 return {
                     "message": f"Sorry, I couldn't find available slots for {user_message}. {slots_result.get('error', '')} Please try another day.",
                     "message_type": MessageType.ERROR,
                     "conversation_state": ConversationState.COLLECTING_DAY,
-                    "booking_data": session["booking_data"],
+                    "booking_data": session.booking_data,
                     "suggested_actions": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"],
                     "requires_input": True
                 }
             
             # Store available slots
-            session["available_slots"] = slots_result["available_slots"]
-            session["booking_data"]["booking_date"] = slots_result["date"]
-            session["booking_data"]["date_iso"] = slots_result["date_iso"]
-            session["booking_data"]["duration_hours"] = duration  # Store parsed duration
+            session.set_slots(slots_result["available_slots"], duration)
+            session.booking_data["booking_date"] = slots_result["date"]
+            session.booking_data["date_iso"] = slots_result["date_iso"]
+            session.booking_data["duration_hours"] = duration  # Store parsed duration
+            
+            await self.notifier.publish(session_id, "slots", {
+                "date": slots_result["date"],
+                "date_iso": slots_result["date_iso"],
+                "duration_hours": duration,
+                "available_slots": slots_result["available_slots"]
+            })
             
             if not slots_result["available_slots"]:
                 return {
                     "message": f"Unfortunately, there are no available {duration}-hour slots on {slots_result['date']}. Please try another day.",
                     "message_type": MessageType.TEXT,
                     "conversation_state": ConversationState.COLLECTING_DAY,
-                    "booking_data": session["booking_data"],
+                    "booking_data": session.booking_data,
                     "suggested_actions": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"],
                     "requires_input": True
                 }
             
-            # Move to timeslot selection
-            session["conversation_state"] = ConversationState.COLLECTING_TIMESLOT
+            # Move to timeslot selection; the other prefetched days are no longer needed
+            session.conversation_state = ConversationState.COLLECTING_TIMESLOT
+            self._discard_prefetch(session_id)
             
             slot_options = [slot["display"] for slot in slots_result["available_slots"]]
             
@@ -211,7 +301,7 @@ class BookingBotLogic:
                 "message": f"Great! Here are the available {duration}-hour slots for {slots_result['date']}:",
                 "message_type": MessageType.TIMESLOT_SELECTION,
                 "conversation_state": ConversationState.COLLECTING_TIMESLOT,
-                "booking_data": session["booking_data"],
+                "booking_data": session.booking_data,
                 "available_slots": slots_result["available_slots"],
                 "suggested_actions": slot_options,
                 "requires_input": True
@@ -223,21 +313,78 @@ class BookingBotLogic:
                 "message": "Sorry, I encountered an error checking availability. Please try again.",
                 "message_type": MessageType.ERROR,
                 "conversation_state": ConversationState.COLLECTING_DAY,
-                "booking_data": session["booking_data"],
+                "booking_data": session.booking_data,
                 "suggested_actions": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"],
                 "requires_input": True
             }
 
-    async def _handle_timeslot_selection(self, user_message: str, session_id: str, session: Dict[str, Any]) -> Dict[str, Any]:
+    def _parse_duration(self, duration_str: Any) -> int:
+        """Extract the duration in hours from values like '2 hours', '4' or 'Full day'"""
+        if not isinstance(duration_str, str):
+            return int(duration_str)
+        if "full day" in duration_str.lower():
+            return 8
+        if "half day" in duration_str.lower():
+            return 4
+        # Extract first number from string
+        numbers = re.findall(r'\d+', duration_str)
+        return int(numbers[0]) if numbers else 2
+
+    def _start_prefetch(self, session_id: str, duration: int):
+        """Start background slot lookups for the suggested days"""
+        self._discard_prefetch(session_id)
+        tasks = {
+            day.lower(): asyncio.create_task(
+                self.calendar_service.get_available_slots(day_input=day, duration_hours=duration, session_id=session_id)
+            )
+            for day in self.SUGGESTED_DAYS
+        }
+        self._prefetches[session_id] = (duration, tasks)
+        
+        while len(self._prefetches) > self.MAX_PREFETCH_SESSIONS:
+            oldest_session_id = next(iter(self._prefetches))
+            self._discard_prefetch(oldest_session_id)
+
+    async def _take_prefetched_slots(self, session_id: str, day_input: str, duration: int) -> Optional[Dict[str, Any]]:
+        """Get the prefetched slots for a day, or None if it wasn't prefetched"""
+        prefetch = self._prefetches.get(session_id)
+        task = prefetch[1].pop(day_input.strip().lower(), None) if prefetch and prefetch[0] == duration else None
+        if task is None:
+            self.prefetch_misses += 1
+            return None
+        
+        # Still running is fine: it started earlier than a fresh lookup would
+        try:
+            slots_result = await task
+        except asyncio.CancelledError:
+            slots_result = None
+        if not slots_result or not slots_result["success"]:
+            self.prefetch_misses += 1
+            return None
+        
+        self.prefetch_hits += 1
+        return slots_result
+
+    def _discard_prefetch(self, session_id: str):
+        """Drop a session's unused prefetches, counting them as wasted"""
+        prefetch = self._prefetches.pop(session_id, None)
+        if not prefetch:
+            return
+        for task in prefetch[1].values():
+            task.cancel()
+            self.prefetch_wasted += 1
+
+    async def _handle_timeslot_selection(self, user_message: str, session_id: str, session: ConversationSession) -> Dict[str, Any]:
         """Handle timeslot selection"""
         try:
             # Find the selected slot with more robust matching
             selected_slot = None
             user_input = user_message.strip()
             
-            self.logger.info(f"Looking for timeslot: '{user_input}' in available slots: {[slot['display'] for slot in session['available_slots']]}")
+            available_slots = session.slot_dicts()
+            self.logger.info(f"Looking for timeslot: '{user_input}' in available slots: {[slot['display'] for slot in available_slots]}")
             
-            for slot in session["available_slots"]:
+            for slot in available_slots:
                 slot_display = slot["display"]
                 
                 # Try exact match first
@@ -274,27 +421,46 @@ class BookingBotLogic:
                     "message": "I couldn't find that time slot. Please select from the available options:",
                     "message_type": MessageType.TIMESLOT_SELECTION,
                     "conversation_state": ConversationState.COLLECTING_TIMESLOT,
-                    "booking_data": session["booking_data"],
-                    "available_slots": session["available_slots"],
-                    "suggested_actions": [slot["display"] for slot in session["available_slots"]],
+                    "booking_data": session.booking_data,
+                    "available_slots": available_slots,
+                    "suggested_actions": [slot["display"] for slot in available_slots],
                     "requires_input": True
                 }
             
             self.logger.info(f"Successfully matched timeslot: {selected_slot['display']}")
             
+            # Reserve the slot now; another session may have taken it since the list was shown
+            previous_slot = session.booking_data.get("selected_slot")
+            if previous_slot and previous_slot["datetime"] != selected_slot["datetime"]:
+                await self._release_slot_hold(session, session_id)
+            slot_start, slot_end = self._slot_bounds(session, selected_slot)
+            if not await self.slot_holds.hold(self.calendar_service.CALENDAR_ID, slot_start, slot_end, session_id):
+                self.logger.info(f"Timeslot {selected_slot['display']} is held by another session")
+                session.slots = [slot for slot in session.slots if slot[0] != slot_start]
+                remaining_slots = session.slot_dicts()
+                return {
+                    "message": f"Sorry, {selected_slot['display']} was just taken by someone else. Please pick another time:",
+                    "message_type": MessageType.TIMESLOT_SELECTION,
+                    "conversation_state": ConversationState.COLLECTING_TIMESLOT,
+                    "booking_data": session.booking_data,
+                    "available_slots": remaining_slots,
+                    "suggested_actions": [slot["display"] for slot in remaining_slots],
+                    "requires_input": True
+                }
+            
             # Store the selected slot
-            session["booking_data"]["selected_slot"] = selected_slot
-            session["booking_data"]["selected_time"] = selected_slot["display"]
+            session.booking_data["selected_slot"] = selected_slot
+            session.booking_data["selected_time"] = selected_slot["display"]
             
             # Move to next state (location collection)
             next_state = ConversationState.COLLECTING_LOCATION
-            session["conversation_state"] = next_state
+            session.conversation_state = next_state
             
             return {
-                "message": f"Perfect! I've reserved {selected_slot['display']} on {session['booking_data']['booking_date']} for you. Now, where would you like the {session['booking_data']['job_type'].lower()} session to take place?",
+                "message": f"Perfect! I've reserved {selected_slot['display']} on {session.booking_data['booking_date']} for you. Now, where would you like the {session.booking_data['job_type'].lower()} session to take place?",
                 "message_type": MessageType.TEXT,
                 "conversation_state": next_state,
-                "booking_data": session["booking_data"],
+                "booking_data": session.booking_data,
                 "suggested_actions": self._get_suggested_actions(next_state),
                 "requires_input": True
             }
@@ -305,27 +471,100 @@ class BookingBotLogic:
                 "message": "Sorry, I encountered an error selecting the time slot. Please try again.",
                 "message_type": MessageType.ERROR,
                 "conversation_state": ConversationState.COLLECTING_TIMESLOT,
-                "booking_data": session["booking_data"],
-                "available_slots": session["available_slots"],
-                "suggested_actions": [slot["display"] for slot in session["available_slots"]],
+                "booking_data": session.booking_data,
+                "available_slots": session.slot_dicts(),
+                "suggested_actions": [slot["display"] for slot in session.slot_dicts()],
                 "requires_input": True
             }
 
-    async def _create_calendar_booking(self, session: Dict[str, Any]) -> bool:
-        """Create the calendar booking when booking is completed"""
+    async def _enqueue_calendar_booking(self, session: ConversationSession, session_id: str) -> Optional[str]:
+        """Store the completed booking and durably queue its calendar write"""
         try:
-            if "selected_slot" in session["booking_data"]:
-                booking_result = await self.calendar_service.create_booking(session["booking_data"])
-                if booking_result["success"]:
-                    session["booking_data"]["calendar_event"] = booking_result
-                    self.logger.info(f"Calendar booking created: {booking_result.get('event_id')}")
-                    return True
-                else:
-                    self.logger.error(f"Failed to create calendar booking: {booking_result.get('error')}")
-            return False
+            if "selected_slot" in session.booking_data and "booking_id" not in session.booking_data:
+                booking_id = self.booking_outbox.new_booking_id()
+                # Stored before queueing so the calendar result always finds the booking to update
+                await self.booking_repository.save(booking_id, session.booking_data, session_id=session_id, source="chat")
+                await self.booking_outbox.enqueue(
+                    self.OUTBOX_KIND,
+                    {"session_id": session_id, "booking_data": session.booking_data},
+                    session_id=session_id,
+                    booking_id=booking_id
+                )
+                session.booking_data["booking_id"] = booking_id
+                self.logger.info(f"Calendar booking queued: {booking_id}")
+                return booking_id
+            return None
         except Exception as e:
-            self.logger.error(f"Error creating calendar booking: {str(e)}")
-            return False
+            self.logger.error(f"Error queueing calendar booking: {str(e)}")
+            return None
+
+    async def _write_calendar_booking(self, payload: Dict[str, Any], booking_id: str) -> Dict[str, Any]:
+        """Outbox handler: create the calendar event, using the booking id as its event id"""
+        booking_result = await self.calendar_service.create_booking(payload["booking_data"], event_id=booking_id)
+        if booking_result["success"]:
+            self.logger.info(f"Calendar booking created: {booking_result.get('event_id')}")
+            await self.booking_repository.update(
+                booking_id,
+                status=CONFIRMED,
+                event_id=booking_result.get("event_id"),
+                event_link=booking_result.get("event_link"),
+                error=None
+            )
+            # The calendar event blocks the slot from now on
+            await self._release_slot_hold(ConversationSession(booking_data=payload["booking_data"]), payload["session_id"])
+        else:
+            self.logger.error(f"Failed to create calendar booking: {booking_result.get('error')}")
+        return booking_result
+
+    async def _calendar_booking_failed(self, payload: Dict[str, Any], booking_id: str, error: str):
+        """Outbox failure handler: mark the booking failed and free its slot"""
+        await self.booking_repository.update(booking_id, status=FAILED, error=error)
+        await self._release_slot_hold(ConversationSession(booking_data=payload["booking_data"]), payload["session_id"])
+
+    def _slot_bounds(self, session: ConversationSession, slot: Dict[str, str]) -> Tuple[float, float]:
+        """Start and end (epoch seconds) of a chosen slot"""
+        slot_start = to_epoch(datetime.fromisoformat(slot["datetime"]))
+        duration = session.booking_data.get("duration_hours") or self._parse_duration(session.booking_data.get("duration", "2"))
+        return slot_start, slot_start + duration * 3600
+
+    def _holds_selected_slot(self, session: ConversationSession, state: ConversationState) -> bool:
+        """Whether the session should be holding its selected slot in this state"""
+        return (
+            "selected_slot" in session.booking_data
+            and "booking_id" not in session.booking_data
+            and state != ConversationState.COLLECTING_TIMESLOT
+        )
+
+    async def _refresh_slot_hold(self, session: ConversationSession, session_id: str) -> bool:
+        """Extend the hold on the session's selected slot; False if the session no longer holds it"""
+        slot_start, slot_end = self._slot_bounds(session, session.booking_data["selected_slot"])
+        return await self.slot_holds.extend(self.calendar_service.CALENDAR_ID, slot_start, slot_end, session_id)
+
+    def _slot_lost_response(self, session: ConversationSession) -> Dict[str, Any]:
+        """Send the user back to slot selection after their hold expired or was taken"""
+        lost_slot = session.booking_data.pop("selected_slot")
+        session.booking_data.pop("selected_time", None)
+        slot_start = to_epoch(datetime.fromisoformat(lost_slot["datetime"]))
+        session.slots = [slot for slot in session.slots if slot[0] != slot_start]
+        session.conversation_state = ConversationState.COLLECTING_TIMESLOT
+        remaining_slots = session.slot_dicts()
+        self.logger.info(f"Hold on {lost_slot['display']} was lost before booking")
+        return {
+            "message": f"Sorry, the hold on {lost_slot['display']} expired and the slot is no longer reserved for you. Please pick another time:",
+            "message_type": MessageType.TIMESLOT_SELECTION,
+            "conversation_state": ConversationState.COLLECTING_TIMESLOT,
+            "booking_data": session.booking_data,
+            "available_slots": remaining_slots,
+            "suggested_actions": [slot["display"] for slot in remaining_slots],
+            "requires_input": True
+        }
+
+    async def _release_slot_hold(self, session: ConversationSession, session_id: str):
+        """Release the hold on the session's selected slot, if any"""
+        selected_slot = session.booking_data.get("selected_slot")
+        if selected_slot:
+            slot_start, slot_end = self._slot_bounds(session, selected_slot)
+            await self.slot_holds.release(self.calendar_service.CALENDAR_ID, slot_start, slot_end, session_id)
 
     def _determine_next_state(self, current_state: ConversationState, booking_data: Dict[str, Any]) -> ConversationState:
         """Determine the next conversation state based on current state and collected data"""
@@ -362,6 +601,29 @@ class BookingBotLogic:
         
         return state_flow.get(current_state, ConversationState.COMPLETED)
 
+    def _build_fast_path_message(self, next_state: ConversationState, booking_data: Dict[str, Any]) -> str:
+        """Build the bot reply for an answer handled without OpenAI"""
+        name = booking_data.get("contact_name", "")
+        
+        if next_state == ConversationState.COLLECTING_DURATION:
+            return f"Great choice, {name}! How long will the {booking_data['job_type'].lower()} job take?"
+        if next_state == ConversationState.COLLECTING_DAY:
+            return f"Got it, {booking_data['duration'].lower()}. Which day works best for you?"
+        if next_state == ConversationState.COLLECTING_BUDGET:
+            return f"{booking_data['location']} it is! 📍 What's your budget range?"
+        if next_state == ConversationState.CONFIRMING_DETAILS:
+            return (
+                f"Thanks, {name}! Here's a summary of your booking:\n\n"
+                f"• Job Type: {booking_data.get('job_type', 'Not specified')}\n"
+                f"• Date: {booking_data.get('booking_date', 'Not specified')}\n"
+                f"• Time: {booking_data.get('selected_time', 'Not specified')}\n"
+                f"• Duration: {booking_data.get('duration', 'Not specified')}\n"
+                f"• Location: {booking_data.get('location', 'Not specified')}\n"
+                f"• Budget: {booking_data.get('budget', 'Not specified')}\n\n"
+                "Shall I confirm this booking?"
+            )
+        return "Got it! What else can I help you with?"
+
     def _get_suggested_actions(self, state: ConversationState) -> List[str]:
         """Get suggested actions based on current conversation state"""
         
@@ -380,13 +642,41 @@ class BookingBotLogic:
         
         return suggestions.get(state, [])
 
-    def reset_session(self, session_id: str) -> bool:
+    async def reset_session(self, session_id: str) -> bool:
         """Reset a conversation session"""
-        if session_id in self.sessions:
-            del self.sessions[session_id]
-            return True
-        return False
+        self._discard_prefetch(session_id)
+        session = await self.session_store.get(session_id)
+        if session and "booking_id" not in session.booking_data:
+            await self._release_slot_hold(session, session_id)
+        return await self.session_store.delete(session_id)
 
-    def get_session_data(self, session_id: str) -> Optional[Dict[str, Any]]:
+    async def get_session_data(self, session_id: str) -> Optional[ConversationSession]:
         """Get session data for a given session ID"""
-        return self.sessions.get(session_id) 
\ No newline at end of file
+        return await self.session_store.get(session_id)
+
+    async def get_session_bookings(self, session_id: str) -> List[Dict[str, Any]]:
+        """Bookings made in a session, most recent first, from the booking store"""
+        return await self.booking_repository.list_by_session(session_id)
+
+    def _prefetch_stats(self) -> Dict[str, Any]:
+        total = self.prefetch_hits + self.prefetch_misses
+        return {
+            "active_sessions": len(self._prefetches),
+            "hits": self.prefetch_hits,
+            "misses": self.prefetch_misses,
+            "wasted": self.prefetch_wasted,
+            "hit_rate": round(self.prefetch_hits / total, 4) if total else 0.0
+        }
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Get counters for monitoring the bot"""
+        return {
+            "sessions": self.session_store.stats(),
+            "fast_path": self.answer_extractor.stats(),
+            "prefetch": self._prefetch_stats(),
+            "slot_holds": self.slot_holds.stats(),
+            "booking_outbox": await self.booking_outbox.stats(),
+            "booking_repository": self.booking_repository.stats(),
+            "completion_cache": self.openai_service.cache.stats() if self.openai_service.cache else None,
+            "prompt_tokens": self.openai_service.token_budget.stats()
+        } 
\ No newline at end of file
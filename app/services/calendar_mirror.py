@@ -0,0 +1,376 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+from googleapiclient.errors import HttpError
+from app.core.config import settings
+from app.services.availability import BusyIntervalIndex, event_interval, from_epoch, to_epoch
+from app.services.availability_cache import get_availability_cache
+from app.services.calendar_transport import get_calendar_transport
+import asyncio
+import json
+import logging
+import pytz
+import sqlite3
+import time
+import uuid
+
+class CalendarMirror:
+    """Local copy of a calendar's events, kept current with incremental sync tokens.
+
+    A full sync loads the events from a day ago up to the booking horizon; later syncs
+    only fetch what changed since the last nextSyncToken. If Google expires the token
+    (HTTP 410), or the window has slid by a day, the mirror reloads from scratch.
+    Availability inside the window is then answered from a local BusyIntervalIndex
+    for as long as the mirror is fresh; once syncs stop succeeding it reports
+    itself not ready and callers fall back to live freebusy queries.
+    """
+
+    # Consecutive failed syncs after which the mirror stops answering availability
+    MAX_CONSECUTIVE_ERRORS = 3
+    # How far back a full sync reaches, and how old its window may get before the next one
+    WINDOW_SLACK_SECONDS = 86400
+
+    def __init__(self, calendar_id: str = 'primary', db_path: Optional[str] = None, horizon_days: int = 90):
+        self.calendar_id = calendar_id
+        self.horizon_days = horizon_days
+        self.logger = logging.getLogger(__name__)
+        self.events: Dict[str, Dict[str, Any]] = {}
+        self.index = BusyIntervalIndex()
+        self.sync_token: Optional[str] = None
+        # When the last full sync ran; its window is [at - WINDOW_SLACK_SECONDS, at + horizon_days]
+        self.window_synced_at: Optional[float] = None
+        self.last_sync: Optional[float] = None
+        self.full_syncs = 0
+        self.incremental_syncs = 0
+        self.sync_errors = 0
+        self.consecutive_errors = 0
+        self.watch_errors = 0
+        # Longest time the mirror may go without a successful sync; start() sets it to 2x the poll interval
+        self.max_staleness = 600.0
+
+        self._loaded = False
+        self._fresh_at: Optional[float] = None
+
+        self._service = None
+        self._lock = asyncio.Lock()
+        self._sync_requested = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._channel: Optional[Dict[str, Any]] = None
+
+        # SQLite runs on its own thread so disk writes never block the event loop
+        self._db = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if db_path:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="calendar-mirror-db")
+            self._db = self._executor.submit(self._connect, db_path).result()
+            self._load_from_disk()
+
+    @staticmethod
+    def _connect(db_path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(db_path)
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS mirror_events (calendar_id TEXT NOT NULL, event_id TEXT NOT NULL, "
+            "body TEXT NOT NULL, PRIMARY KEY (calendar_id, event_id))"
+        )
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS mirror_sync_state (calendar_id TEXT PRIMARY KEY, sync_token TEXT, "
+            "window_synced_at REAL)"
+        )
+        # Mirror files created before full syncs were windowed
+        columns = {row[1] for row in db.execute("PRAGMA table_info(mirror_sync_state)")}
+        if "window_synced_at" not in columns:
+            db.execute("ALTER TABLE mirror_sync_state ADD COLUMN window_synced_at REAL")
+        db.commit()
+        return db
+
+    async def _run_db(self, fn, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _load_from_disk(self):
+        """Restore the last mirrored state so startup only needs an incremental sync"""
+        sync_token, window_synced_at, events = self._executor.submit(self._read_disk).result()
+        # A mirror saved without its window is reloaded by the first sync
+        if not sync_token or window_synced_at is None:
+            return
+
+        for event in events:
+            self.events[event['id']] = event
+        self.sync_token = sync_token
+        self.window_synced_at = window_synced_at
+        self._rebuild_index()
+        self._mark_fresh()
+        self.logger.info(f"Loaded {len(self.events)} mirrored events for {self.calendar_id} from disk")
+
+    def _read_disk(self) -> Tuple[Optional[str], Optional[float], List[Dict[str, Any]]]:
+        row = self._db.execute(
+            "SELECT sync_token, window_synced_at FROM mirror_sync_state WHERE calendar_id = ?", (self.calendar_id,)
+        ).fetchone()
+        if not row or not row[0]:
+            return None, None, []
+        events = [
+            json.loads(body)
+            for (body,) in self._db.execute("SELECT body FROM mirror_events WHERE calendar_id = ?", (self.calendar_id,))
+        ]
+        return row[0], row[1], events
+
+    @property
+    def ready(self) -> bool:
+        """Whether availability can be answered from the mirror without going stale"""
+        if not self._loaded or self._fresh_at is None:
+            return False
+        if self.consecutive_errors >= self.MAX_CONSECUTIVE_ERRORS:
+            return False
+        return time.time() - self._fresh_at <= self.max_staleness
+
+    def covers(self, range_start: datetime, range_end: datetime) -> bool:
+        """Whether a time range lies inside the window the last full sync loaded"""
+        if self.window_synced_at is None:
+            return False
+        window_start = self.window_synced_at - self.WINDOW_SLACK_SECONDS
+        window_end = self.window_synced_at + timedelta(days=self.horizon_days).total_seconds()
+        return window_start <= to_epoch(range_start) and to_epoch(range_end) <= window_end
+
+    def _window_expired(self) -> bool:
+        return self.window_synced_at is None or time.time() - self.window_synced_at > self.WINDOW_SLACK_SECONDS
+
+    def _mark_fresh(self):
+        self._loaded = True
+        self._fresh_at = time.time()
+        self.consecutive_errors = 0
+
+    async def start(self, service, poll_seconds: float = 300, webhook_url: Optional[str] = None, webhook_token: Optional[str] = None):
+        """Run the initial sync, then keep the mirror current in the background"""
+        self._service = service
+        self.max_staleness = 2 * poll_seconds
+        await self.sync()
+        self._task = asyncio.create_task(self._run(poll_seconds, webhook_url, webhook_token))
+
+    async def stop(self):
+        """Stop background syncing, release the push channel and close the disk store"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._channel and self._service is not None:
+            try:
+                await get_calendar_transport().execute(
+                    self._service.channels().stop(
+                        body={"id": self._channel["id"], "resourceId": self._channel["resource_id"]}
+                    )
+                )
+            except Exception as e:
+                self.logger.warning(f"Error stopping calendar watch channel: {str(e)}")
+            self._channel = None
+
+        if self._db is not None:
+            await self._run_db(self._db.close)
+            self._db = None
+            self._executor.shutdown(wait=False)
+
+    def request_sync(self):
+        """Ask the background loop to sync now (e.g. on a push notification)"""
+        self._sync_requested.set()
+
+    async def _run(self, poll_seconds: float, webhook_url: Optional[str], webhook_token: Optional[str]):
+        while True:
+            if webhook_url:
+                # A failing watch registration must never stop the polling sync below
+                try:
+                    await self._ensure_watch_channel(webhook_url, webhook_token)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.watch_errors += 1
+                    self.logger.error(f"Error registering calendar watch channel: {str(e)}")
+            try:
+                try:
+                    # Push notifications wake the loop early; polling is the fallback
+                    await asyncio.wait_for(self._sync_requested.wait(), timeout=poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._sync_requested.clear()
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Calendar mirror loop error: {str(e)}")
+                await asyncio.sleep(min(poll_seconds, 30))
+
+    async def sync(self) -> bool:
+        """Fetch changes since the last sync (or everything on the first run)"""
+        if self._service is None:
+            return False
+
+        async with self._lock:
+            try:
+                try:
+                    await self._sync_pages(full=self.sync_token is None or self._window_expired())
+                except HttpError as e:
+                    if e.resp.status != 410:
+                        raise
+                    # Sync token expired: discard the mirror and reload everything
+                    self.logger.warning(f"Sync token for {self.calendar_id} expired, running a full sync")
+                    self.sync_token = None
+                    await self._sync_pages(full=True)
+
+                self._mark_fresh()
+                self.last_sync = time.time()
+                return True
+            except Exception as e:
+                self.sync_errors += 1
+                self.consecutive_errors += 1
+                self.logger.error(f"Error syncing calendar mirror: {str(e)}")
+                return False
+
+    async def _sync_pages(self, full: bool):
+        transport = get_calendar_transport()
+        changed = {}
+        page_token = None
+        sync_token = None
+        window_synced_at = time.time()
+
+        while True:
+            params = {"calendarId": self.calendar_id, "singleEvents": True, "pageToken": page_token}
+            if full:
+                # Google keeps applying this window to the incremental syncs that follow
+                params["showDeleted"] = False
+                params["timeMin"] = datetime.fromtimestamp(window_synced_at - self.WINDOW_SLACK_SECONDS, pytz.UTC).isoformat()
+                params["timeMax"] = (
+                    datetime.fromtimestamp(window_synced_at, pytz.UTC) + timedelta(days=self.horizon_days)
+                ).isoformat()
+            else:
+                params["syncToken"] = self.sync_token
+            result = await transport.execute(self._service.events().list(**params))
+
+            for event in result.get('items', []):
+                changed[event['id']] = event
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                sync_token = result.get('nextSyncToken')
+                break
+
+        if full:
+            previous = self.events
+            self.events = {}
+            self._invalidate_days(previous.values())
+            self.window_synced_at = window_synced_at
+            self.full_syncs += 1
+        else:
+            self.incremental_syncs += 1
+
+        for event_id, event in changed.items():
+            self._apply(event)
+
+        self.sync_token = sync_token
+        self._rebuild_index()
+        if self._db is not None:
+            await self._run_db(self._persist, full, self._changed_rows(changed), self.sync_token, self.window_synced_at)
+
+    def upsert(self, event: Dict[str, Any]):
+        """Apply an event this process just wrote, without waiting for the next sync"""
+        self._apply(event)
+        self._rebuild_index()
+        if self._db is not None:
+            # Queued behind any sync write on the database thread, so writes land in order
+            self._executor.submit(
+                self._persist, False, self._changed_rows({event['id']: event}), self.sync_token, self.window_synced_at
+            )
+
+    def _apply(self, event: Dict[str, Any]):
+        """Insert, update or delete one event, invalidating cached availability for its days"""
+        previous = self.events.pop(event['id'], None)
+        if previous:
+            self._invalidate_days([previous])
+        if event.get('status') != 'cancelled':
+            self.events[event['id']] = event
+            self._invalidate_days([event])
+
+    def _invalidate_days(self, events):
+        cache = get_availability_cache()
+        for event in events:
+            interval = event_interval(event)
+            if interval:
+                cache.invalidate_range(self.calendar_id, from_epoch(interval.start), from_epoch(interval.end))
+
+    def _rebuild_index(self):
+        self.index = BusyIntervalIndex.from_events(self.events.values())
+
+    def _changed_rows(self, changed: Dict[str, Dict[str, Any]]) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+        """Pair each changed event id with the event to store, or None if it was removed"""
+        return [(event_id, self.events.get(event_id)) for event_id in changed]
+
+    def _persist(
+        self,
+        full: bool,
+        rows: List[Tuple[str, Optional[Dict[str, Any]]]],
+        sync_token: Optional[str],
+        window_synced_at: Optional[float]
+    ):
+        try:
+            if full:
+                self._db.execute("DELETE FROM mirror_events WHERE calendar_id = ?", (self.calendar_id,))
+            for event_id, event in rows:
+                if event is not None:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO mirror_events (calendar_id, event_id, body) VALUES (?, ?, ?)",
+                        (self.calendar_id, event_id, json.dumps(event))
+                    )
+                else:
+                    self._db.execute(
+                        "DELETE FROM mirror_events WHERE calendar_id = ? AND event_id = ?", (self.calendar_id, event_id)
+                    )
+            self._db.execute(
+                "INSERT OR REPLACE INTO mirror_sync_state (calendar_id, sync_token, window_synced_at) VALUES (?, ?, ?)",
+                (self.calendar_id, sync_token, window_synced_at)
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error persisting calendar mirror: {str(e)}")
+
+    async def _ensure_watch_channel(self, webhook_url: str, webhook_token: Optional[str]):
+        """Register (or renew before it expires) a push notification channel for the calendar"""
+        if self._channel and self._channel["expires_at"] - time.time() > 3600:
+            return
+
+        body = {"id": str(uuid.uuid4()), "type": "web_hook", "address": webhook_url}
+        if webhook_token:
+            body["token"] = webhook_token
+        channel = await get_calendar_transport().execute(
+            self._service.events().watch(calendarId=self.calendar_id, body=body)
+        )
+        # Expiration is in milliseconds; Google defaults to about a week
+        expires_at = int(channel.get('expiration', 0)) / 1000 or time.time() + timedelta(days=7).total_seconds()
+        self._channel = {"id": channel.get('id'), "resource_id": channel.get('resourceId'), "expires_at": expires_at}
+        self.logger.info(f"Watching {self.calendar_id} for changes until {datetime.fromtimestamp(expires_at)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and sync counters of the mirror"""
+        return {
+            "ready": self.ready,
+            "events": len(self.events),
+            "last_sync": datetime.fromtimestamp(self.last_sync).isoformat() if self.last_sync else None,
+            "full_syncs": self.full_syncs,
+            "incremental_syncs": self.incremental_syncs,
+            "sync_errors": self.sync_errors,
+            "consecutive_errors": self.consecutive_errors,
+            "watch_errors": self.watch_errors,
+            "watching": self._channel is not None,
+            "disk_backend": self._db is not None
+        }
+
+
+_mirror = None
+
+def get_calendar_mirror() -> Optional[CalendarMirror]:
+    """Get the process-wide calendar mirror, or None when it's disabled"""
+    global _mirror
+    if _mirror is None and settings.calendar_mirror_enabled:
+        _mirror = CalendarMirror(
+            db_path=settings.calendar_mirror_path,
+            horizon_days=settings.calendar_mirror_horizon_days
+        )
+    return _mirror
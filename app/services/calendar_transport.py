@@ -0,0 +1,71 @@
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+import google_auth_httplib2
+import httplib2
+from app.core.config import settings
+
+class CalendarTransport:
+    """Runs blocking googleapiclient requests on a bounded thread pool"""
+
+    def __init__(self, max_concurrency: int = 10):
+        self.max_concurrency = max_concurrency
+        self.logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix="gcal-transport"
+        )
+        # httplib2 connections are not thread-safe, so each worker gets its own
+        self._local = threading.local()
+
+    async def execute(self, request, auth_from=None, **kwargs) -> Any:
+        """Execute a googleapiclient request without blocking the event loop.
+
+        A BatchHttpRequest has no connection of its own, so pass one of the calls
+        added to it as auth_from to run the batch with that call's credentials.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            functools.partial(self._execute, request, auth_from, **kwargs)
+        )
+
+    def _execute(self, request, auth_from=None, **kwargs) -> Any:
+        request_http = getattr(request, 'http', None) or getattr(auth_from, 'http', None)
+        http = self._thread_http(request_http)
+        if http is not None:
+            kwargs['http'] = http
+        return request.execute(**kwargs)
+
+    def _thread_http(self, request_http) -> Optional[google_auth_httplib2.AuthorizedHttp]:
+        """Get this worker thread's authorized connection for the request's credentials"""
+        credentials = getattr(request_http, 'credentials', None)
+        if credentials is None:
+            return None
+
+        connections: Dict[int, google_auth_httplib2.AuthorizedHttp] = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+
+        http = connections.get(id(credentials))
+        if http is None:
+            http = google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http())
+            connections[id(credentials)] = http
+        return http
+
+    def shutdown(self):
+        """Stop the worker threads"""
+        self._executor.shutdown(wait=False)
+
+
+_transport = None
+
+def get_calendar_transport() -> CalendarTransport:
+    """Get the process-wide calendar transport (singleton)"""
+    global _transport
+    if _transport is None:
+        _transport = CalendarTransport(max_concurrency=settings.calendar_max_concurrency)
+    return _transport
@@ -0,0 +1,130 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+
+class CompletionCache:
+    """LRU cache of parsed OpenAI completions with TTL and an optional on-disk SQLite backend.
+
+    The SQLite backend runs on a dedicated thread: reads are awaited there and
+    writes are handed off without waiting, so the event loop never blocks on disk.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 3600, disk_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.logger = logging.getLogger(__name__)
+        # key -> (expires_at, value), least recently used first
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._db = None
+        self._executor = None
+        if disk_path:
+            # One thread owns the connection; every query is serialized on it
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="completion-cache")
+            self._db = self._executor.submit(self._connect, disk_path).result()
+
+    @staticmethod
+    def _connect(disk_path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(disk_path)
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS completions (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS idx_completions_expires_at ON completions (expires_at)")
+        db.commit()
+        return db
+
+    @staticmethod
+    def make_key(messages: List[Dict[str, Any]], model: str, tools: Optional[List[Dict[str, Any]]] = None, **params: Any) -> str:
+        """Hash the normalized request; whitespace differences in prompts don't change the key"""
+        normalized = {
+            "model": model,
+            "messages": [
+                {"role": message["role"], "content": " ".join(str(message.get("content") or "").split())}
+                for message in messages
+            ],
+            "tools": tools,
+            "params": params
+        }
+        payload = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached completion, or None if missing or expired"""
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        if self._db is not None:
+            row = await asyncio.get_running_loop().run_in_executor(self._executor, self._read, key, now)
+            if row:
+                value = json.loads(row[0])
+                self._remember(key, row[1], value)
+                self.hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Cache a completion; the disk write happens in the background"""
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, expires_at, value)
+
+        if self._db is not None:
+            self._executor.submit(self._write, key, json.dumps(value), expires_at)
+
+    def _read(self, key: str, now: float) -> Optional[tuple]:
+        return self._db.execute(
+            "SELECT value, expires_at FROM completions WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+
+    def _write(self, key: str, value: str, expires_at: float):
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO completions (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+            # Keep the disk cache bounded too: drop expired rows, then the oldest beyond the cap
+            self._db.execute("DELETE FROM completions WHERE expires_at <= ?", (time.time(),))
+            self._db.execute(
+                "DELETE FROM completions WHERE key IN "
+                "(SELECT key FROM completions ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries * 10,)
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error writing completion cache: {str(e)}")
+
+    def _remember(self, key: str, expires_at: float, value: Dict[str, Any]):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio and size of the cache"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "disk_backend": self._db is not None
+        }
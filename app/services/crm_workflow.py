@@ -0,0 +1,111 @@
+from typing import Dict, List, Any, Awaitable, Callable, NamedTuple, Optional, Tuple
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class WorkflowStage(NamedTuple):
+    """One CRM call in a workflow.
+
+    run receives the results of the stages it depends on, keyed by stage name;
+    compensate undoes a completed stage if a later one fails.
+    """
+    name: str
+    run: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+    depends_on: Tuple[str, ...] = ()
+    compensate: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+
+
+class WorkflowError(Exception):
+    """A workflow stage failed; completed stages have been compensated"""
+
+    def __init__(self, stage: str, error: BaseException, compensated: List[str], timings: Dict[str, Any]):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+        self.compensated = compensated
+        self.timings = timings
+
+
+class _Skipped(Exception):
+    """A stage was not started because another stage had already failed"""
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+async def run_workflow(stages: List[WorkflowStage]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:
+    """Run each stage as soon as its dependencies finish, so latency is the critical path instead of the sum.
+
+    Returns (results by stage name, timings). On failure, stages that have not started
+    are skipped, but stages already running are awaited rather than cancelled: their
+    write may already be queued or on the wire, and cancelling would leave it in the
+    CRM without a compensation. Every stage that completed is then compensated in
+    reverse order, and WorkflowError is raised.
+    """
+    known = set()
+    for stage in stages:
+        missing = [dep for dep in stage.depends_on if dep not in known]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' depends on {missing}, which must be listed before it")
+        known.add(stage.name)
+
+    started = time.perf_counter()
+    tasks: Dict[str, asyncio.Task] = {}
+    results: Dict[str, Dict[str, Any]] = {}
+    stage_timings: Dict[str, Dict[str, Any]] = {}
+    completed: List[WorkflowStage] = []
+    failures: Dict[str, BaseException] = {}
+
+    async def run_stage(stage: WorkflowStage) -> Dict[str, Any]:
+        upstream = {dep: await tasks[dep] for dep in stage.depends_on}
+        if failures:
+            stage_timings[stage.name] = {"status": "skipped"}
+            raise _Skipped()
+        stage_started = time.perf_counter()
+        stage_timings[stage.name] = {"started_ms": _ms(stage_started - started)}
+        try:
+            result = await stage.run(upstream)
+            stage_timings[stage.name]["status"] = "done"
+        except asyncio.CancelledError:
+            stage_timings[stage.name]["status"] = "cancelled"
+            raise
+        except Exception as e:
+            stage_timings[stage.name]["status"] = "failed"
+            failures[stage.name] = e
+            raise
+        finally:
+            stage_timings[stage.name]["duration_ms"] = _ms(time.perf_counter() - stage_started)
+        results[stage.name] = result
+        completed.append(stage)
+        return result
+
+    for stage in stages:
+        tasks[stage.name] = asyncio.create_task(run_stage(stage))
+
+    # Stages in flight finish even after a failure, so whatever they wrote gets compensated
+    await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    timings = {
+        "stages": stage_timings,
+        "total_ms": _ms(time.perf_counter() - started),
+        # What the same calls would have taken one after another
+        "serial_ms": round(sum(timing.get("duration_ms", 0.0) for timing in stage_timings.values()), 1)
+    }
+    if not failures:
+        return results, timings
+
+    failed_stage, error = next(iter(failures.items()))
+    compensated = []
+    for stage in reversed(completed):
+        if stage.compensate is None:
+            continue
+        try:
+            await stage.compensate(results[stage.name])
+            compensated.append(stage.name)
+        except Exception as e:
+            logger.error(f"Compensating workflow stage '{stage.name}' failed: {str(e)}")
+    raise WorkflowError(failed_stage, error, compensated, timings)
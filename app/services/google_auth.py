@@ -0,0 +1,104 @@
+import os
+import pickle
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Tuple
+from google.auth.transport.requests import Request
+from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient.discovery import build
+import logging
+
+SCOPES = ['https://www.googleapis.com/auth/calendar']
+
+# Refresh access tokens this long before they expire
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+class CalendarAuth:
+    """Process-wide OAuth credentials and Calendar service for one token file"""
+
+    def __init__(self, credentials_file: str, token_file: str):
+        self.credentials_file = credentials_file
+        self.token_file = token_file
+        self.logger = logging.getLogger(__name__)
+        self.credentials = None
+        self.service = None
+        self._lock = threading.Lock()
+        self._refresh_timer = None
+        self._load()
+
+    def _load(self):
+        """Load the stored token once, authorizing or refreshing it as needed"""
+        creds = None
+
+        # Load existing token
+        if os.path.exists(self.token_file):
+            with open(self.token_file, 'rb') as token:
+                creds = pickle.load(token)
+
+        # If there are no (valid) credentials available, let the user log in
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+            else:
+                if not os.path.exists(self.credentials_file):
+                    self.logger.warning(f"OAuth credentials file not found: {self.credentials_file}")
+                    return
+
+                flow = InstalledAppFlow.from_client_secrets_file(
+                    self.credentials_file, SCOPES)
+                creds = flow.run_local_server(port=8088)
+
+            self._save(creds)
+
+        self.credentials = creds
+        # The discovery document is parsed once here and the service shared by every client
+        self.service = build('calendar', 'v3', credentials=creds, cache_discovery=False)
+        self._schedule_refresh()
+        self.logger.info("✅ Google Calendar authentication successful")
+
+    def _save(self, creds):
+        """Save the credentials for the next run"""
+        with open(self.token_file, 'wb') as token:
+            pickle.dump(creds, token)
+
+    def _schedule_refresh(self):
+        """Refresh the access token in memory shortly before it expires"""
+        if not self.credentials or not self.credentials.expiry or not self.credentials.refresh_token:
+            return
+
+        # google-auth stores expiry as naive UTC
+        delay = (self.credentials.expiry - TOKEN_REFRESH_MARGIN - datetime.utcnow()).total_seconds()
+        self._refresh_timer = threading.Timer(max(delay, 0), self.refresh)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def refresh(self):
+        """Refresh the shared credentials; requests pick up the new token immediately"""
+        with self._lock:
+            try:
+                self.credentials.refresh(Request())
+                self._save(self.credentials)
+                self.logger.info("🔄 Google Calendar access token refreshed")
+            except Exception as e:
+                # Requests still refresh on a 401, so retry on the next cycle
+                self.logger.error(f"Error refreshing Google Calendar token: {str(e)}")
+                self._refresh_timer = threading.Timer(60, self.refresh)
+                self._refresh_timer.daemon = True
+                self._refresh_timer.start()
+                return
+        self._schedule_refresh()
+
+
+_auth_cache: Dict[Tuple[str, str], CalendarAuth] = {}
+_auth_lock = threading.Lock()
+
+def get_calendar_auth(credentials_file: str = 'oauth-credentials.json', token_file: str = 'token.pickle') -> CalendarAuth:
+    """Get the shared, lazily initialized auth for a credentials/token pair"""
+    key = (credentials_file, token_file)
+    auth = _auth_cache.get(key)
+    if auth is None:
+        with _auth_lock:
+            auth = _auth_cache.get(key)
+            if auth is None:
+                auth = _auth_cache[key] = CalendarAuth(credentials_file, token_file)
+    return auth
@@ -1,54 +1,36 @@
-import os
-import pickle
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 import logging
-import pytz
+from app.services.calendar_transport import get_calendar_transport
+from app.services.google_auth import get_calendar_auth
+from app.services.availability_cache import get_availability_cache
+from app.services.calendar_mirror import get_calendar_mirror
+from app.services.slot_holds import get_slot_hold_ledger, held_index, exclude_held_starts
+from app.services.availability import BusyIntervalIndex, daily_free_slots, fetch_busy_index, to_epoch, from_epoch
 
 class GoogleCalendarService:
+    # Minutes kept free around existing events to avoid back-to-back bookings
+    BUFFER_MINUTES = 1
+    # Longest date range answered by a single range query
+    MAX_RANGE_DAYS = 31
+    CALENDAR_ID = 'primary'
+
     def __init__(self, credentials_file='oauth-credentials.json', token_file='token.pickle'):
         self.credentials_file = credentials_file
         self.token_file = token_file
-        self.SCOPES = ['https://www.googleapis.com/auth/calendar']
         self.logger = logging.getLogger(__name__)
         self.service = None
+        self.transport = get_calendar_transport()
+        self.availability_cache = get_availability_cache()
+        self.slot_holds = get_slot_hold_ledger()
         self._authenticate()
 
     def _authenticate(self):
-        """Authenticate and build Google Calendar service"""
-        creds = None
-        
-        # Load existing token
-        if os.path.exists(self.token_file):
-            with open(self.token_file, 'rb') as token:
-                creds = pickle.load(token)
-        
-        # If there are no (valid) credentials available, let the user log in
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                if not os.path.exists(self.credentials_file):
-                    self.logger.warning(f"OAuth credentials file not found: {self.credentials_file}")
-                    # For demo purposes, we'll simulate calendar functionality
-                    self.service = None
-                    return
-                
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    self.credentials_file, self.SCOPES)
-                creds = flow.run_local_server(port=8088)
-            
-            # Save the credentials for the next run
-            with open(self.token_file, 'wb') as token:
-                pickle.dump(creds, token)
-        
-        if creds:
-            self.service = build('calendar', 'v3', credentials=creds)
-            self.logger.info("✅ Google Calendar authentication successful")
+        """Authenticate using the shared, process-wide Calendar credentials"""
+        auth = get_calendar_auth(self.credentials_file, self.token_file)
+        # For demo purposes, we'll simulate calendar functionality without a service
+        self.service = auth.service
 
     def _get_day_date(self, day_input: str) -> Optional[datetime]:
         """Convert day input to datetime object"""
@@ -90,8 +72,8 @@ class GoogleCalendarService:
             days_ahead += 7
         return start_date + timedelta(days=days_ahead)
 
-    async def get_available_slots(self, day_input: str, duration_hours: int = 2) -> Dict[str, Any]:
-        """Get available time slots for a given day"""
+    async def get_available_slots(self, day_input: str, duration_hours: int = 2, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get available time slots for a given day, leaving out slots other sessions hold"""
         try:
             target_date = self._get_day_date(day_input)
             if not target_date:
@@ -101,45 +83,156 @@ class GoogleCalendarService:
                     "available_slots": []
                 }
 
-            # Define working hours (9 AM to 5 PM)
-            start_hour = 9
-            end_hour = 17
-            slot_duration = duration_hours
-            
+            result = await self._get_day_slots(target_date, duration_hours)
+            if not result["success"] or not result["available_slots"]:
+                return result
+
+            # Cached results are shared, so filter into a copy
+            held = await held_index(self.slot_holds, self.CALENDAR_ID, target_date, target_date, exclude_session=session_id)
+            if not len(held):
+                return result
             available_slots = []
+            for slot in result["available_slots"]:
+                slot_start = to_epoch(datetime.fromisoformat(slot["datetime"]))
+                if held.is_free(slot_start, slot_start + duration_hours * 3600):
+                    available_slots.append(slot)
+            return {**result, "available_slots": available_slots}
             
-            # If no Google Calendar service, return mock slots
-            if not self.service:
-                return self._get_mock_available_slots(target_date, start_hour, end_hour, slot_duration)
-            
-            # Check each potential slot
-            for hour in range(start_hour, end_hour - slot_duration + 1):
-                slot_start = target_date.replace(hour=hour, minute=0)
-                slot_end = slot_start + timedelta(hours=slot_duration)
-                
-                # Check if slot is available
-                if await self._is_slot_available(slot_start, slot_end):
-                    available_slots.append({
-                        "start_time": slot_start.strftime("%H:%M"),
-                        "end_time": slot_end.strftime("%H:%M"),
-                        "display": f"{slot_start.strftime('%I:%M %p')} - {slot_end.strftime('%I:%M %p')}",
-                        "datetime": slot_start.isoformat()
-                    })
-            
+        except Exception as e:
+            self.logger.error(f"Error getting available slots: {str(e)}")
             return {
+                "success": False,
+                "error": str(e),
+                "available_slots": []
+            }
+
+    async def _get_day_slots(self, target_date: datetime, duration_hours: int) -> Dict[str, Any]:
+        """Free slots of a day from the calendar, served from the availability cache when possible"""
+        date_iso = target_date.strftime("%Y-%m-%d")
+        cached = self.availability_cache.get(self.CALENDAR_ID, date_iso, duration_hours)
+        if cached is not None:
+            return cached
+        generation = self.availability_cache.generation(self.CALENDAR_ID, date_iso)
+
+        # Define working hours (9 AM to 5 PM)
+        start_hour = 9
+        end_hour = 17
+        slot_duration = duration_hours
+        
+        available_slots = []
+        
+        # If no Google Calendar service, return mock slots
+        if not self.service:
+            result = self._get_mock_available_slots(target_date, start_hour, end_hour, slot_duration)
+            self.availability_cache.set(self.CALENDAR_ID, date_iso, duration_hours, result, generation)
+            return result
+        
+        # Fetch the day's busy intervals once, then find free slots locally
+        day_start = target_date.replace(hour=start_hour, minute=0)
+        day_end = target_date.replace(hour=end_hour, minute=0)
+        busy_index = await self._get_busy_index(day_start, day_end)
+        
+        free_starts = busy_index.free_slots(
+            to_epoch(day_start),
+            to_epoch(day_end),
+            duration=slot_duration * 3600,
+            step=3600,
+            buffer=self.BUFFER_MINUTES * 60
+        )
+        
+        for slot_epoch in free_starts:
+            slot_start = from_epoch(slot_epoch)
+            slot_end = slot_start + timedelta(hours=slot_duration)
+            available_slots.append({
+                "start_time": slot_start.strftime("%H:%M"),
+                "end_time": slot_end.strftime("%H:%M"),
+                "display": f"{slot_start.strftime('%I:%M %p')} - {slot_end.strftime('%I:%M %p')}",
+                "datetime": slot_start.isoformat()
+            })
+        
+        result = {
+            "success": True,
+            "date": target_date.strftime("%A, %B %d, %Y"),
+            "date_iso": date_iso,
+            "available_slots": available_slots,
+            "duration_hours": duration_hours
+        }
+        self.availability_cache.set(self.CALENDAR_ID, date_iso, duration_hours, result, generation)
+        return result
+
+    async def get_available_slots_range(
+        self,
+        start_input: str,
+        end_input: Optional[str] = None,
+        duration_hours: int = 2,
+        granularity_minutes: int = 60
+    ) -> Dict[str, Any]:
+        """Get free slot start times for every day of a date range with a single Calendar query"""
+        try:
+            start_date = self._get_day_date(start_input)
+            if end_input:
+                end_date = self._get_day_date(end_input)
+            else:
+                # Default to a week view
+                end_date = start_date + timedelta(days=6) if start_date else None
+            if not start_date or not end_date:
+                return {
+                    "success": False,
+                    "error": "Invalid day format. Please use 'Monday', 'Tuesday', etc., or DD/MM/YYYY format.",
+                    "days": {}
+                }
+            if end_date < start_date or (end_date - start_date).days >= self.MAX_RANGE_DAYS:
+                return {
+                    "success": False,
+                    "error": f"The range must end after it starts and span at most {self.MAX_RANGE_DAYS} days.",
+                    "days": {}
+                }
+
+            # Define working hours (9 AM to 5 PM)
+            start_hour = 9
+            end_hour = 17
+            result = {
                 "success": True,
-                "date": target_date.strftime("%A, %B %d, %Y"),
-                "date_iso": target_date.strftime("%Y-%m-%d"),
-                "available_slots": available_slots,
-                "duration_hours": duration_hours
+                "start_date": start_date.strftime("%Y-%m-%d"),
+                "end_date": end_date.strftime("%Y-%m-%d"),
+                "duration_hours": duration_hours,
+                "granularity_minutes": granularity_minutes
             }
-            
+
+            if not self.service:
+                days = {}
+                day = start_date
+                while day <= end_date:
+                    mock = self._get_mock_available_slots(day, start_hour, end_hour, duration_hours)
+                    days[mock["date_iso"]] = [slot["start_time"] for slot in mock["available_slots"]]
+                    day += timedelta(days=1)
+                result.update(days=await exclude_held_starts(self.slot_holds, self.CALENDAR_ID, days, duration_hours), mock_mode=True)
+                return result
+
+            # One query covers the whole range; each day is then answered from the index
+            busy_index = await self._get_busy_index(
+                start_date.replace(hour=start_hour, minute=0),
+                end_date.replace(hour=end_hour, minute=0)
+            )
+            days = daily_free_slots(
+                busy_index,
+                start_date,
+                end_date,
+                duration=duration_hours * 3600,
+                step=granularity_minutes * 60,
+                start_hour=start_hour,
+                end_hour=end_hour,
+                buffer=self.BUFFER_MINUTES * 60
+            )
+            result["days"] = await exclude_held_starts(self.slot_holds, self.CALENDAR_ID, days, duration_hours)
+            return result
+
         except Exception as e:
-            self.logger.error(f"Error getting available slots: {str(e)}")
+            self.logger.error(f"Error getting available slots for range: {str(e)}")
             return {
                 "success": False,
                 "error": str(e),
-                "available_slots": []
+                "days": {}
             }
 
     def _get_mock_available_slots(self, target_date: datetime, start_hour: int, end_hour: int, slot_duration: int) -> Dict[str, Any]:
@@ -170,75 +263,26 @@ class GoogleCalendarService:
             "mock_mode": True
         }
 
-    async def _is_slot_available(self, start_time: datetime, end_time: datetime) -> bool:
-        """Check if a time slot is available in Google Calendar"""
+    async def _get_busy_index(self, range_start: datetime, range_end: datetime) -> BusyIntervalIndex:
+        """Fetch busy intervals overlapping a time range with a single Calendar query.
+
+        Calendar errors are raised rather than answered with an empty index, so a failed
+        lookup is never reported (or cached) as a free day.
+        """
+        # Answer locally when the calendar mirror is enabled and synced
+        mirror = get_calendar_mirror()
+        if mirror and mirror.ready and mirror.covers(range_start, range_end):
+            return mirror.index
         try:
-            # Convert to timezone-aware datetime for proper comparison
-            local_tz = pytz.timezone('America/Toronto')
-            
-            # If datetime is naive, localize it
-            if start_time.tzinfo is None:
-                start_time = local_tz.localize(start_time)
-            if end_time.tzinfo is None:
-                end_time = local_tz.localize(end_time)
-            
-            # Convert to UTC for API query
-            start_utc = start_time.astimezone(pytz.UTC)
-            end_utc = end_time.astimezone(pytz.UTC)
-            
-            # Query for events that might overlap with our slot
-            # We need to check a broader range to catch overlapping events
-            query_start = (start_utc - timedelta(hours=12)).isoformat()
-            query_end = (end_utc + timedelta(hours=12)).isoformat()
-            
-            events_result = self.service.events().list(
-                calendarId='primary',
-                timeMin=query_start,
-                timeMax=query_end,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            
-            events = events_result.get('items', [])
-            
-            # Check each event for overlap with our requested slot
-            for event in events:
-                event_start_str = event['start'].get('dateTime', event['start'].get('date'))
-                event_end_str = event['end'].get('dateTime', event['end'].get('date'))
-                
-                # Skip all-day events (they don't have 'dateTime')
-                if 'dateTime' not in event['start']:
-                    continue
-                
-                # Parse event times
-                try:
-                    from dateutil import parser
-                    event_start = parser.parse(event_start_str)
-                    event_end = parser.parse(event_end_str)
-                    
-                    # Check for overlap: events overlap if one starts before the other ends
-                    # and the other starts before the first one ends
-                    # We add a small buffer (1 minute) to avoid back-to-back bookings
-                    buffer_minutes = 1
-                    slot_start_buffered = start_utc - timedelta(minutes=buffer_minutes)
-                    slot_end_buffered = end_utc + timedelta(minutes=buffer_minutes)
-                    
-                    if (event_start < slot_end_buffered and event_end > slot_start_buffered):
-                        self.logger.info(f"Slot {start_time.strftime('%H:%M')}-{end_time.strftime('%H:%M')} conflicts with event: {event.get('summary', 'No title')} ({event_start_str} - {event_end_str})")
-                        return False
-                        
-                except Exception as e:
-                    self.logger.error(f"Error parsing event time: {e}")
-                    continue
-            
-            return True
-            
+            # Widen the window by the conflict buffer so adjacent events are caught
+            buffer = timedelta(minutes=self.BUFFER_MINUTES)
+            return await fetch_busy_index(self.service, range_start - buffer, range_end + buffer)
         except Exception as e:
-            self.logger.error(f"Error checking slot availability: {str(e)}")
-            return True  # Default to available if check fails
+            self.logger.error(f"Error fetching busy intervals: {str(e)}")
+            raise
 
-    async def create_booking(self, booking_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Create a calendar event for the booking"""
+    async def create_booking(self, booking_data: Dict[str, Any], event_id: Optional[str] = None) -> Dict[str, Any]:
+        """Create a calendar event for the booking; event_id makes retries idempotent"""
         try:
             # Parse the selected slot datetime
             slot_datetime = datetime.fromisoformat(booking_data['selected_slot']['datetime'])
@@ -288,11 +332,15 @@ class GoogleCalendarService:
                 'colorId': '10',
             }
             
-            created_event = self.service.events().insert(
-                calendarId='primary',
-                body=event,
-                sendUpdates='all'
-            ).execute()
+            try:
+                created_event = await self._insert_event(event, event_id)
+            finally:
+                # The day's cached availability is stale once the insert may have landed
+                self.availability_cache.invalidate_range(self.CALENDAR_ID, slot_datetime, end_datetime)
+            
+            mirror = get_calendar_mirror()
+            if mirror:
+                mirror.upsert(created_event)
             
             return {
                 "success": True,
@@ -313,6 +361,22 @@ class GoogleCalendarService:
                 "error": str(e)
             }
 
+    async def _insert_event(self, event: Dict[str, Any], event_id: Optional[str] = None) -> Dict[str, Any]:
+        """Insert an event; with a client-chosen event_id, a retry of an insert that already landed returns the existing event"""
+        if event_id:
+            event['id'] = event_id
+        try:
+            return await self.transport.execute(self.service.events().insert(
+                calendarId=self.CALENDAR_ID,
+                body=event,
+                sendUpdates='all'
+            ))
+        except HttpError as e:
+            if not event_id or e.resp.status != 409:
+                raise
+            self.logger.info(f"Event {event_id} already exists, treating the insert as done")
+            return await self.transport.execute(self.service.events().get(calendarId=self.CALENDAR_ID, eventId=event_id))
+
     def _create_mock_booking(self, booking_data: Dict[str, Any], start_time: datetime, end_time: datetime) -> Dict[str, Any]:
         """Create a mock booking for demo purposes"""
         return {
@@ -1,14 +1,74 @@
 import openai
+import httpx
 from app.core.config import settings
-from typing import Dict, List, Any
+from app.services.completion_cache import CompletionCache
+from app.services.token_budget import TokenBudget
+from typing import Dict, List, Any, Awaitable, Callable, Optional, Tuple
+import asyncio
 import json
 import logging
 
 class OpenAIService:
+    PERSONA_PROMPT = (
+        "You are JobBot, a friendly and professional booking assistant for freelance jobs. "
+        "Collect booking information in a conversational, WhatsApp-like manner: friendly, clear about "
+        "what you need, patient with corrections, professional but not robotic."
+    )
+    NAME_PROMPT = (
+        "The user's name is {user_name}. Use it in your responses, especially in confirmations, "
+        "never generic terms like 'Client' or 'Test User'."
+    )
+    MOCK_DATA_PROMPT = (
+        "If the user says to mock, skip, or just book, or is not providing a required field, fill in the "
+        "missing booking fields with reasonable test values (the user's name or 'Test User', 'test@email.com', "
+        "'123-456-7890', 'Outdoor', '1000', '2 hours', today's date, etc.) and proceed to confirmation. "
+        "Never ask for the same information twice; get to booking as quickly as possible."
+    )
+    STAGE_PROMPTS = {
+        "collecting_job_type": "The user has provided their name. Now ask about the specific type of work they need (Photography, Videography, Audio, etc.). Do not greet them again.",
+        "collecting_date": "Ask for the job date in DD/MM/YYYY format.",
+        "collecting_duration": "Ask how many hours the job will take.",
+        "collecting_location": "Ask for the job location/venue.",
+        "collecting_budget": "Ask about their budget range.",
+        "collecting_contact": "Ask for their name only (not phone/email).",
+        "confirming_details": "Show a summary of all booking details using {user_name}'s actual name and ask for confirmation. Be specific and personal."
+    }
+    # Deterministic extraction of one booking field; the prompt holds nothing conversation-specific
+    EXTRACTION_PROMPT = (
+        "Extract the {field} from the user's message by calling update_booking_data. Set only fields the "
+        "message actually states; if it does not state the {field}, call the function with no arguments."
+    )
+    # Booking fields summarized in the system prompt, in place of the turns that collected them
+    SUMMARY_FIELDS = ["job_type", "booking_date", "date", "selected_time", "duration", "location", "budget", "phone", "email"]
+
     def __init__(self):
-        self.client = openai.OpenAI(api_key=settings.openai_api_key)
+        # Pooled async client so one worker can keep many completions in flight
+        self.client = openai.AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            timeout=settings.openai_timeout_seconds,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.openai_max_connections,
+                    max_keepalive_connections=settings.openai_max_connections
+                ),
+                timeout=settings.openai_timeout_seconds
+            )
+        )
         self.model = settings.openai_model
         self.logger = logging.getLogger(__name__)
+        self._semaphore = asyncio.Semaphore(settings.openai_max_concurrency)
+        self.cache = CompletionCache(
+            max_entries=settings.openai_cache_max_entries,
+            ttl_seconds=settings.openai_cache_ttl_seconds,
+            disk_path=settings.openai_cache_path
+        ) if settings.openai_cache_enabled else None
+        self.token_budget = TokenBudget(self.model, max_input_tokens=settings.openai_input_token_budget)
+
+    async def create_completion(self, **kwargs):
+        """Create a chat completion, bounded by the service's concurrency limit"""
+        kwargs.setdefault("model", self.model)
+        async with self._semaphore:
+            return await self.client.chat.completions.create(**kwargs)
 
     async def generate_bot_response(
         self,
@@ -18,23 +78,26 @@ class OpenAIService:
         booking_data: Dict[str, Any] = None
     ) -> Dict[str, Any]:
         
-        system_prompt = self._build_system_prompt(booking_state, booking_data)
+        messages, tools, params = self._build_request(user_message, conversation_context, booking_state, booking_data)
         
-        messages = [{"role": "system", "content": system_prompt}]
-        messages.extend(conversation_context)
-        messages.append({"role": "user", "content": user_message})
+        # Identical turns (same prompt, context and answer) are served from the cache
+        cache_key = self._get_cache_key(messages, tools, params)
+        if cache_key:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return cached
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = await self.create_completion(
                 messages=messages,
-                temperature=0.7,
-                max_tokens=200,
-                tools=[{"type": "function", "function": self._get_booking_function_schema()}],
-                tool_choice="auto"
+                tools=tools,
+                **params
             )
             
-            return self._parse_openai_response(response)
+            result = self._parse_openai_response(response)
+            if cache_key and result["action"] != "retry":
+                self.cache.set(cache_key, result)
+            return result
             
         except Exception as e:
             self.logger.error(f"OpenAI API error: {str(e)}")
@@ -44,38 +107,161 @@ class OpenAIService:
                 "booking_data": None
             }
 
-    def _build_system_prompt(self, booking_state: str, booking_data: Dict[str, Any] = None) -> str:
-        # Get the user's actual name if available
-        user_name = "the user"
-        if booking_data and booking_data.get('contact_name'):
-            user_name = booking_data['contact_name']
+    async def stream_bot_response(
+        self,
+        user_message: str,
+        conversation_context: List[Dict[str, str]],
+        booking_state: str,
+        booking_data: Dict[str, Any] = None,
+        on_token: Callable[[str], Awaitable[None]] = None
+    ) -> Dict[str, Any]:
+        """Generate a response with a streamed completion, forwarding text deltas to on_token"""
         
-        base_prompt = f"""
-        You are JobBot, a friendly and professional booking assistant for freelance jobs.
-        Your goal is to collect booking information in a conversational, WhatsApp-like manner.
+        messages, tools, params = self._build_request(user_message, conversation_context, booking_state, booking_data)
         
-        Always be:
-        - Friendly and conversational
-        - Clear about what information you need
-        - Patient with user corrections
-        - Professional but not robotic
+        cache_key = self._get_cache_key(messages, tools, params)
+        if cache_key:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                if cached["message"]:
+                    await on_token(cached["message"])
+                return cached
         
-        IMPORTANT: Always use the user's actual name when available. The user's name is: {user_name}. Use this name in your responses, especially in confirmations. Never use generic terms like 'Client' or 'Test User' when you have their real name. If the user says to mock, skip, or just book, or if the user is not providing a required field, you MUST fill in any missing booking fields with reasonable test/mock values (using the user's actual name if available, otherwise 'Test User', 'test@email.com', '123-456-7890', 'Outdoor', '1000', '2 hours', today's date, etc.) and proceed to booking/confirmation without further prompting for missing details. Do not ask for the same information more than once. Your goal is to get to booking as quickly as possible.
+        content_parts = []
+        # Tool-call arguments arrive as JSON fragments, keyed by tool-call index
+        tool_arguments: Dict[int, List[str]] = {}
         
-        Current booking stage: {booking_state}
-        """
+        try:
+            async with self._semaphore:
+                stream = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    tools=tools,
+                    stream=True,
+                    **params
+                )
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    
+                    if delta.content:
+                        content_parts.append(delta.content)
+                        await on_token(delta.content)
+                    
+                    for tool_call in delta.tool_calls or []:
+                        if tool_call.function and tool_call.function.arguments:
+                            tool_arguments.setdefault(tool_call.index, []).append(tool_call.function.arguments)
+            
+        except Exception as e:
+            self.logger.error(f"OpenAI streaming error: {str(e)}")
+            return {
+                "message": "Sorry, I'm having trouble processing your request. Please try again.",
+                "action": "retry",
+                "booking_data": None
+            }
         
-        stage_prompts = {
-            "collecting_job_type": "The user has provided their name. Now ask about the specific type of work they need (Photography, Videography, Audio, etc.). Do not greet them again.",
-            "collecting_date": "Ask for the job date in DD/MM/YYYY format.",
-            "collecting_duration": "Ask how many hours the job will take.",
-            "collecting_location": "Ask for the job location/venue.",
-            "collecting_budget": "Ask about their budget range.",
-            "collecting_contact": "Ask for their name only (not phone/email).",
-            "confirming_details": f"Show a summary of all booking details using {user_name}'s actual name and ask for confirmation. Be specific and personal."
+        message = "".join(content_parts)
+        if not tool_arguments:
+            result = {"message": message, "action": "continue", "booking_data": None}
+        else:
+            try:
+                first_call = tool_arguments[min(tool_arguments)]
+                result = {
+                    "message": message,
+                    "action": "update_booking",
+                    "booking_data": json.loads("".join(first_call))
+                }
+            except ValueError as e:
+                self.logger.error(f"Error parsing streamed tool call: {str(e)}")
+                return {
+                    "message": message or "I didn't understand that. Could you please rephrase?",
+                    "action": "retry",
+                    "booking_data": None
+                }
+        
+        if cache_key:
+            self.cache.set(cache_key, result)
+        return result
+
+    async def extract_booking_field(self, user_message: str, field: str) -> Optional[Dict[str, Any]]:
+        """Extract one booking field from a reply at temperature 0; identical replies are served from the cache"""
+        messages = [
+            {"role": "system", "content": self.EXTRACTION_PROMPT.format(field=field.replace("_", " "))},
+            {"role": "user", "content": user_message}
+        ]
+        tools = [{"type": "function", "function": self._get_booking_function_schema()}]
+        params = {
+            "temperature": 0,
+            "max_tokens": 60,
+            "tool_choice": {"type": "function", "function": {"name": "update_booking_data"}}
         }
         
-        return base_prompt + "\n" + stage_prompts.get(booking_state, "")
+        cache_key = self._get_cache_key(messages, tools, params)
+        result = await self.cache.get(cache_key) if cache_key else None
+        if result is None:
+            try:
+                response = await self.create_completion(messages=messages, tools=tools, **params)
+            except Exception as e:
+                self.logger.error(f"OpenAI extraction error: {str(e)}")
+                return None
+            result = self._parse_openai_response(response)
+            if result["action"] == "retry":
+                return None
+            if cache_key:
+                self.cache.set(cache_key, result)
+        
+        value = (result.get("booking_data") or {}).get(field)
+        return {field: value} if value else None
+
+    def _build_request(
+        self,
+        user_message: str,
+        conversation_context: List[Dict[str, str]],
+        booking_state: str,
+        booking_data: Dict[str, Any] = None
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, Any]]:
+        """Build the messages, tools and sampling parameters for a bot turn, within the input token budget"""
+        tools = [{"type": "function", "function": self._get_booking_function_schema()}]
+        messages = self.token_budget.fit(
+            self._build_system_prompt(booking_state, booking_data),
+            conversation_context,
+            user_message,
+            tools
+        )
+        params = {"temperature": 0.7, "max_tokens": 200, "tool_choice": "auto"}
+        return messages, tools, params
+
+    def _get_cache_key(self, messages: List[Dict[str, Any]], tools: List[Dict[str, Any]], params: Dict[str, Any]) -> Optional[str]:
+        """Cache key for a request, or None if the request should not be cached"""
+        if self.cache is None or params["temperature"] > settings.openai_cache_max_temperature:
+            return None
+        return CompletionCache.make_key(messages, self.model, tools, **params)
+
+    def _build_system_prompt(self, booking_state: str, booking_data: Dict[str, Any] = None) -> List[Tuple[str, bool]]:
+        """System prompt sections relevant to the booking stage, as (text, optional) pairs"""
+        booking_data = booking_data or {}
+        user_name = booking_data.get("contact_name")
+        
+        sections = [(self.PERSONA_PROMPT, False)]
+        if user_name:
+            sections.append((self.NAME_PROMPT.format(user_name=user_name), False))
+        if booking_state in self.STAGE_PROMPTS:
+            sections.append((self.STAGE_PROMPTS[booking_state].format(user_name=user_name or "the user"), False))
+        
+        # The collected fields stand in for conversation turns that no longer fit the budget
+        collected = self._summarize_booking_data(booking_data)
+        if collected:
+            sections.append((collected, False))
+        if booking_state not in ("greeting", "completed"):
+            sections.append((self.MOCK_DATA_PROMPT, True))
+        sections.append((f"Current booking stage: {booking_state}", False))
+        return sections
+
+    def _summarize_booking_data(self, booking_data: Dict[str, Any]) -> str:
+        """One line of the booking details collected so far"""
+        fields = [f"{field}={booking_data[field]}" for field in self.SUMMARY_FIELDS if booking_data.get(field)]
+        return "Collected so far: " + "; ".join(fields) if fields else ""
 
     def _get_booking_function_schema(self) -> Dict[str, Any]:
         return {
@@ -0,0 +1,35 @@
+from typing import Dict, Any, Awaitable, Callable, List
+import logging
+
+Listener = Callable[[str, Any], Awaitable[None]]
+
+class SessionNotifier:
+    """Fans server-pushed events out to the connections bound to a session"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._listeners: Dict[str, List[Listener]] = {}
+
+    def subscribe(self, session_id: str, listener: Listener) -> Callable[[], None]:
+        """Register a listener for a session; returns a function that unsubscribes it"""
+        self._listeners.setdefault(session_id, []).append(listener)
+
+        def unsubscribe():
+            listeners = self._listeners.get(session_id, [])
+            if listener in listeners:
+                listeners.remove(listener)
+            if not listeners:
+                self._listeners.pop(session_id, None)
+
+        return unsubscribe
+
+    def has_listeners(self, session_id: str) -> bool:
+        return bool(self._listeners.get(session_id))
+
+    async def publish(self, session_id: str, event: str, data: Any):
+        """Deliver an event to every listener of a session"""
+        for listener in list(self._listeners.get(session_id, [])):
+            try:
+                await listener(event, data)
+            except Exception as e:
+                self.logger.error(f"Error pushing {event} to session {session_id}: {str(e)}")
@@ -0,0 +1,131 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from app.core.redis_client import RedisClient
+from app.models.session import ConversationSession
+import json
+import logging
+import time
+
+class SessionStore(ABC):
+    """Storage backend for conversation sessions"""
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[ConversationSession]:
+        """Load a session, or None if it does not exist"""
+
+    @abstractmethod
+    async def set(self, session_id: str, session: ConversationSession) -> None:
+        """Store a session"""
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> bool:
+        """Delete a session, returning whether it existed"""
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters describing the store"""
+        return {"backend": type(self).__name__}
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local session store with LRU eviction and idle expiry"""
+
+    def __init__(self, max_sessions: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        # session_id -> (last_access, session), least recently used first
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, session_id: str) -> Optional[ConversationSession]:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+
+        last_access, session = entry
+        if self.ttl_seconds and time.monotonic() - last_access > self.ttl_seconds:
+            del self._sessions[session_id]
+            self.expirations += 1
+            return None
+
+        self._sessions[session_id] = (time.monotonic(), session)
+        self._sessions.move_to_end(session_id)
+        return session
+
+    async def set(self, session_id: str, session: ConversationSession) -> None:
+        now = time.monotonic()
+        self._sessions[session_id] = (now, session)
+        self._sessions.move_to_end(session_id)
+        self._expire_idle(now)
+
+        if self.max_sessions:
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+
+    async def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def _expire_idle(self, now: float):
+        """Drop idle sessions; they sit at the least recently used end"""
+        if not self.ttl_seconds:
+            return
+        while self._sessions:
+            session_id, (last_access, _) = next(iter(self._sessions.items()))
+            if now - last_access <= self.ttl_seconds:
+                break
+            del self._sessions[session_id]
+            self.expirations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self).__name__,
+            "sessions_in_memory": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+class RedisSessionStore(SessionStore):
+    """Session store on a Redis-compatible server, shared by all workers and nodes"""
+
+    def __init__(self, client: RedisClient, ttl_seconds: Optional[float] = None, key_prefix: str = "jobbot:session:"):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+
+    async def get(self, session_id: str) -> Optional[ConversationSession]:
+        payload = await self.client.execute("GET", self.key_prefix + session_id)
+        if payload is None:
+            return None
+        return self._decode(payload)
+
+    async def set(self, session_id: str, session: ConversationSession) -> None:
+        args = ["SET", self.key_prefix + session_id, self._encode(session)]
+        if self.ttl_seconds:
+            # Expiry is refreshed on every write, so idle sessions age out
+            args += ["EX", int(self.ttl_seconds)]
+        await self.client.execute(*args)
+
+    async def delete(self, session_id: str) -> bool:
+        return await self.client.execute("DEL", self.key_prefix + session_id) > 0
+
+    def _encode(self, session: ConversationSession) -> bytes:
+        return json.dumps(session.to_dict(), default=str).encode()
+
+    def _decode(self, payload: bytes) -> ConversationSession:
+        return ConversationSession.from_dict(json.loads(payload))
+
+
+def create_session_store(
+    url: Optional[str] = None,
+    max_sessions: Optional[int] = None,
+    ttl_seconds: Optional[float] = None
+) -> SessionStore:
+    """Create a session store from a URL (redis://host:port/db), in-memory if none is given"""
+    if url:
+        logging.getLogger(__name__).info(f"Using Redis session store at {url.split('@')[-1]}")
+        return RedisSessionStore(RedisClient(url), ttl_seconds=ttl_seconds)
+    return InMemorySessionStore(max_sessions=max_sessions, ttl_seconds=ttl_seconds)
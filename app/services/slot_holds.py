@@ -0,0 +1,315 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+from app.core.config import settings
+from app.core.redis_client import RedisClient
+from app.services.availability import BusyInterval, BusyIntervalIndex, to_epoch, from_epoch
+import math
+import time
+
+# Holds are tracked in 15-minute units so any slot grid down to 15 minutes can be held
+HOLD_UNIT_SECONDS = 900
+
+
+def hold_units(start: float, end: float) -> range:
+    """Units covering [start, end)"""
+    return range(int(start // HOLD_UNIT_SECONDS), int(math.ceil(end / HOLD_UNIT_SECONDS)))
+
+
+def merge_units(units: List[int]) -> List[Tuple[float, float]]:
+    """Turn held units back into (start, end) epoch intervals"""
+    intervals = []
+    for unit in sorted(units):
+        start = unit * HOLD_UNIT_SECONDS
+        if intervals and intervals[-1][1] == start:
+            intervals[-1] = (intervals[-1][0], start + HOLD_UNIT_SECONDS)
+        else:
+            intervals.append((start, start + HOLD_UNIT_SECONDS))
+    return intervals
+
+
+class SlotHoldLedger(ABC):
+    """Short-lived holds on calendar slots, taken with an atomic check-and-set"""
+
+    def __init__(self, ttl_seconds: float = 600):
+        self.ttl_seconds = ttl_seconds
+        self.granted = 0
+        self.conflicts = 0
+        self.extended = 0
+        self.lost = 0
+        self.released = 0
+
+    @abstractmethod
+    async def hold(self, calendar_id: str, start: float, end: float, session_id: str) -> bool:
+        """Hold [start, end) for a session; False if another session holds any part of it"""
+
+    @abstractmethod
+    async def extend(self, calendar_id: str, start: float, end: float, session_id: str) -> bool:
+        """Restart the TTL of a session's hold; False if any part of it expired or belongs to someone else"""
+
+    @abstractmethod
+    async def release(self, calendar_id: str, start: float, end: float, session_id: str) -> None:
+        """Release a session's hold on [start, end)"""
+
+    @abstractmethod
+    async def held_intervals(
+        self,
+        calendar_id: str,
+        range_start: float,
+        range_end: float,
+        exclude_session: Optional[str] = None
+    ) -> List[Tuple[float, float]]:
+        """Intervals inside the range held by sessions other than exclude_session"""
+
+    def stats(self) -> Dict[str, Any]:
+        """Hold counters"""
+        return {
+            "granted": self.granted,
+            "conflicts": self.conflicts,
+            "extended": self.extended,
+            "lost": self.lost,
+            "released": self.released
+        }
+
+
+class InMemorySlotHoldLedger(SlotHoldLedger):
+    """Process-local ledger striped by day.
+
+    Holds are checked and taken without awaiting, so every hold is atomic on the
+    event loop and sessions never wait on each other's locks.
+    """
+
+    # Drop expired holds from every day after this many hold calls
+    SWEEP_INTERVAL = 1000
+
+    def __init__(self, ttl_seconds: float = 600):
+        super().__init__(ttl_seconds)
+        # (calendar id, day) -> unit -> (session id, expires_at)
+        self._days: Dict[Tuple[str, str], Dict[int, Tuple[str, float]]] = {}
+        self._calls_since_sweep = 0
+
+    def _day_key(self, calendar_id: str, unit: int) -> Tuple[str, str]:
+        return (calendar_id, from_epoch(unit * HOLD_UNIT_SECONDS).strftime("%Y%m%d"))
+
+    def _owner(self, calendar_id: str, unit: int, now: float) -> Optional[str]:
+        day = self._days.get(self._day_key(calendar_id, unit))
+        entry = day.get(unit) if day else None
+        if entry and entry[1] > now:
+            return entry[0]
+        return None
+
+    async def hold(self, calendar_id: str, start: float, end: float, session_id: str) -> bool:
+        now = time.time()
+        units = hold_units(start, end)
+        if any(self._owner(calendar_id, unit, now) not in (None, session_id) for unit in units):
+            self.conflicts += 1
+            return False
+
+        expires_at = now + self.ttl_seconds
+        for unit in units:
+            self._days.setdefault(self._day_key(calendar_id, unit), {})[unit] = (session_id, expires_at)
+        self.granted += 1
+
+        self._calls_since_sweep += 1
+        if self._calls_since_sweep >= self.SWEEP_INTERVAL:
+            self._sweep(now)
+        return True
+
+    async def extend(self, calendar_id: str, start: float, end: float, session_id: str) -> bool:
+        now = time.time()
+        units = hold_units(start, end)
+        if any(self._owner(calendar_id, unit, now) != session_id for unit in units):
+            self.lost += 1
+            return False
+
+        expires_at = now + self.ttl_seconds
+        for unit in units:
+            self._days[self._day_key(calendar_id, unit)][unit] = (session_id, expires_at)
+        self.extended += 1
+        return True
+
+    async def release(self, calendar_id: str, start: float, end: float, session_id: str) -> None:
+        for unit in hold_units(start, end):
+            day_key = self._day_key(calendar_id, unit)
+            day = self._days.get(day_key)
+            if day and day.get(unit, (None,))[0] == session_id:
+                del day[unit]
+                if not day:
+                    del self._days[day_key]
+        self.released += 1
+
+    async def held_intervals(
+        self,
+        calendar_id: str,
+        range_start: float,
+        range_end: float,
+        exclude_session: Optional[str] = None
+    ) -> List[Tuple[float, float]]:
+        now = time.time()
+        held = [
+            unit for unit in hold_units(range_start, range_end)
+            if self._owner(calendar_id, unit, now) not in (None, exclude_session)
+        ]
+        return merge_units(held)
+
+    def _sweep(self, now: float):
+        self._calls_since_sweep = 0
+        for day_key in list(self._days):
+            day = self._days[day_key]
+            for unit in [unit for unit, (_, expires_at) in day.items() if expires_at <= now]:
+                del day[unit]
+            if not day:
+                del self._days[day_key]
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["days"] = len(self._days)
+        return stats
+
+
+class RedisSlotHoldLedger(SlotHoldLedger):
+    """Ledger on a Redis-compatible server, shared by all workers.
+
+    Each unit is its own key, so holds on different slots never contend. A hold
+    checks and sets all of its units in one Lua script: either every unit ends
+    up owned by the session or none is touched.
+    """
+
+    # KEYS: unit keys, ARGV: session id, TTL in milliseconds
+    HOLD_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    local owner = redis.call('GET', key)
+    if owner and owner ~= ARGV[1] then
+        return 0
+    end
+end
+for i, key in ipairs(KEYS) do
+    redis.call('SET', key, ARGV[1], 'PX', ARGV[2])
+end
+return 1
+"""
+
+    # Like HOLD_SCRIPT, but every unit must already be owned by the session
+    EXTEND_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    if redis.call('GET', key) ~= ARGV[1] then
+        return 0
+    end
+end
+for i, key in ipairs(KEYS) do
+    redis.call('PEXPIRE', key, ARGV[2])
+end
+return 1
+"""
+
+    def __init__(self, client: RedisClient, ttl_seconds: float = 600, key_prefix: str = "jobbot:hold:"):
+        super().__init__(ttl_seconds)
+        self.client = client
+        self.key_prefix = key_prefix
+
+    def _key(self, calendar_id: str, unit: int) -> str:
+        # Hash tag on the day keeps one day's holds in the same cluster slot
+        day = from_epoch(unit * HOLD_UNIT_SECONDS).strftime("%Y%m%d")
+        return f"{self.key_prefix}{{{calendar_id}:{day}}}:{unit}"
+
+    async def _eval(self, script: str, calendar_id: str, start: float, end: float, session_id: str) -> bool:
+        keys = [self._key(calendar_id, unit) for unit in hold_units(start, end)]
+        ttl_ms = int(self.ttl_seconds * 1000)
+        return await self.client.execute("EVAL", script, len(keys), *keys, session_id, ttl_ms) == 1
+
+    async def hold(self, calendar_id: str, start: float, end: float, session_id: str) -> bool:
+        if not await self._eval(self.HOLD_SCRIPT, calendar_id, start, end, session_id):
+            self.conflicts += 1
+            return False
+        self.granted += 1
+        return True
+
+    async def extend(self, calendar_id: str, start: float, end: float, session_id: str) -> bool:
+        if not await self._eval(self.EXTEND_SCRIPT, calendar_id, start, end, session_id):
+            self.lost += 1
+            return False
+        self.extended += 1
+        return True
+
+    async def release(self, calendar_id: str, start: float, end: float, session_id: str) -> None:
+        keys = [self._key(calendar_id, unit) for unit in hold_units(start, end)]
+        owners = await self.client.execute("MGET", *keys)
+        owned = [key for key, owner in zip(keys, owners) if owner is not None and owner.decode() == session_id]
+        if owned:
+            await self.client.execute("DEL", *owned)
+        self.released += 1
+
+    async def held_intervals(
+        self,
+        calendar_id: str,
+        range_start: float,
+        range_end: float,
+        exclude_session: Optional[str] = None
+    ) -> List[Tuple[float, float]]:
+        units = list(hold_units(range_start, range_end))
+        if not units:
+            return []
+        owners = await self.client.execute("MGET", *[self._key(calendar_id, unit) for unit in units])
+        held = [
+            unit for unit, owner in zip(units, owners)
+            if owner is not None and owner.decode() != exclude_session
+        ]
+        return merge_units(held)
+
+
+async def held_index(
+    ledger: SlotHoldLedger,
+    calendar_id: str,
+    first_day: datetime,
+    last_day: datetime,
+    exclude_session: Optional[str] = None
+) -> BusyIntervalIndex:
+    """Index of the holds of other sessions over whole days, to check slots against"""
+    range_start = first_day.replace(hour=0, minute=0, second=0, microsecond=0)
+    range_end = last_day.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    held = await ledger.held_intervals(calendar_id, to_epoch(range_start), to_epoch(range_end), exclude_session)
+    return BusyIntervalIndex(BusyInterval(start, end, "Held") for start, end in held)
+
+
+async def exclude_held_starts(
+    ledger: SlotHoldLedger,
+    calendar_id: str,
+    days: Dict[str, List[str]],
+    duration_hours: int
+) -> Dict[str, List[str]]:
+    """Drop slot start times ("HH:MM" per date_iso) that overlap a hold"""
+    if not days:
+        return days
+    dates = sorted(days)
+    held = await held_index(ledger, calendar_id, datetime.fromisoformat(dates[0]), datetime.fromisoformat(dates[-1]))
+    if not len(held):
+        return days
+
+    filtered = {}
+    for date_iso, starts in days.items():
+        filtered[date_iso] = []
+        for start in starts:
+            slot_start = to_epoch(datetime.fromisoformat(f"{date_iso}T{start}"))
+            if held.is_free(slot_start, slot_start + duration_hours * 3600):
+                filtered[date_iso].append(start)
+    return filtered
+
+
+def create_slot_hold_ledger(url: Optional[str] = None, ttl_seconds: float = 600) -> SlotHoldLedger:
+    """Create a slot-hold ledger from a URL (redis://host:port/db), in-memory if none is given"""
+    if url:
+        return RedisSlotHoldLedger(RedisClient(url), ttl_seconds=ttl_seconds)
+    return InMemorySlotHoldLedger(ttl_seconds=ttl_seconds)
+
+
+_ledger = None
+
+def get_slot_hold_ledger() -> SlotHoldLedger:
+    """Get the process-wide slot-hold ledger (singleton)"""
+    global _ledger
+    if _ledger is None:
+        _ledger = create_slot_hold_ledger(
+            settings.slot_hold_store_url or settings.session_store_url,
+            ttl_seconds=settings.slot_hold_ttl_seconds
+        )
+    return _ledger
@@ -0,0 +1,124 @@
+from typing import Dict, List, Any, Tuple
+import json
+import logging
+
+try:
+    import tiktoken
+except ImportError:  # Optional: counts fall back to a characters-per-token estimate
+    tiktoken = None
+
+# Rough size of an English token when tiktoken is not installed
+CHARS_PER_TOKEN = 4
+# Tokens the chat format adds around every message, and to prime the reply
+MESSAGE_OVERHEAD = 4
+REPLY_OVERHEAD = 3
+
+
+class TokenBudget:
+    """Counts prompt tokens locally and trims each request to an input token budget.
+
+    The system prompt is given as sections, some optional. Required sections, the
+    tools and the user message are always sent; optional sections come next, then as
+    many recent conversation turns as still fit, newest first.
+    """
+
+    def __init__(self, model: str, max_input_tokens: int = 1500):
+        self.logger = logging.getLogger(__name__)
+        self.max_input_tokens = max_input_tokens
+        self._encoding = self._load_encoding(model)
+        self._tool_tokens: Dict[str, int] = {}
+
+        self.requests = 0
+        self.input_tokens = 0
+        self.max_request_tokens = 0
+        self.turns_dropped = 0
+        self.sections_dropped = 0
+        self.over_budget = 0
+
+    def _load_encoding(self, model: str):
+        if tiktoken is None:
+            return None
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+
+    def count(self, text: str) -> int:
+        """Tokens in a piece of text"""
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return len(text) // CHARS_PER_TOKEN + 1
+
+    def count_messages(self, messages: List[Dict[str, Any]]) -> int:
+        """Tokens a list of chat messages costs as input"""
+        return sum(self.count(message.get("content") or "") + MESSAGE_OVERHEAD for message in messages) + REPLY_OVERHEAD
+
+    def count_tools(self, tools: List[Dict[str, Any]]) -> int:
+        """Tokens for the tool schemas; they rarely change, so counts are memoized"""
+        key = json.dumps(tools, sort_keys=True)
+        if key not in self._tool_tokens:
+            self._tool_tokens[key] = self.count(key)
+        return self._tool_tokens[key]
+
+    def fit(
+        self,
+        system_sections: List[Tuple[str, bool]],
+        conversation_context: List[Dict[str, str]],
+        user_message: str,
+        tools: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Build the request messages within the budget; system_sections are (text, optional) pairs"""
+        user_tokens = self.count(user_message) + MESSAGE_OVERHEAD
+        used = self.count_tools(tools) + user_tokens + REPLY_OVERHEAD + MESSAGE_OVERHEAD
+
+        sections = [text for text, optional in system_sections if not optional]
+        used += sum(self.count(text) + 1 for text in sections)
+
+        keep = set()
+        for index, (text, optional) in enumerate(system_sections):
+            if not optional:
+                continue
+            cost = self.count(text) + 1
+            if used + cost <= self.max_input_tokens:
+                keep.add(index)
+                used += cost
+            else:
+                self.sections_dropped += 1
+        sections = [text for index, (text, optional) in enumerate(system_sections) if not optional or index in keep]
+
+        context: List[Dict[str, str]] = []
+        for message in reversed(conversation_context):
+            cost = self.count(message["content"]) + MESSAGE_OVERHEAD
+            if used + cost > self.max_input_tokens:
+                break
+            context.insert(0, message)
+            used += cost
+        self.turns_dropped += len(conversation_context) - len(context)
+
+        if used > self.max_input_tokens:
+            self.over_budget += 1
+            self.logger.warning(f"Prompt needs {used} tokens, over the {self.max_input_tokens} token budget")
+
+        self.requests += 1
+        self.input_tokens += used
+        self.max_request_tokens = max(self.max_request_tokens, used)
+
+        messages = [{"role": "system", "content": "\n".join(sections)}]
+        messages.extend(context)
+        messages.append({"role": "user", "content": user_message})
+        return messages
+
+    def stats(self) -> Dict[str, Any]:
+        """Input token usage and how often requests were trimmed"""
+        return {
+            "tokenizer": "tiktoken" if self._encoding is not None else "estimate",
+            "budget": self.max_input_tokens,
+            "requests": self.requests,
+            "avg_input_tokens": round(self.input_tokens / self.requests, 1) if self.requests else 0.0,
+            "max_input_tokens": self.max_request_tokens,
+            "turns_dropped": self.turns_dropped,
+            "sections_dropped": self.sections_dropped,
+            "over_budget": self.over_budget
+        }
@@ -0,0 +1,233 @@
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+from app.core.microbatch import MicroBatcher
+from app.services.availability import LOCAL_TZ
+from app.services.zoho_service import ZohoCRMService
+import asyncio
+import httpx
+import time
+
+
+class ZohoAPIError(Exception):
+    """Error returned by the Zoho CRM or accounts API"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, code: Optional[str] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+
+
+class ZohoCRMClient(ZohoCRMService):
+    """Zoho CRM v2 client running the same booking workflow as the mock.
+
+    Records written by concurrent workflows are grouped per module into bulk
+    insert/upsert calls, and the OAuth access token is refreshed before it expires.
+    A write cannot be withdrawn once submitted, even if its caller is cancelled,
+    so callers must await it before compensating (run_workflow does).
+    """
+
+    API_PATH = "/crm/v2"
+    # Zoho accepts at most 100 records per insert/upsert call
+    MAX_BULK_RECORDS = 100
+    # Refresh the access token this long before it expires
+    TOKEN_REFRESH_MARGIN = 300
+    # Zoho task priorities for the priorities the booking flow computes
+    TASK_PRIORITIES = {"High": "Highest", "Medium": "High", "Normal": "Normal"}
+
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        refresh_token: str,
+        accounts_url: str = "https://accounts.zoho.com",
+        api_domain: str = "https://www.zohoapis.com",
+        max_connections: int = 20,
+        timeout_seconds: float = 30.0,
+        batch_size: int = 100,
+        batch_window_seconds: float = 0.05
+    ):
+        super().__init__()
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.refresh_token = refresh_token
+        self.accounts_url = accounts_url.rstrip("/")
+        self.api_domain = api_domain.rstrip("/")
+        # Pooled keep-alive connections shared by every workflow
+        self.http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout_seconds
+        )
+
+        self._access_token: Optional[str] = None
+        self._token_refresh_at = 0.0
+        self._token_lock = asyncio.Lock()
+        self.token_refreshes = 0
+
+        batch_size = min(batch_size, self.MAX_BULK_RECORDS)
+        self._writers = {
+            # Contacts are upserted on email so returning clients are not duplicated
+            "Contacts": MicroBatcher(lambda records: self._bulk_write("Contacts", records, upsert_on=["Email"]), batch_size, batch_window_seconds),
+            "Events": MicroBatcher(lambda records: self._bulk_write("Events", records), batch_size, batch_window_seconds),
+            "Tasks": MicroBatcher(lambda records: self._bulk_write("Tasks", records), batch_size, batch_window_seconds),
+        }
+
+    async def _create_contact(self, booking_data: Dict[str, Any]) -> Dict[str, Any]:
+        contact = self._build_contact(booking_data)
+        result = await self._write_record("Contacts", {
+            "First_Name": contact["first_name"],
+            "Last_Name": contact["last_name"] or contact["first_name"],  # Last_Name is mandatory in Zoho
+            "Phone": contact["phone"],
+            "Email": contact["email"],
+            "Lead_Source": contact["lead_source"]
+        })
+        contact["id"] = result["details"]["id"]
+        # An upsert that matched an existing contact must not be deleted by compensation
+        contact["existing"] = result.get("action") == "update"
+        return contact
+
+    async def _create_calendar_event(self, booking_data: Dict[str, Any], contact_id: str) -> Dict[str, Any]:
+        event = self._build_calendar_event(booking_data, contact_id)
+        record = {
+            "Event_Title": event["subject"],
+            "Start_DateTime": self._zoho_datetime(event["start_time"]),
+            "End_DateTime": self._zoho_datetime(event["end_time"]),
+            "Venue": event["location"],
+            "Description": event["description"],
+            "Who_Id": {"id": contact_id}
+        }
+        attendees = [email for email in event["attendees"] if email]
+        if attendees:
+            record["Participants"] = [{"type": "email", "participant": email} for email in attendees]
+        event["id"] = (await self._write_record("Events", record))["details"]["id"]
+        return event
+
+    async def _create_task(self, booking_data: Dict[str, Any], contact_id: str) -> Dict[str, Any]:
+        task = self._build_task(booking_data, contact_id)
+        result = await self._write_record("Tasks", {
+            "Subject": task["subject"],
+            "Due_Date": task["due_date"][:10],
+            "Priority": self.TASK_PRIORITIES.get(task["priority"], "Normal"),
+            "Status": "Not Started",
+            "Description": task["description"],
+            "Who_Id": {"id": contact_id}
+        })
+        task["id"] = result["details"]["id"]
+        return task
+
+    async def _delete_contact(self, contact: Dict[str, Any]):
+        if not contact.get("existing"):
+            await self._request("DELETE", "/Contacts", params={"ids": contact["id"]})
+
+    async def _delete_calendar_event(self, event: Dict[str, Any]):
+        await self._request("DELETE", "/Events", params={"ids": event["id"]})
+
+    async def _delete_task(self, task: Dict[str, Any]):
+        await self._request("DELETE", "/Tasks", params={"ids": task["id"]})
+
+    async def _write_record(self, module: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a record for the module's next bulk call and return its per-record result.
+
+        The record is sent with its batch even if this coroutine is cancelled.
+        """
+        result = await self._writers[module].submit(record)
+        if result.get("status") != "success":
+            raise ZohoAPIError(f"{module} write failed: {result.get('message', 'unknown error')}", code=result.get("code"))
+        return result
+
+    async def _bulk_write(self, module: str, records: List[Dict[str, Any]], upsert_on: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Insert (or upsert) up to 100 records in one call; results come back in record order"""
+        body: Dict[str, Any] = {"data": records}
+        path = f"/{module}"
+        if upsert_on:
+            path += "/upsert"
+            body["duplicate_check_fields"] = upsert_on
+        payload = await self._request("POST", path, json=body)
+        return payload.get("data", [])
+
+    async def _request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        token = await self._get_access_token()
+        response = await self._send(method, path, token, **kwargs)
+        if response.status_code == 401:
+            # Token revoked or expired early: refresh once and retry
+            token = await self._get_access_token(stale_token=token)
+            response = await self._send(method, path, token, **kwargs)
+
+        if response.status_code >= 400:
+            payload = self._error_payload(response)
+            raise ZohoAPIError(
+                f"Zoho CRM {method} {path} failed: {payload.get('message', response.status_code)}",
+                status_code=response.status_code,
+                code=payload.get("code")
+            )
+        return response.json() if response.content else {}
+
+    @staticmethod
+    def _error_payload(response: httpx.Response) -> Dict[str, Any]:
+        """Decoded error body; proxies in front of Zoho may answer with HTML or plain text"""
+        try:
+            payload = response.json() if response.content else {}
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            return {"message": f"HTTP {response.status_code}: {response.text[:200]}"} if response.content else {}
+        return payload
+
+    async def _send(self, method: str, path: str, token: str, **kwargs) -> httpx.Response:
+        return await self.http.request(
+            method,
+            f"{self.api_domain}{self.API_PATH}{path}",
+            headers={"Authorization": f"Zoho-oauthtoken {token}"},
+            **kwargs
+        )
+
+    async def _get_access_token(self, stale_token: Optional[str] = None) -> str:
+        """Cached access token, refreshed ahead of expiry or when the API rejected stale_token"""
+        if self._token_is_fresh(stale_token):
+            return self._access_token
+
+        async with self._token_lock:
+            # Another caller may have refreshed it while this one waited
+            if self._token_is_fresh(stale_token):
+                return self._access_token
+
+            response = await self.http.post(f"{self.accounts_url}/oauth/v2/token", params={
+                "grant_type": "refresh_token",
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "refresh_token": self.refresh_token
+            })
+            payload = response.json() if response.status_code == 200 and response.content else self._error_payload(response)
+            if response.status_code != 200 or "access_token" not in payload:
+                raise ZohoAPIError(f"Zoho token refresh failed: {payload.get('error') or payload.get('message', response.status_code)}", status_code=response.status_code)
+
+            self._access_token = payload["access_token"]
+            expires_in = int(payload.get("expires_in", 3600))
+            self._token_refresh_at = time.time() + expires_in - min(self.TOKEN_REFRESH_MARGIN, expires_in / 2)
+            if payload.get("api_domain"):
+                self.api_domain = payload["api_domain"].rstrip("/")
+            self.token_refreshes += 1
+            return self._access_token
+
+    def _token_is_fresh(self, stale_token: Optional[str] = None) -> bool:
+        return (
+            self._access_token is not None
+            and self._access_token != stale_token
+            and time.time() < self._token_refresh_at
+        )
+
+    def _zoho_datetime(self, value: str) -> str:
+        """Local ISO datetime to the offset form Zoho expects, e.g. 2024-12-15T09:00:00-05:00"""
+        return LOCAL_TZ.localize(datetime.fromisoformat(value)).isoformat(timespec="seconds")
+
+    async def close(self):
+        """Send queued records and close the connection pool"""
+        for writer in self._writers.values():
+            await writer.drain()
+        await self.http.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Bulk write counters per module and token refreshes"""
+        return {
+            "token_refreshes": self.token_refreshes,
+            "bulk_writes": {module: writer.stats() for module, writer in self._writers.items()}
+        }
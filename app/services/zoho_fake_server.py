@@ -0,0 +1,118 @@
+# Local stand-in for the Zoho accounts and CRM v2 APIs, for testing and benchmarking ZohoCRMClient.
+#
+#   uvicorn app.services.zoho_fake_server:app --port 8001
+#
+# Point the client at it with ZOHO_ACCOUNTS_URL=http://localhost:8001 and ZOHO_API_DOMAIN=http://localhost:8001
+# (any client id, secret and refresh token work). FAKE_ZOHO_LATENCY_MS adds a delay to every API call and
+# FAKE_ZOHO_TOKEN_TTL sets the access token lifetime.
+from fastapi import FastAPI, Header, Query, Request
+from fastapi.responses import JSONResponse
+from typing import Dict, Any, Optional
+import asyncio
+import os
+import secrets
+import time
+
+app = FastAPI(title="Fake Zoho CRM")
+
+LATENCY_SECONDS = float(os.getenv("FAKE_ZOHO_LATENCY_MS", "100")) / 1000
+TOKEN_TTL_SECONDS = int(os.getenv("FAKE_ZOHO_TOKEN_TTL", "3600"))
+MAX_RECORDS = 100
+MANDATORY_FIELDS = {"Contacts": ["Last_Name"], "Events": ["Event_Title"], "Tasks": ["Subject"]}
+
+tokens: Dict[str, float] = {}
+records: Dict[str, Dict[str, Dict[str, Any]]] = {module: {} for module in MANDATORY_FIELDS}
+counters = {"token_requests": 0, "api_requests": 0, "records_written": 0}
+
+
+def _error(status_code: int, code: str, message: str) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"code": code, "message": message, "status": "error"})
+
+
+def _check_token(authorization: Optional[str]) -> Optional[JSONResponse]:
+    token = (authorization or "").replace("Zoho-oauthtoken ", "")
+    if tokens.get(token, 0) < time.time():
+        return _error(401, "INVALID_TOKEN", "invalid oauth token")
+    return None
+
+
+@app.post("/oauth/v2/token")
+async def issue_token(request: Request, grant_type: str = Query(...), refresh_token: str = Query(...)):
+    counters["token_requests"] += 1
+    if grant_type != "refresh_token":
+        return JSONResponse(status_code=400, content={"error": "invalid_grant_type"})
+    token = secrets.token_hex(16)
+    tokens[token] = time.time() + TOKEN_TTL_SECONDS
+    return {
+        "access_token": token,
+        "expires_in": TOKEN_TTL_SECONDS,
+        "api_domain": str(request.base_url).rstrip("/"),
+        "token_type": "Bearer"
+    }
+
+
+async def _write(module: str, body: Dict[str, Any], authorization: Optional[str], upsert: bool):
+    counters["api_requests"] += 1
+    await asyncio.sleep(LATENCY_SECONDS)
+    denied = _check_token(authorization)
+    if denied:
+        return denied
+    if module not in records:
+        return _error(400, "INVALID_MODULE", f"unknown module {module}")
+    data = body.get("data", [])
+    if len(data) > MAX_RECORDS:
+        return _error(400, "LIMIT_EXCEEDED", f"at most {MAX_RECORDS} records per call")
+
+    check_fields = body.get("duplicate_check_fields", []) if upsert else []
+    results = []
+    for record in data:
+        missing = [field for field in MANDATORY_FIELDS[module] if not record.get(field)]
+        if missing:
+            results.append({"code": "MANDATORY_NOT_FOUND", "details": {"api_name": missing[0]}, "message": "required field not found", "status": "error"})
+            continue
+
+        existing = next((
+            record_id for record_id, stored in records[module].items()
+            if check_fields and all(stored.get(field) == record.get(field) for field in check_fields)
+        ), None)
+        record_id = existing or str(secrets.randbits(60))
+        records[module][record_id] = {**records[module].get(record_id, {}), **record, "id": record_id}
+        counters["records_written"] += 1
+        results.append({
+            "code": "SUCCESS",
+            "details": {"id": record_id, "Modified_Time": time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime())},
+            "message": "record updated" if existing else "record added",
+            "status": "success",
+            **({"action": "update" if existing else "insert"} if upsert else {})
+        })
+    return JSONResponse(status_code=201 if not upsert else 200, content={"data": results})
+
+
+@app.post("/crm/v2/{module}")
+async def insert_records(module: str, body: Dict[str, Any], authorization: Optional[str] = Header(None)):
+    return await _write(module, body, authorization, upsert=False)
+
+
+@app.post("/crm/v2/{module}/upsert")
+async def upsert_records(module: str, body: Dict[str, Any], authorization: Optional[str] = Header(None)):
+    return await _write(module, body, authorization, upsert=True)
+
+
+@app.delete("/crm/v2/{module}")
+async def delete_records(module: str, ids: str = Query(...), authorization: Optional[str] = Header(None)):
+    counters["api_requests"] += 1
+    denied = _check_token(authorization)
+    if denied:
+        return denied
+    results = []
+    for record_id in ids.split(","):
+        if records.get(module, {}).pop(record_id, None) is None:
+            results.append({"code": "INVALID_DATA", "details": {"id": record_id}, "message": "record not found", "status": "error"})
+        else:
+            results.append({"code": "SUCCESS", "details": {"id": record_id}, "message": "record deleted", "status": "success"})
+    return {"data": results}
+
+
+@app.get("/stats")
+async def stats():
+    return {**counters, "records": {module: len(stored) for module, stored in records.items()}}
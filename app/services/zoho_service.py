@@ -0,0 +1,203 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Dict, Any
+import logging
+from app.services.crm_workflow import WorkflowStage, WorkflowError, run_workflow
+from app.services.booking_analytics import get_booking_analytics
+
+class ZohoCRMService(ABC):
+    """Zoho CRM booking workflow shared by the live client and the in-memory mock.
+
+    Subclasses implement the record writes and their compensations; every other
+    step of the workflow is defined here once.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.analytics = get_booking_analytics()
+
+    async def create_booking_workflow(self, booking_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the Zoho CRM booking workflow: contact, then calendar event and task"""
+        
+        # The contact comes first; the event and the task both link to it and run concurrently
+        stages = [
+            WorkflowStage("contact", lambda upstream: self._create_contact(booking_data), compensate=self._delete_contact),
+            WorkflowStage(
+                "calendar_event",
+                lambda upstream: self._create_calendar_event(booking_data, upstream["contact"]["id"]),
+                depends_on=("contact",),
+                compensate=self._delete_calendar_event
+            ),
+            WorkflowStage(
+                "task",
+                lambda upstream: self._create_task(booking_data, upstream["contact"]["id"]),
+                depends_on=("contact",),
+                compensate=self._delete_task
+            ),
+        ]
+        
+        try:
+            results, timings = await run_workflow(stages)
+            
+            # Only completed workflows are counted; failed ones were rolled back.
+            # Bookings and contacts are counted by the booking repository when they are confirmed.
+            self.analytics.record_task(results["task"])
+            
+            # Generate Job Dossier
+            job_dossier = self._generate_job_dossier(booking_data)
+            
+            return {
+                "success": True,
+                "job_id": results["calendar_event"]["id"],
+                "contact": results["contact"],
+                "calendar_event": results["calendar_event"],
+                "task": results["task"],
+                "job_dossier": job_dossier,
+                "crm_status": "BOOKING_CONFIRMED",
+                "timings": timings
+            }
+            
+        except WorkflowError as e:
+            self.logger.error(f"Zoho CRM workflow error: {str(e)}; rolled back {e.compensated}")
+            return {
+                "success": False,
+                "error": str(e),
+                "failed_stage": e.stage,
+                "compensated": e.compensated,
+                "timings": e.timings,
+                "fallback_action": "manual_booking_required"
+            }
+        except Exception as e:
+            self.logger.error(f"Zoho CRM workflow error: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e),
+                "fallback_action": "manual_booking_required"
+            }
+
+    @abstractmethod
+    async def _create_contact(self, booking_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create (or match) the client's contact record"""
+
+    @abstractmethod
+    async def _create_calendar_event(self, booking_data: Dict[str, Any], contact_id: str) -> Dict[str, Any]:
+        """Create the job's calendar event, linked to the contact"""
+
+    @abstractmethod
+    async def _create_task(self, booking_data: Dict[str, Any], contact_id: str) -> Dict[str, Any]:
+        """Create the follow-up task, linked to the contact"""
+
+    @abstractmethod
+    async def _delete_contact(self, contact: Dict[str, Any]):
+        """Undo _create_contact when a later stage fails"""
+
+    @abstractmethod
+    async def _delete_calendar_event(self, event: Dict[str, Any]):
+        """Undo _create_calendar_event when a later stage fails"""
+
+    @abstractmethod
+    async def _delete_task(self, task: Dict[str, Any]):
+        """Undo _create_task when a later stage fails"""
+
+    @abstractmethod
+    async def close(self):
+        """Release connections held by the service"""
+
+    def _build_contact(self, booking_data: Dict[str, Any], contact_id: str = None) -> Dict[str, Any]:
+        contact = {
+            "id": contact_id,
+            "first_name": booking_data.get("contact_name", "").split()[0],
+            "last_name": " ".join(booking_data.get("contact_name", "").split()[1:]),
+            "phone": booking_data.get("phone"),
+            "email": booking_data.get("email"),
+            "lead_source": "WhatsApp Bot",
+            "created_time": datetime.now().isoformat(),
+            "owner": "JobBot System"
+        }
+        return contact
+
+    def _build_calendar_event(self, booking_data: Dict[str, Any], contact_id: str, event_id: str = None) -> Dict[str, Any]:
+        # Parse date and create event
+        try:
+            job_date = datetime.strptime(booking_data.get("date", ""), "%d/%m/%Y")
+        except:
+            job_date = datetime.now() + timedelta(days=1)
+        
+        duration_hours = int(booking_data.get("duration", "2").split()[0])
+        
+        event = {
+            "id": event_id,
+            "who_id": contact_id,
+            "job_type": booking_data.get("job_type", "Job"),
+            "subject": f"{booking_data.get('job_type', 'Job')} - {booking_data.get('contact_name', 'Client')}",
+            "start_time": job_date.replace(hour=9, minute=0).isoformat(),
+            "end_time": job_date.replace(hour=9 + duration_hours, minute=0).isoformat(),
+            "location": booking_data.get("location", "TBD"),
+            "description": f"Job Type: {booking_data.get('job_type')}\nDuration: {booking_data.get('duration')}\nBudget: {booking_data.get('budget')}\nContact: {booking_data.get('contact_name')}",
+            "attendees": [booking_data.get("email", "")]
+        }
+        return event
+
+    def _build_task(self, booking_data: Dict[str, Any], contact_id: str, task_id: str = None) -> Dict[str, Any]:
+        task = {
+            "id": task_id,
+            "who_id": contact_id,
+            "subject": f"Process booking for {booking_data.get('contact_name', 'Client')}",
+            "due_date": (datetime.now() + timedelta(hours=2)).isoformat(),
+            "priority": self._calculate_priority(booking_data.get("date")),
+            "status": "Open",
+            "description": f"New booking received via WhatsApp Bot\nJob: {booking_data.get('job_type')}\nDate: {booking_data.get('date')}\nLocation: {booking_data.get('location')}",
+            "assigned_to": "Diary Manager"
+        }
+        return task
+
+    def _calculate_priority(self, date_str: str) -> str:
+        """Calculate priority based on job date"""
+        try:
+            job_date = datetime.strptime(date_str, "%d/%m/%Y")
+            days_until = (job_date - datetime.now()).days
+            
+            if days_until <= 1:
+                return "High"
+            elif days_until <= 3:
+                return "Medium"
+            else:
+                return "Normal"
+        except:
+            return "Normal"
+
+    def _generate_job_dossier(self, booking_data: Dict[str, Any]) -> str:
+        priority = self._calculate_priority(booking_data.get("date"))
+        
+        dossier = f"""
+🤖 JOB DOSSIER - {datetime.now().strftime('%d/%m/%Y %H:%M')}
+{'='*50}
+
+📋 JOB DETAILS:
+   Type: {booking_data.get('job_type')}
+   Date: {booking_data.get('date')}
+   Duration: {booking_data.get('duration')} hours
+   Location: {booking_data.get('location')}
+   Budget: {booking_data.get('budget')}
+
+👤 CLIENT CONTACT:
+   Name: {booking_data.get('contact_name')}
+   Phone: {booking_data.get('phone')}
+   Email: {booking_data.get('email')}
+
+⚡ BOOKING STATUS:
+   Priority: {priority}
+   CRM Status: CONFIRMED
+   Crew Assignment: PENDING
+   
+📝 ADDITIONAL NOTES:
+{booking_data.get('details', 'No additional details provided')}
+
+🎯 NEXT ACTIONS:
+   □ Assign suitable crew member
+   □ Send confirmation to client
+   □ Prepare equipment checklist
+   □ Schedule pre-job briefing
+        """.strip()
+        
+        return dossier
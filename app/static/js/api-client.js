@@ -3,6 +3,14 @@ class APIClient {
     constructor() {
         this.baseURL = '/api/v1';
         this.sessionId = this.generateSessionId();
+
+        // WebSocket transport state
+        this.socket = null;
+        this.socketReady = null;
+        this.pendingReply = null;
+        this.lastBookingData = {};
+        this.onSlotUpdate = () => {};
+        this.onTyping = () => {};
     }
 
     generateSessionId() {
@@ -55,6 +63,137 @@ class APIClient {
         });
     }
 
+    async sendMessageStream(content, conversationState = null, onToken = () => {}) {
+        const payload = {
+            content: content,
+            session_id: this.sessionId,
+            conversation_state: conversationState,
+            timestamp: new Date().toISOString()
+        };
+
+        const response = await fetch(`${this.baseURL}/chat/message/stream`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream',
+            },
+            body: JSON.stringify(payload)
+        });
+
+        if (!response.ok || !response.body) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+
+        // Parse Server-Sent Events: "token" frames carry text deltas, "message" the final response
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let finalMessage = null;
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+
+            buffer += decoder.decode(value, { stream: true });
+            const frames = buffer.split('\n\n');
+            buffer = frames.pop();
+
+            for (const frame of frames) {
+                let event = 'message';
+                let data = '';
+                frame.split('\n').forEach(line => {
+                    if (line.startsWith('event: ')) event = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                });
+                if (!data) continue;
+
+                const parsed = JSON.parse(data);
+                if (event === 'token') {
+                    onToken(parsed);
+                } else if (event === 'message') {
+                    finalMessage = parsed;
+                } else if (event === 'error') {
+                    throw new Error(parsed.detail || 'Streaming failed');
+                }
+            }
+        }
+
+        if (!finalMessage) {
+            throw new Error('Stream ended without a message');
+        }
+        return finalMessage;
+    }
+
+    connectSocket() {
+        if (this.socketReady) return this.socketReady;
+        if (!window.WebSocket) return Promise.reject(new Error('WebSocket not supported'));
+
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        const socket = new WebSocket(`${protocol}//${window.location.host}${this.baseURL}/chat/ws/${this.sessionId}`);
+
+        this.socketReady = new Promise((resolve, reject) => {
+            socket.onopen = () => {
+                this.socket = socket;
+                resolve(socket);
+            };
+            socket.onerror = () => reject(new Error('WebSocket connection failed'));
+        });
+
+        socket.onmessage = (event) => this.handleSocketFrame(JSON.parse(event.data));
+        socket.onclose = () => {
+            this.socket = null;
+            this.socketReady = null;
+            if (this.pendingReply) {
+                this.pendingReply.reject(new Error('WebSocket closed'));
+                this.pendingReply = null;
+            }
+        };
+
+        return this.socketReady;
+    }
+
+    handleSocketFrame(frame) {
+        // Compact framing: t = frame type (y typing, k token, r reply, u slot update, e error)
+        const pending = this.pendingReply;
+        if (frame.t === 'u') {
+            this.onSlotUpdate(frame.d);
+        } else if (frame.t === 'y') {
+            this.onTyping();
+        } else if (frame.t === 'k') {
+            if (pending) pending.onToken(frame.d);
+        } else if (frame.t === 'r') {
+            // Booking data is only sent when it changed since the previous reply
+            if (frame.bd !== undefined) this.lastBookingData = frame.bd;
+            this.pendingReply = null;
+            if (pending) {
+                pending.resolve({
+                    message: frame.m,
+                    message_type: frame.mt,
+                    conversation_state: frame.cs,
+                    booking_data: this.lastBookingData,
+                    suggested_actions: frame.sa,
+                    available_slots: frame.as || null,
+                    requires_input: frame.ri
+                });
+            }
+        } else if (frame.t === 'e') {
+            this.pendingReply = null;
+            if (pending) pending.reject(new Error(frame.d || 'Message failed'));
+        }
+    }
+
+    async sendMessageSocket(content, conversationState = null, onToken = () => {}) {
+        const socket = await this.connectSocket();
+        if (this.pendingReply) {
+            throw new Error('A message is already in flight');
+        }
+
+        return new Promise((resolve, reject) => {
+            this.pendingReply = { resolve, reject, onToken };
+            socket.send(JSON.stringify({ t: 'm', c: content, s: conversationState }));
+        });
+    }
+
     async resetConversation() {
         return this.makeRequest('/chat/reset', {
             method: 'POST',
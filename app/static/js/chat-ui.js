@@ -10,6 +10,10 @@ class ChatUI {
         this.currentConversationState = null;
         this.bookingData = {};
         
+        // Prefer the persistent WebSocket; fall back to streaming/plain HTTP if it fails
+        this.useSocket = !!window.WebSocket;
+        this.apiClient.onSlotUpdate = (update) => this.refreshTimeslotSelection(update);
+        
         this.initializeEventListeners();
         this.showWelcomeMessage();
     }
@@ -59,12 +63,48 @@ class ChatUI {
         // Show typing indicator
         this.showTypingIndicator();
 
+        let streamingElement = null;
+
         try {
-            // Send message to API
-            const response = await this.apiClient.sendMessage(message, this.currentConversationState);
+            // Stream the reply when supported, rendering partial text as tokens arrive
+            let response;
+            let partialText = '';
+            const onToken = (token) => {
+                if (!streamingElement) {
+                    this.hideTypingIndicator();
+                    streamingElement = this.startStreamingMessage();
+                }
+                partialText += token;
+                this.updateStreamingMessage(streamingElement, partialText);
+            };
+            
+            if (this.useSocket) {
+                try {
+                    response = await this.apiClient.sendMessageSocket(message, this.currentConversationState, onToken);
+                } catch (error) {
+                    console.warn('WebSocket unavailable, falling back to HTTP:', error);
+                    this.useSocket = false;
+                    if (streamingElement) {
+                        streamingElement.remove();
+                        streamingElement = null;
+                        partialText = '';
+                    }
+                }
+            }
             
-            // Hide typing indicator
+            if (!response) {
+                if (window.ReadableStream && window.TextDecoder) {
+                    response = await this.apiClient.sendMessageStream(message, this.currentConversationState, onToken);
+                } else {
+                    response = await this.apiClient.sendMessage(message, this.currentConversationState);
+                }
+            }
+            
+            // Hide typing indicator and replace the partial bubble with the full message
             this.hideTypingIndicator();
+            if (streamingElement) {
+                streamingElement.remove();
+            }
 
             // Update conversation state
             this.currentConversationState = response.conversation_state;
@@ -81,6 +121,9 @@ class ChatUI {
         } catch (error) {
             console.error('Error sending message:', error);
             this.hideTypingIndicator();
+            if (streamingElement) {
+                streamingElement.remove();
+            }
             this.displayErrorMessage('Sorry, I encountered an error. Please try again.');
         }
     }
@@ -121,6 +164,24 @@ class ChatUI {
         this.scrollToBottom();
     }
 
+    startStreamingMessage() {
+        const messageElement = document.createElement('div');
+        messageElement.className = 'message-bubble bot text streaming';
+        messageElement.innerHTML = `
+            <div class="message-content"></div>
+            <div class="message-time">${this.getCurrentTime()}</div>
+        `;
+        
+        this.chatMessages.appendChild(messageElement);
+        this.scrollToBottom();
+        return messageElement;
+    }
+
+    updateStreamingMessage(messageElement, text) {
+        messageElement.querySelector('.message-content').innerHTML = this.formatMessage(this.escapeHtml(text));
+        this.scrollToBottom();
+    }
+
     displayErrorMessage(message) {
         const messageElement = document.createElement('div');
         messageElement.className = 'message-bubble bot error';
@@ -151,6 +212,18 @@ class ChatUI {
         </div>`;
     }
 
+    refreshTimeslotSelection(update) {
+        // Server-pushed availability: refresh the grid if the user is still picking a slot
+        if (this.currentConversationState !== 'collecting_timeslot' || !update.available_slots) return;
+        if (this.bookingData.date_iso && this.bookingData.date_iso !== update.date_iso) return;
+
+        const selections = this.chatMessages.querySelectorAll('.timeslot-selection');
+        const latest = selections[selections.length - 1];
+        if (latest) {
+            latest.outerHTML = this.createTimeslotSelection(update.available_slots);
+        }
+    }
+
     createSuggestedActions(actions) {
         const actionsHtml = actions.map(action => 
             `<button class="action-btn" onclick="chatUI.handleSuggestedAction('${this.escapeHtml(action)}')">${this.escapeHtml(action)}</button>`
@@ -214,19 +287,36 @@ class ChatUI {
             window.bookingFlow.showBookingSummary(this.bookingData);
         }
         
-        // Show success message with calendar details
-        if (this.bookingData.calendar_event) {
-            const calendarEvent = this.bookingData.calendar_event;
-            const successMessage = {
+        // The calendar write runs in the background; report once it has landed
+        if (this.bookingData.booking_id) {
+            this.pollBookingStatus(this.bookingData.booking_id);
+        }
+    }
+
+    async pollBookingStatus(bookingId, attempt = 0) {
+        let status = null;
+        try {
+            status = await this.apiClient.getBookingSummary(bookingId);
+        } catch (error) {
+            console.error('Booking status error:', error);
+        }
+
+        if (status && status.status === 'CONFIRMED') {
+            this.displayBotMessage({
                 message: `🎉 Booking confirmed! Your ${this.bookingData.job_type.toLowerCase()} session has been scheduled and added to your calendar.`,
                 message_type: "confirmation",
                 conversation_state: "completed",
                 suggested_actions: ["View Calendar", "Start New Booking"]
-            };
-            
-            setTimeout(() => {
-                this.displayBotMessage(successMessage);
-            }, 1000);
+            });
+        } else if (status && status.status === 'FAILED') {
+            this.displayBotMessage({
+                message: "⚠️ We couldn't add your booking to the calendar. Please contact us to confirm your appointment.",
+                message_type: "error",
+                conversation_state: "completed",
+                suggested_actions: ["Start New Booking"]
+            });
+        } else if (attempt < 30) {
+            setTimeout(() => this.pollBookingStatus(bookingId, attempt + 1), 2000);
         }
     }
 
@@ -0,0 +1,68 @@
+import asyncio
+from typing import Any, Dict
+
+from app.models.chat import ConversationState
+from app.services.booking_analytics import BookingAnalytics
+from app.services.booking_outbox import BookingOutbox
+from app.services.booking_repository import BookingRepository
+from app.services.bot_logic import BookingBotLogic
+from app.services.google_calendar_service import GoogleCalendarService
+
+
+class ScriptedOpenAIService:
+    """Stands in for OpenAI on the turns the fast path can't answer"""
+
+    cache = None
+
+    async def generate_bot_response(self, **request: Any) -> Dict[str, Any]:
+        return {"message": "All set!", "action": "continue", "booking_data": None}
+
+
+async def book_through_chat(tmp_path) -> BookingAnalytics:
+    analytics = BookingAnalytics()
+    repository = BookingRepository(str(tmp_path / "bookings.db"), analytics=analytics)
+    outbox = BookingOutbox(str(tmp_path / "outbox.db"), workers=1)
+    calendar = GoogleCalendarService(credentials_file=str(tmp_path / "missing.json"), token_file=str(tmp_path / "token.pickle"))
+    bot = BookingBotLogic(ScriptedOpenAIService(), calendar, booking_outbox=outbox, booking_repository=repository)
+    outbox.start()
+    try:
+        session_id = "analytics-session"
+        response = None
+        for message in ["", "Alice", "Photography", "2 hours", "Tomorrow", None, "Studio", "$500", "Yes, book it"]:
+            if message is None:
+                message = response["suggested_actions"][0]
+            response = await bot.process_message(message, session_id)
+        assert response["conversation_state"] == ConversationState.COMPLETED
+
+        booking_id = response["booking_data"]["booking_id"]
+        for _ in range(100):
+            booking = await repository.get(booking_id)
+            if booking["status"] == "CONFIRMED":
+                break
+            await asyncio.sleep(0.05)
+        assert booking["status"] == "CONFIRMED"
+        return analytics
+    finally:
+        await outbox.stop()
+        await repository.close()
+
+
+def test_confirmed_chat_booking_moves_analytics(tmp_path):
+    analytics = asyncio.run(book_through_chat(tmp_path))
+
+    snapshot = analytics.snapshot()
+    assert snapshot["total_bookings"] == 1
+    assert snapshot["total_contacts"] == 1
+    assert snapshot["bookings_by_job_type"] == {"Photography": 1}
+    assert sum(snapshot["bookings_per_day"].values()) == 1
+
+
+def test_analytics_are_reloaded_from_confirmed_bookings(tmp_path):
+    asyncio.run(book_through_chat(tmp_path))
+
+    reloaded = BookingAnalytics()
+    repository = BookingRepository(str(tmp_path / "bookings.db"), analytics=reloaded)
+    asyncio.run(repository.close())
+
+    assert reloaded.snapshot()["total_bookings"] == 1
+    assert reloaded.snapshot()["total_contacts"] == 1
@@ -0,0 +1,23 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import booking
+from app.services import booking_analytics
+from app.services.booking_analytics import BookingAnalytics
+
+
+def test_analytics_endpoint_returns_counters(monkeypatch):
+    analytics = BookingAnalytics()
+    analytics.record_booking("2099-01-01", "Photography")
+    analytics.record_contact()
+    monkeypatch.setattr(booking_analytics, "_analytics", analytics)
+
+    app = FastAPI()
+    app.include_router(booking.router, prefix="/api/v1/booking")
+    response = TestClient(app).get("/api/v1/booking/analytics")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_bookings"] == 1
+    assert body["total_contacts"] == 1
+    assert body["bookings_by_job_type"] == {"Photography": 1}
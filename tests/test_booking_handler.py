@@ -0,0 +1,57 @@
+import asyncio
+import logging
+from typing import Any, Dict, List
+
+from app.api.gcal_book import calendar_event_id
+from app.services.booking_handler import BookingHandler
+from app.services.booking_repository import CONFIRMED, BookingRepository
+
+
+class FakeCalendar:
+    """Creates every event, under the id Calendar would give it"""
+
+    async def create_booking_events(self, bookings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results = []
+        for number, booking in enumerate(bookings):
+            booking_id = booking.get("booking_id")
+            event_id = calendar_event_id(str(booking_id)) if booking_id else f"generated{number}"
+            results.append({"success": True, "event_id": event_id, "event_link": f"https://calendar.test/{event_id}"})
+        return results
+
+
+def make_booking(**overrides: Any) -> Dict[str, Any]:
+    booking = {
+        "job_type": "Photography", "date": "01/01/2099", "duration": "2 hours", "location": "Studio",
+        "budget": "$500", "contact_name": "Alice", "phone": "555-0100", "email": "alice@example.com"
+    }
+    booking.update(overrides)
+    return booking
+
+
+def test_bulk_bookings_are_stored_under_the_callers_booking_id(tmp_path):
+    async def scenario():
+        handler = BookingHandler.__new__(BookingHandler)
+        handler.logger = logging.getLogger(__name__)
+        handler.gcal = FakeCalendar()
+        handler.repository = BookingRepository(str(tmp_path / "bookings.db"))
+        try:
+            results = await handler.process_bulk_bookings([make_booking(booking_id="ORDER-1"), make_booking()])
+            assert all(result["success"] for result in results)
+
+            # The caller's id is not a valid Calendar event id, so the event was created under its hash
+            event_id = calendar_event_id("ORDER-1")
+            assert results[0]["event_id"] == event_id
+            assert results[0]["event_id_normalized"] is True
+            stored = await handler.repository.get("ORDER-1")
+            assert stored["status"] == CONFIRMED
+            assert stored["event_id"] == event_id
+            assert stored["event_link"] == f"https://calendar.test/{event_id}"
+            assert await handler.repository.get(event_id) is None
+
+            # Without a booking id the event id is the key
+            stored = await handler.repository.get("generated1")
+            assert stored["event_id"] == "generated1"
+        finally:
+            await handler.repository.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,111 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from app.services.calendar_mirror import CalendarMirror
+
+
+def make_event(event_id: str, start: datetime, hours: int = 1, status: str = "confirmed") -> Dict[str, Any]:
+    return {
+        "id": event_id,
+        "status": status,
+        "start": {"dateTime": start.isoformat() + "Z"},
+        "end": {"dateTime": (start + timedelta(hours=hours)).isoformat() + "Z"}
+    }
+
+
+class FakeRequest:
+    def __init__(self, outcome):
+        self.outcome = outcome
+
+    def execute(self, **kwargs):
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+class FakeCalendar:
+    """Answers events().list() with scripted pages and records the parameters of each call"""
+
+    def __init__(self):
+        self.pages: List[Any] = []
+        self.calls: List[Dict[str, Any]] = []
+
+    def events(self):
+        return self
+
+    def list(self, **params):
+        self.calls.append(params)
+        return FakeRequest(self.pages.pop(0))
+
+
+def test_full_incremental_and_expired_token_syncs(tmp_path):
+    tomorrow = datetime.utcnow().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    calendar = FakeCalendar()
+    db_path = str(tmp_path / "mirror.db")
+
+    async def scenario():
+        mirror = CalendarMirror(db_path=db_path, horizon_days=30)
+        mirror._service = calendar
+
+        # Full sync, over two pages, limited to the booking window
+        calendar.pages = [
+            {"items": [make_event("a", tomorrow)], "nextPageToken": "page-2"},
+            {"items": [make_event("b", tomorrow + timedelta(hours=3))], "nextSyncToken": "token-1"}
+        ]
+        assert await mirror.sync()
+        full_params = calendar.calls[0]
+        assert "syncToken" not in full_params
+        window_start = datetime.fromisoformat(full_params["timeMin"])
+        window_end = datetime.fromisoformat(full_params["timeMax"])
+        assert window_end - window_start == timedelta(days=31)
+        assert calendar.calls[1]["pageToken"] == "page-2"
+        assert set(mirror.events) == {"a", "b"}
+        assert mirror.sync_token == "token-1"
+        assert mirror.ready
+        assert mirror.covers(datetime.now(), datetime.now() + timedelta(days=7))
+        assert not mirror.covers(datetime.now(), datetime.now() + timedelta(days=60))
+
+        # Incremental sync sends the token and applies only the changes
+        calendar.pages = [{
+            "items": [make_event("a", tomorrow, status="cancelled"), make_event("c", tomorrow + timedelta(hours=6))],
+            "nextSyncToken": "token-2"
+        }]
+        assert await mirror.sync()
+        assert calendar.calls[2]["syncToken"] == "token-1"
+        assert "timeMin" not in calendar.calls[2]
+        assert set(mirror.events) == {"b", "c"}
+        assert mirror.incremental_syncs == 1
+
+        # An expired token (410) drops the mirror and reloads the window
+        calendar.pages = [
+            HttpError(httplib2.Response({"status": 410}), b"Sync token is no longer valid"),
+            {"items": [make_event("d", tomorrow)], "nextSyncToken": "token-3"}
+        ]
+        assert await mirror.sync()
+        assert calendar.calls[3]["syncToken"] == "token-2"
+        assert "syncToken" not in calendar.calls[4]
+        assert "timeMin" in calendar.calls[4]
+        assert set(mirror.events) == {"d"}
+        assert mirror.sync_token == "token-3"
+        assert mirror.full_syncs == 2
+        tomorrow_epoch = (tomorrow - datetime(1970, 1, 1)).total_seconds()
+        assert not mirror.index.is_free(tomorrow_epoch, tomorrow_epoch + 1800)
+        await mirror.stop()
+
+    asyncio.run(scenario())
+
+    # The last synced state is restored from disk, so the next sync can be incremental
+    async def reload():
+        mirror = CalendarMirror(db_path=db_path, horizon_days=30)
+        try:
+            assert set(mirror.events) == {"d"}
+            assert mirror.sync_token == "token-3"
+            assert mirror.ready
+        finally:
+            await mirror.stop()
+
+    asyncio.run(reload())
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from app.services.crm_workflow import WorkflowError, WorkflowStage, run_workflow
+
+
+def test_stage_in_flight_at_failure_is_finished_and_compensated():
+    written = set()
+
+    async def write(name, delay=0.0, fail=False):
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError(f"{name} rejected")
+        written.add(name)
+        return {"id": name}
+
+    async def delete(record):
+        written.discard(record["id"])
+
+    stages = [
+        WorkflowStage("contact", lambda upstream: write("contact"), compensate=delete),
+        WorkflowStage("event", lambda upstream: write("event", delay=0.2), depends_on=("contact",), compensate=delete),
+        WorkflowStage("task", lambda upstream: write("task", fail=True), depends_on=("contact",), compensate=delete),
+        WorkflowStage("note", lambda upstream: write("note"), depends_on=("task",), compensate=delete),
+    ]
+
+    with pytest.raises(WorkflowError) as raised:
+        asyncio.run(run_workflow(stages))
+
+    assert raised.value.stage == "task"
+    assert sorted(raised.value.compensated) == ["contact", "event"]
+    assert written == set()
+
+
+def test_stage_waiting_on_a_dependency_is_skipped_after_a_failure():
+    started = []
+
+    async def run(name, delay=0.0, fail=False):
+        started.append(name)
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError(f"{name} rejected")
+        return {"id": name}
+
+    stages = [
+        WorkflowStage("slow", lambda upstream: run("slow", delay=0.1)),
+        WorkflowStage("failing", lambda upstream: run("failing", fail=True)),
+        WorkflowStage("after_slow", lambda upstream: run("after_slow"), depends_on=("slow",)),
+    ]
+
+    with pytest.raises(WorkflowError) as raised:
+        asyncio.run(run_workflow(stages))
+
+    assert "after_slow" not in started
+    assert raised.value.timings["stages"]["after_slow"]["status"] == "skipped"
+    assert raised.value.compensated == []
@@ -0,0 +1,51 @@
+import asyncio
+import logging
+from datetime import datetime
+
+from app.api.gcal_book import GoogleCalendarOAuth
+from app.services.availability import BusyIntervalIndex, to_epoch
+from app.services.availability_cache import AvailabilityCache
+from app.services.slot_holds import InMemorySlotHoldLedger
+
+
+def make_calendar() -> GoogleCalendarOAuth:
+    calendar = GoogleCalendarOAuth.__new__(GoogleCalendarOAuth)
+    calendar.logger = logging.getLogger(__name__)
+    calendar.availability_cache = AvailabilityCache()
+    calendar.slot_holds = InMemorySlotHoldLedger()
+    calendar.lookups = 0
+
+    async def empty_busy_index(range_start, range_end):
+        calendar.lookups += 1
+        return BusyIntervalIndex()
+
+    calendar.get_busy_index = empty_busy_index
+    return calendar
+
+
+def test_check_availability_leaves_out_slots_held_by_other_sessions():
+    async def scenario():
+        calendar = make_calendar()
+        held_start = to_epoch(datetime(2099, 1, 1, 10))
+        assert await calendar.slot_holds.hold(calendar.CALENDAR_ID, held_start, held_start + 7200, "other-session")
+
+        result = await calendar.check_availability("01/01/2099", 2, start_hour=10)
+        assert result["available"] is False
+        assert result["held"] is True
+        assert result["conflicts"] == 0
+        assert result["suggested_times"]
+
+        # The session holding the slot still sees it, and the cached calendar answer stays unfiltered
+        result = await calendar.check_availability("01/01/2099", 2, start_hour=10, session_id="other-session")
+        assert result["available"] is True
+        assert "held" not in result
+        assert calendar.lookups == 1
+
+        # A pre-fetched index gets the same filter
+        result = await calendar.check_availability("01/01/2099", 2, start_hour=11, busy_index=BusyIntervalIndex())
+        assert result["available"] is False
+
+        result = await calendar.check_availability("01/01/2099", 2, start_hour=13)
+        assert result["available"] is True
+
+    asyncio.run(scenario())
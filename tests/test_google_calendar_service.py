@@ -0,0 +1,51 @@
+import asyncio
+
+from app.services import google_calendar_service
+from app.services.availability import BusyIntervalIndex
+from app.services.availability_cache import AvailabilityCache
+from app.services.google_calendar_service import GoogleCalendarService
+
+
+def make_service(tmp_path) -> GoogleCalendarService:
+    calendar = GoogleCalendarService(credentials_file=str(tmp_path / "missing.json"), token_file=str(tmp_path / "token.pickle"))
+    calendar.service = object()  # Anything but None takes the Calendar path
+    calendar.availability_cache = AvailabilityCache()
+    return calendar
+
+
+def test_failed_calendar_lookup_is_not_cached_as_free(tmp_path, monkeypatch):
+    calendar = make_service(tmp_path)
+    lookups = []
+
+    async def failing_fetch(service, range_start, range_end):
+        lookups.append(range_start)
+        raise RuntimeError("Calendar unavailable")
+
+    monkeypatch.setattr(google_calendar_service, "fetch_busy_index", failing_fetch)
+    result = asyncio.run(calendar.get_available_slots("25/12/2099"))
+    assert result["success"] is False
+    assert result["available_slots"] == []
+    assert calendar.availability_cache.get(calendar.CALENDAR_ID, "2099-12-25", 2) is None
+
+    async def empty_fetch(service, range_start, range_end):
+        lookups.append(range_start)
+        return BusyIntervalIndex()
+
+    # The next lookup goes back to the calendar instead of answering from a cached failure
+    monkeypatch.setattr(google_calendar_service, "fetch_busy_index", empty_fetch)
+    result = asyncio.run(calendar.get_available_slots("25/12/2099"))
+    assert result["success"] is True
+    assert result["available_slots"]
+    assert len(lookups) == 2
+
+
+def test_failed_range_lookup_reports_failure(tmp_path, monkeypatch):
+    calendar = make_service(tmp_path)
+
+    async def failing_fetch(service, range_start, range_end):
+        raise RuntimeError("Calendar unavailable")
+
+    monkeypatch.setattr(google_calendar_service, "fetch_busy_index", failing_fetch)
+    result = asyncio.run(calendar.get_available_slots_range("21/12/2099", "25/12/2099"))
+    assert result["success"] is False
+    assert result["days"] == {}
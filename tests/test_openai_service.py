@@ -0,0 +1,44 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from app.services.openai_service import OpenAIService
+
+
+def tool_call_response(arguments):
+    call = SimpleNamespace(function=SimpleNamespace(arguments=json.dumps(arguments)))
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=None, tool_calls=[call]))])
+
+
+def test_extraction_runs_at_temperature_zero_and_is_cached():
+    service = OpenAIService()
+    requests = []
+
+    async def create_completion(**kwargs):
+        requests.append(kwargs)
+        return tool_call_response({"location": "Riverside park"})
+
+    service.create_completion = create_completion
+
+    async def run():
+        first = await service.extract_booking_field("down by the riverside park", "location")
+        second = await service.extract_booking_field("down by the  riverside park", "location")
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == second == {"location": "Riverside park"}
+    assert len(requests) == 1
+    assert requests[0]["temperature"] == 0
+    assert service.cache.stats()["hits"] == 1
+
+
+def test_extraction_without_the_field_returns_none():
+    service = OpenAIService()
+
+    async def create_completion(**kwargs):
+        return tool_call_response({})
+
+    service.create_completion = create_completion
+
+    assert asyncio.run(service.extract_booking_field("what do you offer?", "job_type")) is None
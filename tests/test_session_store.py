@@ -0,0 +1,145 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.core.redis_client import RedisClient
+from app.models.chat import ConversationState
+from app.models.session import ConversationSession
+from app.services.session_store import RedisSessionStore
+
+
+class FakeRedis:
+    """In-process RESP2 server with the handful of commands the session store uses"""
+
+    def __init__(self, password: Optional[str] = None):
+        self.password = password
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.commands: List[List[bytes]] = []
+        self.clock_offset = 0.0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}127.0.0.1:{port}/1"
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def now(self) -> float:
+        return time.monotonic() + self.clock_offset
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        authenticated = self.password is None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                args = []
+                for _ in range(int(line[1:-2])):
+                    length = int((await reader.readline())[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                self.commands.append(args)
+                command = args[0].upper()
+                if command == b"AUTH":
+                    authenticated = args[1].decode() == self.password
+                    writer.write(b"+OK\r\n" if authenticated else b"-WRONGPASS invalid password\r\n")
+                elif not authenticated:
+                    writer.write(b"-NOAUTH Authentication required.\r\n")
+                else:
+                    writer.write(self._handle(command, args[1:]))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    def _live(self, key: bytes) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= self.now():
+            del self.data[key]
+            return None
+        return value
+
+    def _handle(self, command: bytes, args: List[bytes]) -> bytes:
+        if command == b"SELECT":
+            return b"+OK\r\n"
+        if command == b"GET":
+            value = self._live(args[0])
+            return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+        if command == b"SET":
+            expires_at = None
+            options = [arg.upper() for arg in args[2:]]
+            if b"EX" in options:
+                expires_at = self.now() + int(args[2 + options.index(b"EX") + 1])
+            elif b"PX" in options:
+                expires_at = self.now() + int(args[2 + options.index(b"PX") + 1]) / 1000
+            self.data[args[0]] = (args[1], expires_at)
+            return b"+OK\r\n"
+        if command == b"DEL":
+            deleted = [key for key in args if self._live(key) is not None]
+            for key in deleted:
+                del self.data[key]
+            return b":%d\r\n" % len(deleted)
+        if command == b"TTL":
+            if self._live(args[0]) is None:
+                return b":-2\r\n"
+            expires_at = self.data[args[0]][1]
+            return b":-1\r\n" if expires_at is None else b":%d\r\n" % round(expires_at - self.now())
+        return b"-ERR unknown command '%s'\r\n" % command
+
+
+def make_session() -> ConversationSession:
+    session = ConversationSession(
+        conversation_state=ConversationState.COLLECTING_DATE,
+        booking_data={"client_name": "Alice", "job_type": "Photography", "duration_hours": 2}
+    )
+    session.add_message("user", "Hi, I'd like to book a shoot")
+    session.add_message("assistant", "Sure, which day works for you?")
+    session.set_slots([{"datetime": "2099-01-01T10:00:00"}, {"datetime": "2099-01-01T14:00:00"}], 2)
+    return session
+
+
+def test_redis_session_round_trip_with_ttl():
+    async def scenario():
+        server = FakeRedis(password="secret")
+        url = await server.start()
+        client = RedisClient(url)
+        store = RedisSessionStore(client, ttl_seconds=600)
+        try:
+            session = make_session()
+            await store.set("abc", session)
+
+            # The handshake authenticates and selects the database from the URL
+            assert server.commands[0] == [b"AUTH", b"secret"]
+            assert server.commands[1] == [b"SELECT", b"1"]
+            assert server.commands[2][:2] == [b"SET", b"jobbot:session:abc"]
+            assert server.commands[2][3:] == [b"EX", b"600"]
+            assert await client.execute("TTL", "jobbot:session:abc") == 600
+
+            restored = await store.get("abc")
+            assert restored.to_dict() == session.to_dict()
+            assert restored.conversation_state == ConversationState.COLLECTING_DATE
+            assert restored.slot_dicts() == session.slot_dicts()
+            assert restored.context_messages(2) == session.context_messages(2)
+
+            # Writing again refreshes the expiry; idle sessions age out
+            server.clock_offset = 500
+            await store.set("abc", restored)
+            assert await client.execute("TTL", "jobbot:session:abc") == 600
+            server.clock_offset = 1101
+            assert await store.get("abc") is None
+
+            await store.set("abc", session)
+            assert await store.delete("abc") is True
+            assert await store.delete("abc") is False
+            assert await store.get("missing") is None
+        finally:
+            await client.close()
+            await server.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,78 @@
+import asyncio
+
+import httpx
+
+from app.services import zoho_fake_server
+from app.services.zoho_crm import ZohoCRMClient
+
+BOOKING = {
+    "contact_name": "Alice Example",
+    "email": "alice@example.com",
+    "phone": "+1-555-0100",
+    "job_type": "Photography",
+    "date": "15/12/2099",
+    "duration": "2",
+    "location": "Studio",
+    "budget": "$500"
+}
+
+
+def fake_zoho(failing_module=None, slow_module=None, delay=0.5):
+    """The fake Zoho server, with one module's writes failing and another's slowed down"""
+    async def app(scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] == "http" and scope["method"] == "POST":
+            if failing_module and path.startswith(f"/crm/v2/{failing_module}"):
+                await send({"type": "http.response.start", "status": 500, "headers": [(b"content-type", b"text/html")]})
+                await send({"type": "http.response.body", "body": b"<html>Internal Server Error</html>"})
+                return
+            if slow_module and path.startswith(f"/crm/v2/{slow_module}"):
+                await asyncio.sleep(delay)
+        await zoho_fake_server.app(scope, receive, send)
+    return app
+
+
+def make_client(app) -> ZohoCRMClient:
+    client = ZohoCRMClient("id", "secret", "refresh", accounts_url="http://zoho", api_domain="http://zoho", batch_window_seconds=0.01)
+    client.http = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://zoho")
+    return client
+
+
+def reset_fake_server(monkeypatch):
+    monkeypatch.setattr(zoho_fake_server, "LATENCY_SECONDS", 0)
+    for stored in zoho_fake_server.records.values():
+        stored.clear()
+
+
+def test_booking_workflow_writes_every_module(monkeypatch):
+    reset_fake_server(monkeypatch)
+
+    async def run():
+        client = make_client(fake_zoho())
+        try:
+            return await client.create_booking_workflow(BOOKING)
+        finally:
+            await client.close()
+
+    result = asyncio.run(run())
+
+    assert result["success"]
+    assert {module: len(stored) for module, stored in zoho_fake_server.records.items()} == {"Contacts": 1, "Events": 1, "Tasks": 1}
+
+
+def test_failed_task_rolls_back_a_slower_event_write(monkeypatch):
+    reset_fake_server(monkeypatch)
+
+    async def run():
+        client = make_client(fake_zoho(failing_module="Tasks", slow_module="Events"))
+        try:
+            return await client.create_booking_workflow(BOOKING)
+        finally:
+            await client.close()
+
+    result = asyncio.run(run())
+
+    assert not result["success"]
+    assert result["failed_stage"] == "task"
+    assert sorted(result["compensated"]) == ["calendar_event", "contact"]
+    assert {module: len(stored) for module, stored in zoho_fake_server.records.items()} == {"Contacts": 0, "Events": 0, "Tasks": 0}